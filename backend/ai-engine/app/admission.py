@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from collections import deque
+from contextlib import suppress
+from typing import Deque, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.config import settings
+from app.metrics import ADMISSION_REJECTIONS, route_template
+
+TIMEOUT_HEADER = b"x-request-timeout"
+SLOT_SCOPE_KEY = "admission_slot"
+
+logger = logging.getLogger(__name__)
+
+
+class RouteLimiter:
+    """Concurrency limit for one route with a bounded FIFO queue of waiters"""
+    
+    def __init__(self, limit: int, queue_size: int):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+    
+    async def acquire(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for a slot; False when the queue is full.
+        
+        Raises asyncio.TimeoutError when no slot frees up in time.
+        """
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            return True
+        if len(self.waiters) >= self.queue_size:
+            return False
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended
+                self.release()
+            else:
+                with suppress(ValueError):
+                    self.waiters.remove(waiter)
+            raise
+        return True
+    
+    def release(self):
+        # Hand the slot straight to the oldest waiter so it cannot be overtaken
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionSlot:
+    """A request's place within its route's concurrency limit, released at most once"""
+    
+    __slots__ = ('limiter', 'released')
+    
+    def __init__(self, limiter: RouteLimiter):
+        self.limiter = limiter
+        self.released = False
+    
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.limiter.release()
+
+
+def release_admission(request: Request):
+    """Give up the admission slot of a request that no longer does work of its own.
+    
+    Used by requests that wait on a computation started by another
+    request, so identical requests coalesced into one computation only
+    count once against the route limit.
+    """
+    slot = request.scope.get(SLOT_SCOPE_KEY)
+    if slot is not None:
+        slot.release()
+
+
+class AdmissionMiddleware:
+    """ASGI middleware bounding concurrent requests per route and enforcing client deadlines.
+    
+    Routes in ``admission_route_limits`` run at most that many requests at
+    once; further requests wait in a bounded queue. A request finding the
+    queue full, or not admitted within ``admission_queue_timeout_seconds``,
+    is answered 503 with a Retry-After header, so saturated heavy routes
+    shed load instead of holding connections and memory that cheap routes
+    need. Other routes are not queued.
+    
+    A client may send its remaining budget in seconds in the
+    ``X-Request-Timeout`` header. The request is answered 504 and its
+    handler cancelled once that deadline passes, whether it is still
+    queued or already running; work already handed to a thread or process
+    pool finishes in the background.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.limiters = {
+            route: RouteLimiter(limit, settings.admission_queue_size)
+            for route, limit in settings.admission_route_limits.items()
+        }
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
+        header = next((value for name, value in scope['headers'] if name == TIMEOUT_HEADER), None)
+        route = route_template(scope)
+        limiter = self.limiters.get(route)
+        if header is None and limiter is None:
+            await self.app(scope, receive, send)
+            return
+        
+        loop = asyncio.get_running_loop()
+        deadline: Optional[float] = None
+        if header is not None:
+            try:
+                timeout = float(header)
+            except ValueError:
+                timeout = float('nan')
+            if not timeout > 0:
+                await _reject(scope, receive, send, 400, "X-Request-Timeout must be a positive number of seconds")
+                return
+            deadline = loop.time() + timeout
+        
+        if limiter is not None:
+            wait = settings.admission_queue_timeout_seconds
+            if deadline is not None:
+                wait = min(wait, deadline - loop.time())
+            try:
+                admitted = await limiter.acquire(wait)
+            except asyncio.TimeoutError:
+                if deadline is not None and loop.time() >= deadline:
+                    await self._deadline_exceeded(scope, receive, send, route)
+                else:
+                    await self._overloaded(scope, receive, send, route, 'queue_timeout')
+                return
+            if not admitted:
+                await self._overloaded(scope, receive, send, route, 'queue_full')
+                return
+            slot = scope[SLOT_SCOPE_KEY] = AdmissionSlot(limiter)
+        
+        try:
+            if deadline is None:
+                await self.app(scope, receive, send)
+                return
+            
+            started = False
+            
+            async def send_tracking_start(message):
+                nonlocal started
+                if message['type'] == 'http.response.start':
+                    started = True
+                await send(message)
+            
+            try:
+                async with asyncio.timeout_at(deadline):
+                    await self.app(scope, receive, send_tracking_start)
+            except TimeoutError:
+                if started:
+                    # Too late for a status code; the response is cut short
+                    ADMISSION_REJECTIONS.labels(route, 'deadline').inc()
+                    logger.warning(f"Request deadline exceeded while streaming {scope['method']} {scope['path']}")
+                else:
+                    await self._deadline_exceeded(scope, receive, send, route)
+        finally:
+            if limiter is not None:
+                slot.release()
+    
+    async def _overloaded(self, scope, receive, send, route: str, reason: str):
+        ADMISSION_REJECTIONS.labels(route, reason).inc()
+        await _reject(
+            scope, receive, send, 503, "Service overloaded, retry later",
+            headers={'Retry-After': str(settings.admission_retry_after_seconds)}
+        )
+    
+    async def _deadline_exceeded(self, scope, receive, send, route: str):
+        ADMISSION_REJECTIONS.labels(route, 'deadline').inc()
+        await _reject(scope, receive, send, 504, "Request deadline exceeded")
+
+
+async def _reject(scope, receive, send, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None):
+    response = JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+    await response(scope, receive, send)
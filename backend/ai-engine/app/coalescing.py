@@ -0,0 +1,63 @@
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.metrics import COALESCED_REQUESTS
+
+T = TypeVar('T')
+
+
+def request_key(route: str, request: BaseModel) -> str:
+    """Coalescing key of a request: its route and a hash of its body"""
+    digest = hashlib.blake2b(request.model_dump_json().encode(), digest_size=16).hexdigest()
+    return f"{route}:{digest}"
+
+
+class SingleFlight:
+    """Shares one in-flight computation between identical concurrent requests.
+    
+    The first caller for a key starts the computation as its own task;
+    callers arriving with the same key while it runs await that task
+    instead of recomputing, and all of them get its result or exception.
+    Keys are forgotten as soon as the computation finishes, so nothing is
+    cached. A caller that is cancelled, e.g. because its client went away,
+    does not cancel the computation other callers are waiting on.
+    """
+    
+    def __init__(self):
+        self.calls: Dict[str, asyncio.Task] = {}
+    
+    async def run(
+        self,
+        route: str,
+        request: BaseModel,
+        compute: Callable[[], Awaitable[T]],
+        on_join: Optional[Callable[[], None]] = None
+    ) -> T:
+        """Result of ``compute``, shared with identical concurrent calls.
+        
+        ``on_join`` is called when the caller joins a computation that is
+        already running instead of starting one.
+        """
+        if not settings.request_coalescing_enabled:
+            return await compute()
+        key = request_key(route, request)
+        task = self.calls.get(key)
+        if task is None:
+            task = self.calls[key] = asyncio.create_task(compute())
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            COALESCED_REQUESTS.labels(route).inc()
+            if on_join is not None:
+                on_join()
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            # Retrieved here so a result nobody awaits any more is not logged as lost
+            task.exception()
@@ -1,5 +1,5 @@
-from pydantic_settings import BaseSettings
-from typing import Optional
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -16,11 +16,109 @@ class Settings(BaseSettings):
     
     # AI/ML Models
     model_cache_dir: str = "/tmp/models"
+    model_registry_dir: str = "/tmp/models/registry"
+    model_registry_poll_seconds: float = 30.0
+    intent_model_name: str = "intent_classifier"
+    intent_model_min_confidence: float = 0.2
+    embedding_model_name: str = "blueprint_embeddings"
     use_gpu: bool = False
     
+    # Observability
+    metrics_enabled: bool = True
+    profiling_admin_token: Optional[str] = None     # profiling is off unless set
+    profiling_output_dir: str = "/tmp/profiles"
+    profiling_interval_seconds: float = 0.005
+    profiling_max_duration_seconds: float = 60.0
+    profiling_max_files: int = 100
+    
+    # Request handling
+    request_coalescing_enabled: bool = True
+    admission_control_enabled: bool = True
+    # Concurrent requests per route template; routes not listed are not limited
+    admission_route_limits: Dict[str, int] = {
+        "/api/nlp/blueprint": 4,
+        "/api/embeddings": 4,
+        "/api/similarity/blueprints": 4,
+        "/api/risk/assess": 8,
+        "/api/risk/assess/incremental": 8,
+        "/api/risk/assess/batch": 2,
+        "/api/risk/assess/stream": 2,
+        "/api/recommendations": 8,
+        "/api/patterns/detect": 4
+    }
+    admission_queue_size: int = 32
+    admission_queue_timeout_seconds: float = 5.0
+    admission_retry_after_seconds: int = 1
+    
     # OpenAI (optional for enhanced NLP)
     openai_api_key: Optional[str] = None
     
+    # Risk assessment
+    risk_assessment_cache_size: int = 1000
+    risk_blast_radius_min_resources: int = 2
+    risk_blast_radius_max_factors: int = 10
+    risk_batch_workers: Optional[int] = None
+    risk_batch_chunk_size: int = 64
+    risk_batch_max_in_flight: int = 8
+    risk_simulation_trials: int = 100_000
+    risk_simulation_min_trials: int = 1000
+    # Upper bound on trials x sampled factor rows; trials shrink for large assessments
+    risk_simulation_max_draws: int = 5_000_000
+    risk_simulation_chunk_size: int = 8192
+    risk_simulation_seed: Optional[int] = None
+    risk_stream_flush_records: int = 256
+    
+    # Pattern recognition
+    pattern_min_support: float = 0.05
+    pattern_max_itemset_size: int = 6
+    pattern_max_results: int = 20
+    pattern_cache_size: int = 128
+    pattern_min_occurrences: int = 3
+    pattern_event_partition_seconds: int = 3600
+    # Deployment events older than this are dropped; None keeps them all
+    pattern_event_retention_days: Optional[float] = 90.0
+    pattern_cluster_count: int = 8
+    pattern_cluster_batch_size: int = 256
+    pattern_embedding_dim: int = 64
+    failure_window_bucket_seconds: int = 300
+    failure_window_buckets: int = 288
+    failure_window_days: int = 7
+    failure_window_max_keys: int = 10000
+    failure_spike_ratio: float = 3.0
+    failure_spike_min_days: int = 3
+    error_signature_max_entries: int = 5000
+    error_signature_cache_size: int = 50000
+    error_template_max_length: int = 500
+    pattern_snapshot_bucket_seconds: int = 300
+    pattern_snapshot_refresh_seconds: float = 5.0
+    # A pattern type is recomputed at most this often while its input keeps changing
+    pattern_snapshot_min_recompute_seconds: float = 30.0
+    pattern_snapshot_idle_seconds: float = 600.0
+    pattern_snapshot_max_entries: int = 64
+    
+    # Model training
+    training_max_workers: int = 2
+    training_priority_aging_seconds: float = 300.0
+    training_search_max_trials: int = 64
+    training_job_cpus: int = 1
+    training_job_cpu_time_limit_seconds: Optional[int] = 3600
+    training_worker_niceness: int = 10
+    training_cancel_grace_seconds: float = 5.0
+    training_progress_interval_seconds: float = 0.5
+    training_events_keepalive_seconds: float = 15.0
+    training_data_dir: str = "/data/training"
+    training_dataset_chunk_rows: int = 10000
+    training_scratch_dir: Optional[str] = None
+    training_checkpoint_dir: Optional[str] = "/tmp/models/checkpoints"
+    training_checkpoint_interval_seconds: float = 60.0
+    training_job_db_path: str = "/tmp/models/training_jobs.db"
+    training_job_max_finished: int = 1000
+    training_job_retention_days: float = 30.0
+    
+    # Streaming
+    ndjson_max_line_bytes: int = 64 * 1024 * 1024
+    ndjson_spool_max_memory_bytes: int = 8 * 1024 * 1024
+    
     # Service URLs
     blueprint_service_url: str = "http://blueprint-service:3001"
     orchestrator_service_url: str = "http://orchestrator-service:3004"
@@ -29,8 +127,8 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     
-    class Config:
-        env_file = ".env"
+    # model_* settings such as model_registry_dir are not pydantic internals
+    model_config = SettingsConfigDict(env_file=".env", protected_namespaces=('settings_',))
 
 
 settings = Settings()
@@ -1,23 +1,36 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request, Header
+from fastapi.responses import Response, StreamingResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import logging
 from datetime import datetime
+from typing import Dict, Optional
 import torch
 
 from app.models import (
     NLPBlueprintRequest,
     BlueprintFromNLP,
     RiskAssessmentRequest,
+    IncrementalRiskAssessmentRequest,
     RiskAssessment,
     RecommendationRequest,
     RecommendationsResponse,
     PatternRequest,
     PatternsResponse,
+    BlueprintCorpusRequest,
+    BlueprintCorpusResponse,
+    DeploymentEventsRequest,
+    DeploymentEventsResponse,
     IntentAnalysisRequest,
     IntentAnalysisResponse,
     TrainingRequest,
     TrainingStatus,
+    TrainingJobsResponse,
+    ModelVersionInfo,
+    ModelVersionsResponse,
+    ActivateModelRequest,
+    ProfileResult,
     HealthResponse
 )
 from app.services.nlp_service import NLPService
@@ -26,6 +39,27 @@ from app.services.recommendation_service import RecommendationService
 from app.services.pattern_service import PatternRecognitionService
 from app.services.intent_service import IntentAnalysisService
 from app.services.training_service import ModelTrainingService
+from app.services.model_registry import ModelRegistry, HotSwapModel, watch_active_models
+from app.config import settings
+from app.metrics import MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE, render as render_metrics
+from app.responses import FastJSONResponse
+from app.coalescing import SingleFlight
+from app.admission import AdmissionMiddleware, release_admission
+from app.profiling import (
+    ProfilingMiddleware,
+    StackSampler,
+    authorized,
+    new_profile_id,
+    save_profile,
+    profile_path
+)
+from app.streaming import (
+    spool_request_body,
+    iter_lines,
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    SSE_HEADERS
+)
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +75,10 @@ recommendation_service: RecommendationService = None
 pattern_service: PatternRecognitionService = None
 intent_service: IntentAnalysisService = None
 training_service: ModelTrainingService = None
+model_registry: ModelRegistry = None
+hot_swap_models: Dict[str, HotSwapModel] = {}
+# Identical concurrent requests to expensive read-only routes share one computation
+request_coalescer = SingleFlight()
 
 
 @asynccontextmanager
@@ -48,6 +86,7 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
     global nlp_service, risk_service, recommendation_service
     global pattern_service, intent_service, training_service
+    global model_registry, hot_swap_models
     
     logger.info("Starting AI Engine service...")
     logger.info(f"GPU Available: {torch.cuda.is_available()}")
@@ -58,7 +97,20 @@ async def lifespan(app: FastAPI):
     recommendation_service = RecommendationService()
     pattern_service = PatternRecognitionService()
     intent_service = IntentAnalysisService()
-    training_service = ModelTrainingService()
+    model_registry = ModelRegistry(settings.model_registry_dir)
+    training_service = ModelTrainingService(model_registry)
+    hot_swap_models = {
+        model.model_name: model
+        for model in (nlp_service.embedding_model, intent_service.intent_model)
+    }
+    
+    pattern_service.start_snapshot_refresh()
+    training_service.resume_interrupted()
+    model_watch_task = asyncio.create_task(watch_active_models(
+        model_registry,
+        list(hot_swap_models.values()),
+        settings.model_registry_poll_seconds
+    ))
     
     logger.info("AI Engine service started successfully")
     
@@ -66,6 +118,12 @@ async def lifespan(app: FastAPI):
     
     # Cleanup
     logger.info("Shutting down AI Engine service...")
+    risk_service.shutdown()
+    await pattern_service.stop_snapshot_refresh()
+    await training_service.shutdown()
+    model_watch_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await model_watch_task
 
 
 # Create FastAPI app
@@ -73,9 +131,14 @@ app = FastAPI(
     title="IAC DHARMA AI Engine",
     description="AI/ML service for NLP blueprint generation, risk assessment, and intelligent recommendations",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
+# Added before CORS so that shed requests still carry CORS headers
+if settings.admission_control_enabled:
+    app.add_middleware(AdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -85,6 +148,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Only installed when an admin token is configured, so it costs nothing otherwise
+if settings.profiling_admin_token:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so latency includes the other middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -104,6 +175,66 @@ async def health_check():
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics: per-route latency, in-flight requests, errors and stage timings"""
+    # Passed as a header so Starlette does not append a second charset
+    return Response(content=render_metrics(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+
+def check_profiling_token(token: Optional[str]):
+    if not settings.profiling_admin_token:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if not authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@app.post("/api/admin/profile", response_model=ProfileResult)
+async def profile_process(
+    duration_seconds: float = 10.0,
+    x_profile_token: Optional[str] = Header(None)
+):
+    """
+    Sample the stacks of every thread for a fixed duration and save them as
+    a folded-stack (flamegraph) profile
+    """
+    check_profiling_token(x_profile_token)
+    if not 0 < duration_seconds <= settings.profiling_max_duration_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"duration_seconds must be in (0, {settings.profiling_max_duration_seconds}]"
+        )
+    
+    profile_id = new_profile_id('process')
+    sampler = StackSampler(settings.profiling_interval_seconds)
+    sampler.start()
+    try:
+        await asyncio.sleep(duration_seconds)
+    finally:
+        stacks = sampler.stop()
+    path = save_profile(profile_id, stacks)
+    logger.info(f"Saved process profile {path} ({sampler.samples} samples)")
+    
+    return ProfileResult(
+        profile_id=profile_id,
+        path=str(path),
+        samples=sampler.samples,
+        duration_seconds=sampler.duration
+    )
+
+
+@app.get("/api/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """
+    Download a saved profile in folded-stack format
+    """
+    check_profiling_token(x_profile_token)
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
+
+
 @app.post("/api/nlp/blueprint", response_model=BlueprintFromNLP)
 async def generate_blueprint_from_nlp(request: NLPBlueprintRequest):
     """
@@ -134,7 +265,7 @@ async def assess_risk(request: RiskAssessmentRequest):
         
         logger.info(f"Assessing risk for blueprint={request.blueprint_id}, deployment={request.deployment_id}")
         assessment = await risk_service.assess_risk(request)
-        return assessment
+        return FastJSONResponse(assessment)
     except HTTPException:
         raise
     except Exception as e:
@@ -142,8 +273,66 @@ async def assess_risk(request: RiskAssessmentRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/risk/assess/batch")
+async def assess_risk_batch(request: Request):
+    """
+    Assess many blueprints or deployments in one call.
+    
+    The body is NDJSON with one RiskAssessmentRequest per line. Assessments are
+    fanned out to a process pool and streamed back as NDJSON RiskAssessment
+    records in input order, each tagged with metadata.batch_index.
+    """
+    logger.info("Starting batch risk assessment")
+    body = await spool_request_body(request)
+    return StreamingResponse(
+        risk_service.assess_batch(iter_lines(body)),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@app.post("/api/risk/assess/stream")
+async def assess_risk_stream(
+    request: Request,
+    blueprint_id: Optional[str] = None,
+    deployment_id: Optional[str] = None,
+    simulate: bool = False
+):
+    """
+    Assess a very large resource list without materializing it.
+    
+    The body is NDJSON with one resource per line. The response is NDJSON:
+    "risk_factor" records as they are found, then one "summary" record.
+    """
+    logger.info(f"Streaming risk assessment for blueprint={blueprint_id}, deployment={deployment_id}")
+    body = await spool_request_body(request)
+    return StreamingResponse(
+        risk_service.assess_risk_stream(iter_lines(body), blueprint_id, deployment_id, simulate),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@app.post("/api/risk/assess/incremental", response_model=RiskAssessment)
+async def reassess_risk(request: IncrementalRiskAssessmentRequest):
+    """
+    Re-assess risk for a previous assessment from a resource diff (added, removed, changed)
+    """
+    try:
+        logger.info(f"Incremental risk assessment from {request.previous_assessment_id}")
+        assessment = await risk_service.reassess_risk(request)
+        if not assessment:
+            raise HTTPException(status_code=404, detail="Previous assessment not found")
+        return FastJSONResponse(assessment)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error re-assessing risk: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/recommendations", response_model=RecommendationsResponse)
-async def get_recommendations(request: RecommendationRequest):
+async def get_recommendations(request: RecommendationRequest, http_request: Request):
     """
     Get ML-powered recommendations for optimization, security, cost, etc.
     """
@@ -155,7 +344,12 @@ async def get_recommendations(request: RecommendationRequest):
             )
         
         logger.info(f"Generating recommendations for blueprint={request.blueprint_id}, type={request.recommendation_type}")
-        recommendations = await recommendation_service.generate_recommendations(request)
+        recommendations = await request_coalescer.run(
+            "/api/recommendations",
+            request,
+            lambda: recommendation_service.generate_recommendations(request),
+            on_join=lambda: release_admission(http_request)
+        )
         return recommendations
     except HTTPException:
         raise
@@ -165,19 +359,50 @@ async def get_recommendations(request: RecommendationRequest):
 
 
 @app.post("/api/patterns/detect", response_model=PatternsResponse)
-async def detect_patterns(request: PatternRequest):
+async def detect_patterns(request: PatternRequest, http_request: Request):
     """
     Detect patterns across blueprints and deployments using ML
     """
     try:
         logger.info(f"Detecting patterns for {len(request.blueprint_ids or [])} blueprints")
-        patterns = await pattern_service.detect_patterns(request)
-        return patterns
+        patterns = await request_coalescer.run(
+            "/api/patterns/detect",
+            request,
+            lambda: pattern_service.detect_patterns(request),
+            on_join=lambda: release_admission(http_request)
+        )
+        return FastJSONResponse(patterns)
     except Exception as e:
         logger.error(f"Error detecting patterns: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/patterns/blueprints", response_model=BlueprintCorpusResponse)
+async def add_pattern_blueprints(request: BlueprintCorpusRequest):
+    """
+    Add or replace blueprints in the corpus used for architecture pattern mining
+    """
+    try:
+        logger.info(f"Adding {len(request.blueprints)} blueprints to pattern corpus")
+        return await pattern_service.add_blueprints(request)
+    except Exception as e:
+        logger.error(f"Error adding blueprints: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/patterns/events", response_model=DeploymentEventsResponse)
+async def record_deployment_events(request: DeploymentEventsRequest):
+    """
+    Record deployment outcome and error events used for deployment and failure patterns
+    """
+    try:
+        logger.info(f"Recording {len(request.events)} deployment events")
+        return await pattern_service.record_events(request)
+    except Exception as e:
+        logger.error(f"Error recording deployment events: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/intent/analyze", response_model=IntentAnalysisResponse)
 async def analyze_intent(request: IntentAnalysisRequest):
     """
@@ -193,19 +418,50 @@ async def analyze_intent(request: IntentAnalysisRequest):
 
 
 @app.post("/api/train", response_model=TrainingStatus)
-async def train_model(request: TrainingRequest, background_tasks: BackgroundTasks):
+async def train_model(request: TrainingRequest):
     """
-    Start model training job (runs in background)
+    Start model training job (runs in a background worker process)
+    
+    With ``search`` set, the job runs a hyperparameter search whose trials
+    are pruned by successive halving; the best trial is published and the
+    ranked trials are reported under ``metrics.leaderboard``.
     """
     try:
+        if (request.training_data is None) == (request.dataset is None):
+            raise HTTPException(
+                status_code=400,
+                detail="Exactly one of training_data or dataset must be provided"
+            )
+        
         logger.info(f"Starting training job for model: {request.model_name}")
-        status = await training_service.start_training(request, background_tasks)
+        status = await training_service.start_training(request)
         return status
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error starting training: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/train", response_model=TrainingJobsResponse)
+async def list_training_jobs(
+    status: Optional[str] = None,
+    model_name: Optional[str] = None,
+    limit: int = 100
+):
+    """
+    List recent training jobs, optionally filtered by status and model name
+    """
+    try:
+        jobs = await training_service.list_training_jobs(status, model_name, limit)
+        return TrainingJobsResponse(jobs=jobs, total_count=len(jobs))
+    except Exception as e:
+        logger.error(f"Error listing training jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/api/train/{job_id}", response_model=TrainingStatus)
 async def get_training_status(job_id: str):
     """
@@ -223,6 +479,119 @@ async def get_training_status(job_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/train/{job_id}/events")
+async def watch_training(job_id: str):
+    """
+    Stream training job status and per-epoch metrics as server-sent events
+    """
+    try:
+        status = await training_service.get_training_status(job_id)
+        if not status:
+            raise HTTPException(status_code=404, detail="Training job not found")
+        return StreamingResponse(
+            training_service.watch_training(job_id),
+            media_type=SSE_MEDIA_TYPE,
+            headers=SSE_HEADERS
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error watching training job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/train/{job_id}/cancel", response_model=TrainingStatus)
+async def cancel_training(job_id: str):
+    """
+    Cancel a queued or running training job
+    """
+    try:
+        status = await training_service.cancel_training(job_id)
+        if not status:
+            raise HTTPException(status_code=404, detail="Training job not found")
+        return status
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling training job: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/models/{model_name}/versions", response_model=ModelVersionsResponse)
+async def list_model_versions(model_name: str):
+    """
+    List registered versions of a model
+    """
+    try:
+        return ModelVersionsResponse(
+            model_name=model_name,
+            active_version=model_registry.active_version(model_name),
+            versions=model_registry.list_versions(model_name)
+        )
+    except Exception as e:
+        logger.error(f"Error listing model versions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/models/{model_name}/activate", response_model=ModelVersionInfo)
+async def activate_model_version(model_name: str, request: ActivateModelRequest):
+    """
+    Activate a model version; services using the model swap to it without downtime
+    """
+    try:
+        version = model_registry.activate(model_name, request.version)
+        if not version:
+            raise HTTPException(status_code=404, detail="Model version not found")
+        if model_name in hot_swap_models:
+            await hot_swap_models[model_name].sync(model_registry)
+        return version
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error activating model version: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/models/{model_name}/rollback", response_model=ModelVersionInfo)
+async def rollback_model_version(model_name: str):
+    """
+    Re-activate the previously active version of a model
+    """
+    try:
+        version = model_registry.rollback(model_name)
+        if not version:
+            raise HTTPException(status_code=404, detail="No previous model version")
+        if model_name in hot_swap_models:
+            await hot_swap_models[model_name].sync(model_registry)
+        return version
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rolling back model version: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/models/{model_name}/rollforward", response_model=ModelVersionInfo)
+async def roll_forward_model_version(model_name: str):
+    """
+    Re-activate the version a model was last rolled back from
+    """
+    try:
+        version = model_registry.roll_forward(model_name)
+        if not version:
+            raise HTTPException(status_code=404, detail="No model version to roll forward to")
+        if model_name in hot_swap_models:
+            await hot_swap_models[model_name].sync(model_registry)
+        return version
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rolling forward model version: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/similarity/blueprints")
 async def find_similar_blueprints(blueprint_id: str, limit: int = 5):
     """
@@ -231,7 +600,7 @@ async def find_similar_blueprints(blueprint_id: str, limit: int = 5):
     try:
         logger.info(f"Finding similar blueprints for {blueprint_id}")
         similar = await nlp_service.find_similar_blueprints(blueprint_id, limit)
-        return {"blueprint_id": blueprint_id, "similar_blueprints": similar}
+        return FastJSONResponse({"blueprint_id": blueprint_id, "similar_blueprints": similar})
     except Exception as e:
         logger.error(f"Error finding similar blueprints: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -244,7 +613,7 @@ async def generate_embeddings(text: str):
     """
     try:
         embeddings = await nlp_service.generate_embeddings(text)
-        return {"text": text, "embeddings": embeddings.tolist()}
+        return FastJSONResponse({"text": text, "embeddings": embeddings})
     except Exception as e:
         logger.error(f"Error generating embeddings: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
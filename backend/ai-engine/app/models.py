@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from enum import Enum
@@ -67,6 +67,25 @@ class RiskAssessmentRequest(BaseModel):
     deployment_id: Optional[str] = None
     resources: Optional[List[Dict[str, Any]]] = None
     historical_context: Optional[Dict[str, Any]] = None
+    simulate: bool = Field(False, description="Add a Monte Carlo distribution of the risk score to the metadata")
+
+
+class ResourceDiff(BaseModel):
+    added: List[Dict[str, Any]] = Field(default_factory=list)
+    removed: List[str] = Field(
+        default_factory=list,
+        description="Names of removed resources; repeated names carry a #2, #3, ... suffix"
+    )
+    changed: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="Changed resources, with the resource name in 'name' as in removed"
+    )
+
+
+class IncrementalRiskAssessmentRequest(BaseModel):
+    previous_assessment_id: str
+    diff: ResourceDiff
+    simulate: bool = Field(False, description="Add a Monte Carlo distribution of the risk score to the metadata")
 
 
 class RiskFactor(BaseModel):
@@ -93,6 +112,18 @@ class RiskAssessment(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class RiskAssessmentSummary(BaseModel):
+    assessment_id: str
+    blueprint_id: Optional[str] = None
+    deployment_id: Optional[str] = None
+    overall_risk: RiskLevel
+    risk_score: float = Field(..., ge=0.0, le=100.0)
+    risk_factor_count: int
+    recommendations: List[str]
+    assessed_at: datetime
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
 # ML Recommendations
 class RecommendationRequest(BaseModel):
     blueprint_id: Optional[str] = None
@@ -130,6 +161,41 @@ class PatternRequest(BaseModel):
     pattern_type: Optional[str] = None
 
 
+class BlueprintRecord(BaseModel):
+    blueprint_id: str
+    resources: List[Dict[str, Any]]
+
+
+class BlueprintCorpusRequest(BaseModel):
+    blueprints: List[BlueprintRecord]
+
+
+class BlueprintCorpusResponse(BaseModel):
+    corpus_version: int
+    total_blueprints: int
+    distinct_resource_types: int
+
+
+class DeploymentEvent(BaseModel):
+    deployment_id: str
+    timestamp: datetime
+    status: str = Field(..., description="succeeded, failed, rolled_back")
+    strategy: Optional[str] = Field(None, description="blue_green, canary, rolling, recreate")
+    environment: Optional[str] = None
+    resource: Optional[str] = None
+    error: Optional[str] = None
+    duration_seconds: Optional[float] = None
+
+
+class DeploymentEventsRequest(BaseModel):
+    events: List[DeploymentEvent]
+
+
+class DeploymentEventsResponse(BaseModel):
+    accepted: int
+    total_events: int
+
+
 class Pattern(BaseModel):
     pattern_id: str
     pattern_type: str
@@ -145,6 +211,12 @@ class PatternsResponse(BaseModel):
     patterns: List[Pattern]
     total_count: int
     analyzed_at: datetime
+    from_snapshot: bool = False
+    staleness_seconds: float = 0.0
+    time_range: Optional[Dict[str, str]] = Field(
+        None,
+        description="Time range the patterns cover; snapshots widen the requested range to bucket edges"
+    )
 
 
 # Sentiment & Intent Analysis
@@ -168,20 +240,107 @@ class IntentAnalysisResponse(BaseModel):
 
 
 # Model Training
+class TrainingPriority(str, Enum):
+    LOW = "low"
+    NORMAL = "normal"
+    HIGH = "high"
+
+
+class DatasetFormat(str, Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    NDJSON = "ndjson"
+
+
+class TrainingDataset(BaseModel):
+    path: str = Field(..., description="File, directory or glob of shards under the training data directory")
+    format: Optional[DatasetFormat] = Field(None, description="Inferred from file extensions when omitted")
+    label_column: str = "label"
+    text_column: Optional[str] = None
+    feature_columns: Optional[List[str]] = None
+
+
+class SearchStrategy(str, Enum):
+    GRID = "grid"
+    RANDOM = "random"
+
+
+class HyperparameterSearch(BaseModel):
+    strategy: SearchStrategy = SearchStrategy.GRID
+    space: Dict[str, Any] = Field(
+        ...,
+        description="Parameter name -> list of values, or {min, max, log} range for random search"
+    )
+    n_trials: Optional[int] = Field(None, ge=1, description="Number of sampled trials for random search")
+    metric: str = "f1_score"
+    reduction_factor: int = Field(3, ge=2, description="Successive halving keeps 1 / reduction_factor trials per rung")
+    min_epochs: int = Field(1, ge=1)
+    seed: Optional[int] = None
+
+
 class TrainingRequest(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+    
     model_name: str
-    training_data: Dict[str, Any]
+    training_data: Optional[Dict[str, Any]] = None
+    dataset: Optional[TrainingDataset] = None
     parameters: Optional[Dict[str, Any]] = None
+    priority: TrainingPriority = TrainingPriority.NORMAL
+    search: Optional[HyperparameterSearch] = None
 
 
 class TrainingStatus(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+    
     job_id: str
     model_name: str
     status: str
     progress: float
     started_at: datetime
     completed_at: Optional[datetime] = None
-    metrics: Optional[Dict[str, float]] = None
+    metrics: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    queue_position: Optional[int] = None
+    model_version: Optional[int] = None
+
+
+class TrainingJobsResponse(BaseModel):
+    jobs: List[TrainingStatus]
+    total_count: int
+
+
+# Model Registry
+class ModelVersionInfo(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+    
+    model_name: str
+    version: int
+    kind: str
+    created_at: datetime
+    checksums: Dict[str, str]
+    metrics: Dict[str, float] = Field(default_factory=dict)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    active: bool = False
+
+
+class ModelVersionsResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+    
+    model_name: str
+    active_version: Optional[int] = None
+    versions: List[ModelVersionInfo]
+
+
+class ActivateModelRequest(BaseModel):
+    version: int
+
+
+# Profiling
+class ProfileResult(BaseModel):
+    profile_id: str
+    path: str
+    samples: int
+    duration_seconds: float
 
 
 # Health Check
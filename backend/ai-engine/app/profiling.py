@@ -0,0 +1,181 @@
+import os
+import sys
+import hmac
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from uuid import uuid4
+
+from app.config import settings
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_ID_HEADER = b"x-profile-id"
+FOLDED_SUFFIX = ".folded"
+# Admin endpoints take the same token and are never profiled themselves
+ADMIN_PATH_PREFIX = "/api/admin/"
+SOURCE_ROOT = str(Path(__file__).resolve().parent.parent) + os.sep
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler:
+    """Samples Python stacks from a background thread.
+    
+    Every ``interval`` seconds the stacks of all other threads, or of
+    ``thread_id`` only, are folded into ``root;caller;...;callee`` strings
+    and counted, the collapsed format read by flamegraph.pl, speedscope
+    and most flamegraph viewers. The root frame is ``root`` when given,
+    otherwise the thread name. With ``task`` set, samples are only kept
+    while that task is the one running on ``loop``, which attributes
+    event-loop time to a single request.
+    """
+    
+    def __init__(
+        self,
+        interval: float,
+        thread_id: Optional[int] = None,
+        task: Optional[asyncio.Task] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        root: Optional[str] = None
+    ):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.task = task
+        self.loop = loop
+        self.root = root
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration = 0.0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+    
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.thread.start()
+    
+    def stop(self) -> Counter:
+        self.stopped.set()
+        self.thread.join()
+        self.duration = time.perf_counter() - self.started_at
+        return self.stacks
+    
+    def _run(self):
+        own = threading.get_ident()
+        while not self.stopped.wait(self.interval):
+            if self.task is not None and asyncio.current_task(self.loop) is not self.task:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_id is not None and ident != self.thread_id):
+                    continue
+                self.stacks[_fold(frame, self.root or names.get(ident, str(ident)))] += 1
+                self.samples += 1
+
+
+def _fold(frame, root: str) -> str:
+    """Collapsed stack of a frame, outermost call first"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(root)
+    return ';'.join(reversed(names))
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the source tree or site-packages, to keep frame names short"""
+    if filename.startswith(SOURCE_ROOT):
+        return filename[len(SOURCE_ROOT):]
+    index = filename.rfind('site-packages' + os.sep)
+    if index >= 0:
+        return filename[index + len('site-packages' + os.sep):]
+    return os.path.basename(filename)
+
+
+def authorized(token: Optional[str]) -> bool:
+    """Whether ``token`` is the configured profiling admin token"""
+    expected = settings.profiling_admin_token
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+def new_profile_id(kind: str) -> str:
+    return f"{kind}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{uuid4().hex[:8]}"
+
+
+def save_profile(profile_id: str, stacks: Counter) -> Path:
+    """Write folded stacks to the profile directory, returning the file path.
+    
+    Only the newest ``profiling_max_files`` profiles are kept.
+    """
+    directory = Path(settings.profiling_output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{profile_id}{FOLDED_SUFFIX}"
+    partial = directory / f".{profile_id}{FOLDED_SUFFIX}"
+    with open(partial, 'w') as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    os.replace(partial, path)
+    
+    profiles = sorted(directory.glob(f"*{FOLDED_SUFFIX}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in profiles[settings.profiling_max_files:]:
+        stale.unlink(missing_ok=True)
+    return path
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Path of a saved profile, or None if there is no such profile"""
+    if os.sep in profile_id or profile_id.startswith('.'):
+        return None
+    path = Path(settings.profiling_output_dir) / f"{profile_id}{FOLDED_SUFFIX}"
+    return path if path.is_file() else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling single requests on demand.
+    
+    A request carrying the profiling admin token in the ``X-Profile-Token``
+    header is sampled while its task runs on the event loop, and the
+    profile is saved once the response is complete; its id is returned in
+    the ``X-Profile-Id`` response header. Other requests only pay for one
+    header lookup, and no sampler runs.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'].startswith(ADMIN_PATH_PREFIX):
+            await self.app(scope, receive, send)
+            return
+        token = next((value for name, value in scope['headers'] if name == PROFILE_HEADER), None)
+        if token is None or not authorized(token.decode('latin-1')):
+            await self.app(scope, receive, send)
+            return
+        
+        profile_id = new_profile_id('request')
+        
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start':
+                message = {**message, 'headers': [*message.get('headers', []), (PROFILE_ID_HEADER, profile_id.encode())]}
+            await send(message)
+        
+        sampler = StackSampler(
+            settings.profiling_interval_seconds,
+            thread_id=threading.get_ident(),
+            task=asyncio.current_task(),
+            loop=asyncio.get_running_loop(),
+            root=f"{scope['method']} {scope['path']}"
+        )
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            path = save_profile(profile_id, sampler.stop())
+            logger.info(f"Saved request profile {path} ({sampler.samples} samples)")
@@ -0,0 +1,73 @@
+import asyncio
+from typing import AsyncIterator, Dict, Optional
+
+
+class Topic:
+    """Latest message of a topic and a future resolved on the next publish"""
+    
+    def __init__(self):
+        self.version = 0
+        self.message: Optional[bytes] = None
+        self.closed = False
+        self.changed = asyncio.get_running_loop().create_future()
+
+
+class Broadcaster:
+    """In-process pub/sub that fans out the latest message of each topic.
+    
+    A publish encodes its message once and resolves a single future that
+    every subscriber of the topic awaits, so its cost does not depend on
+    the number of subscribers. Subscribers always receive the newest
+    message; one that falls behind skips intermediate ones instead of
+    buffering them.
+    """
+    
+    def __init__(self):
+        self.topics: Dict[str, Topic] = {}
+    
+    def publish(self, key: str, message: bytes, final: bool = False):
+        """Publish a message; a final message closes the topic"""
+        topic = self.topics.get(key)
+        if topic is None:
+            topic = self.topics[key] = Topic()
+        topic.version += 1
+        topic.message = message
+        changed, topic.changed = topic.changed, asyncio.get_running_loop().create_future()
+        changed.set_result(None)
+        if final:
+            topic.closed = True
+            # Current subscribers keep their reference and still see the final message
+            del self.topics[key]
+    
+    def version(self, key: str) -> Optional[int]:
+        """Number of messages published to an open topic, None if closed or unknown"""
+        topic = self.topics.get(key)
+        return topic.version if topic is not None else None
+    
+    async def subscribe(
+        self,
+        key: str,
+        keepalive_seconds: float,
+        keepalive: bytes = b'',
+        since: int = 0
+    ) -> AsyncIterator[bytes]:
+        """Yield the latest message on every change until the topic closes.
+        
+        Messages up to version ``since`` are considered seen. ``keepalive``
+        is yielded whenever nothing was published for ``keepalive_seconds``.
+        """
+        topic = self.topics.get(key)
+        if topic is None:
+            return
+        seen = since
+        while True:
+            if topic.version > seen:
+                seen = topic.version
+                yield topic.message
+                if topic.closed:
+                    return
+                continue
+            try:
+                await asyncio.wait_for(asyncio.shield(topic.changed), keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield keepalive
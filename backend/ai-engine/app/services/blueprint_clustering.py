@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class MiniBatchKMeans:
+    """Online mini-batch k-means over blueprint embeddings.
+    
+    Blueprints arrive as integer-encoded resource-type sets and are embedded
+    with signed feature hashing into unit vectors. Points are buffered and
+    folded in one mini-batch at a time: each point moves its nearest
+    centroid towards it with a per-centroid learning rate of
+    1 / (points assigned so far). Per-cluster statistics are accumulated at
+    assignment time so patterns can be read from the cached centroids
+    without re-clustering. Each blueprint is a member of at most one
+    cluster: replacing or removing it takes its point back out of the
+    cluster statistics and the centroid.
+    """
+    
+    def __init__(self, n_clusters: int, dim: int, batch_size: int, max_examples: int = 3, seed: Optional[int] = None):
+        self.n_clusters = n_clusters
+        self.dim = dim
+        self.batch_size = batch_size
+        self.max_examples = max_examples
+        self.rng = np.random.default_rng(seed)
+        self.centroids: Optional[np.ndarray] = None
+        self.counts = np.zeros(n_clusters, dtype=np.int64)
+        self.squared_distance_sums = np.zeros(n_clusters, dtype=np.float64)
+        self.item_counts = np.zeros((n_clusters, 0), dtype=np.int64)
+        self.examples: List[List[str]] = [[] for _ in range(n_clusters)]
+        self.pending: Dict[str, Tuple[int, ...]] = {}
+        # Folded-in blueprints: (cluster, items, squared distance at assignment)
+        self.members: Dict[str, Tuple[int, Tuple[int, ...], float]] = {}
+        self.version = 0
+    
+    def __len__(self) -> int:
+        return len(self.members) + len(self.pending)
+    
+    def add(self, blueprint_id: str, items: Tuple[int, ...]):
+        """Queue a new or replaced blueprint, folding in a mini-batch once enough are queued"""
+        member = self.members.get(blueprint_id)
+        if member is not None and member[1] == items:
+            return
+        self.remove(blueprint_id)
+        self.pending[blueprint_id] = items
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def remove(self, blueprint_id: str):
+        """Take a blueprint out of its cluster, or out of the queue"""
+        if self.pending.pop(blueprint_id, None) is not None:
+            return
+        member = self.members.pop(blueprint_id, None)
+        if member is None:
+            return
+        cluster, items, squared_distance = member
+        point = self._embed(np.array([len(items)], dtype=np.int64), np.array(items, dtype=np.int64))[0]
+        count = self.counts[cluster] - 1
+        # Inverse of the running-mean update; an emptied cluster keeps its position
+        if count:
+            self.centroids[cluster] += (self.centroids[cluster] - point) / count
+        self.counts[cluster] = count
+        self.squared_distance_sums[cluster] = max(0.0, self.squared_distance_sums[cluster] - squared_distance)
+        self.item_counts[cluster, list(items)] -= 1
+        if blueprint_id in self.examples[cluster]:
+            self.examples[cluster].remove(blueprint_id)
+        self.version += 1
+    
+    def flush(self):
+        """Fold all queued blueprints into the centroids"""
+        if not self.pending:
+            return
+        if self.centroids is None and len(self.pending) < self.n_clusters:
+            return
+        
+        pending_ids = list(self.pending)
+        pending_items = list(self.pending.values())
+        lengths = np.fromiter((len(items) for items in pending_items), dtype=np.int64)
+        flat = np.fromiter((item for items in pending_items for item in items), dtype=np.int64)
+        points = self._embed(lengths, flat)
+        if self.centroids is None:
+            self.centroids = self._seed(points)
+        
+        distances = self._squared_distances(points)
+        assigned = distances.argmin(axis=1)
+        nearest = distances[np.arange(len(points)), assigned]
+        
+        for cluster in np.unique(assigned).tolist():
+            members = assigned == cluster
+            n = int(members.sum())
+            # Equivalent to n sequential updates with rate 1 / count
+            self.centroids[cluster] += (
+                points[members].sum(axis=0) - n * self.centroids[cluster]
+            ) / (self.counts[cluster] + n)
+            self.counts[cluster] += n
+            self.squared_distance_sums[cluster] += float(nearest[members].sum())
+        
+        if len(flat) and flat.max() >= self.item_counts.shape[1]:
+            grown = np.zeros((self.n_clusters, int(flat.max()) + 1), dtype=np.int64)
+            grown[:, :self.item_counts.shape[1]] = self.item_counts
+            self.item_counts = grown
+        np.add.at(self.item_counts, (np.repeat(assigned, lengths), flat), 1)
+        
+        for blueprint_id, items, cluster, squared_distance in zip(
+            pending_ids, pending_items, assigned.tolist(), nearest.tolist()
+        ):
+            self.members[blueprint_id] = (cluster, items, squared_distance)
+            if len(self.examples[cluster]) < self.max_examples:
+                self.examples[cluster].append(blueprint_id)
+        
+        self.pending = {}
+        self.version += 1
+    
+    def _embed(self, lengths: np.ndarray, flat: np.ndarray) -> np.ndarray:
+        """Unit-length signed feature-hashing embeddings of item sets"""
+        # Knuth multiplicative hash: low bits pick the slot, a high bit the sign
+        digest = (flat * 2654435761) % (1 << 32)
+        columns = digest % self.dim
+        signs = np.where((digest >> 16) & 1, 1.0, -1.0)
+        
+        points = np.zeros((len(lengths), self.dim), dtype=np.float64)
+        np.add.at(points, (np.repeat(np.arange(len(lengths)), lengths), columns), signs)
+        norms = np.linalg.norm(points, axis=1, keepdims=True)
+        return np.divide(points, norms, out=points, where=norms > 0)
+    
+    def _squared_distances(self, points: np.ndarray) -> np.ndarray:
+        return (
+            (points ** 2).sum(axis=1)[:, None]
+            - 2 * points @ self.centroids.T
+            + (self.centroids ** 2).sum(axis=1)[None, :]
+        ).clip(min=0)
+    
+    def _seed(self, points: np.ndarray) -> np.ndarray:
+        """k-means++ seeding from the first batch"""
+        centroids = [points[self.rng.integers(len(points))]]
+        closest = ((points - centroids[0]) ** 2).sum(axis=1)
+        for _ in range(1, self.n_clusters):
+            total = closest.sum()
+            index = self.rng.choice(len(points), p=closest / total) if total > 0 else self.rng.integers(len(points))
+            centroids.append(points[index])
+            closest = np.minimum(closest, ((points - points[index]) ** 2).sum(axis=1))
+        return np.array(centroids, dtype=np.float64)
@@ -0,0 +1,138 @@
+import csv
+import json
+import glob
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.services.model_trainers import PreparedData, hash_text_features, densify
+
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson'
+}
+
+
+def resolve_shards(pattern: str, root: str) -> List[str]:
+    """Dataset shard files for a file, directory or glob under ``root``"""
+    base = Path(root).resolve()
+    target = base / pattern
+    if glob.has_magic(pattern):
+        candidates = [Path(path) for path in glob.glob(str(target), recursive=True)]
+    elif target.is_dir():
+        candidates = list(target.iterdir())
+    else:
+        candidates = [target]
+    
+    shards = sorted(
+        str(path.resolve()) for path in candidates
+        if path.is_file() and path.suffix.lower() in FORMAT_EXTENSIONS
+    )
+    if any(not Path(shard).is_relative_to(base) for shard in shards):
+        raise ValueError("Dataset path must stay inside the training data directory")
+    if not shards:
+        raise ValueError(f"No dataset shards found for '{pattern}'")
+    return shards
+
+
+def dataset_format(shards: List[str], declared: Optional[str]) -> str:
+    if declared:
+        return declared
+    formats = {FORMAT_EXTENSIONS[Path(shard).suffix.lower()] for shard in shards}
+    if len(formats) > 1:
+        raise ValueError("Dataset shards mix formats; set the dataset format explicitly")
+    return formats.pop()
+
+
+def iter_chunks(shards: List[str], data_format: str, columns: List[str], chunk_rows: int) -> Iterator[Dict[str, list]]:
+    """Column values of consecutive rows, at most ``chunk_rows`` per chunk"""
+    for shard in shards:
+        if data_format == 'parquet':
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ValueError("Parquet datasets require pyarrow")
+            for batch in pq.ParquetFile(shard).iter_batches(batch_size=chunk_rows, columns=columns):
+                yield batch.to_pydict()
+            continue
+        
+        with open(shard, newline='' if data_format == 'csv' else None) as f:
+            rows = csv.DictReader(f) if data_format == 'csv' else (json.loads(line) for line in f if line.strip())
+            chunk = {column: [] for column in columns}
+            for row in rows:
+                for column in columns:
+                    try:
+                        chunk[column].append(row[column])
+                    except KeyError:
+                        raise ValueError(f"Column '{column}' missing in {shard}")
+                if len(chunk[columns[0]]) >= chunk_rows:
+                    yield chunk
+                    chunk = {column: [] for column in columns}
+            if chunk[columns[0]]:
+                yield chunk
+
+
+def prepare_dataset(dataset: Dict[str, Any], parameters: Dict[str, Any], scratch_dir: str, reporter) -> PreparedData:
+    """Encode a dataset on disk into memory-mapped arrays in ``scratch_dir``.
+    
+    Shards are read once, chunk by chunk, so memory use is bounded by the
+    chunk size; training then reads rows back from the mapped arrays.
+    """
+    scratch = Path(scratch_dir)
+    text_column = dataset.get('text_column')
+    feature_columns = dataset.get('feature_columns') or []
+    label_column = dataset['label_column']
+    columns = [label_column] + ([text_column] if text_column else feature_columns)
+    n_features = int(parameters.get('n_features', 4096)) if text_column else len(feature_columns)
+    
+    label_codes: Dict[str, int] = {}
+    n_samples = 0
+    n_indices = 0
+    feature_sum = np.zeros(n_features, dtype=np.float64)
+    feature_square_sum = np.zeros(n_features, dtype=np.float64)
+    
+    with open(scratch / 'labels.i32', 'wb') as labels_file, \
+            open(scratch / 'indptr.i64', 'wb') as indptr_file, \
+            open(scratch / 'values.bin', 'wb') as values_file:
+        indptr_file.write(np.zeros(1, dtype=np.int64).tobytes())
+        for chunk in iter_chunks(dataset['shards'], dataset['format'], columns, dataset['chunk_rows']):
+            labels = np.array(
+                [label_codes.setdefault(str(label), len(label_codes)) for label in chunk[label_column]],
+                dtype=np.int32
+            )
+            labels_file.write(labels.tobytes())
+            
+            if text_column:
+                indptr, indices = hash_text_features([str(text or '') for text in chunk[text_column]], n_features)
+                indptr_file.write((indptr[1:] + n_indices).tobytes())
+                values_file.write(indices.astype(np.int32).tobytes())
+                n_indices += len(indices)
+            else:
+                features = np.array([chunk[column] for column in feature_columns], dtype=np.float32).T
+                feature_sum += features.sum(axis=0)
+                feature_square_sum += np.square(features, dtype=np.float64).sum(axis=0)
+                values_file.write(features.tobytes())
+            
+            n_samples += len(labels)
+            reporter.report('preparing_data', 0.05, {'rows': n_samples})
+    
+    if not n_samples:
+        raise ValueError("Dataset is empty")
+    
+    labels = np.fromfile(scratch / 'labels.i32', dtype=np.int32)
+    classes = np.array(list(label_codes), dtype=str)
+    
+    if text_column:
+        indptr = np.memmap(scratch / 'indptr.i64', dtype=np.int64, mode='r')
+        indices = np.memmap(scratch / 'values.bin', dtype=np.int32, mode='r', shape=(n_indices,)) if n_indices else np.zeros(0, dtype=np.int32)
+        return PreparedData('texts', labels, classes, n_features, lambda rows: densify(indptr, indices, rows, n_features))
+    
+    matrix = np.memmap(scratch / 'values.bin', dtype=np.float32, mode='r', shape=(n_samples, n_features))
+    mean = feature_sum / n_samples
+    std = np.sqrt(np.maximum(feature_square_sum / n_samples - mean ** 2, 0.0))
+    mean, std = mean.astype(np.float32), np.where(std > 0, std, 1.0).astype(np.float32)
+    return PreparedData('features', labels, classes, n_features, lambda rows: (matrix[rows] - mean) / std, mean, std)
@@ -0,0 +1,99 @@
+import re
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+# Variable parts of error messages, tried left to right at each position.
+# Earlier alternatives win, so specific shapes precede generic numbers.
+VARIABLE_PATTERNS = [
+    ('timestamp', r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?'),
+    ('uuid', r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b'),
+    ('url', r'\b[a-z][a-z0-9+.-]*://[^\s\'"]+'),
+    ('resource_id', r'/subscriptions/[^\s\'"]+'),
+    ('ip', r'\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b|\b(?:[0-9a-f]{1,4}:){2,7}[0-9a-f]{1,4}\b'),
+    ('host', r'\b(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.){2,}[a-z]{2,63}\b'),
+    ('quoted', r'\'[^\'\n]*\'|"[^"\n]*"'),
+    ('hex', r'\b0x[0-9a-f]+\b|\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b'),
+    ('number', r'\b\d+(?:\.\d+)?\b')
+]
+PLACEHOLDERS = {
+    'timestamp': '<ts>',
+    'uuid': '<id>',
+    'url': '<url>',
+    'resource_id': '<resource-id>',
+    'ip': '<ip>',
+    'host': '<host>',
+    'quoted': "'<*>'",
+    'hex': '<id>',
+    'number': '<num>'
+}
+VARIABLE_REGEX = re.compile(
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in VARIABLE_PATTERNS),
+    re.IGNORECASE
+)
+WHITESPACE_REGEX = re.compile(r'\s+')
+
+
+def normalize_error(message: str, max_length: int = 500) -> str:
+    """Template of an error message with ids, numbers, hosts and timestamps masked"""
+    template = VARIABLE_REGEX.sub(lambda match: PLACEHOLDERS[match.lastgroup], message)
+    return WHITESPACE_REGEX.sub(' ', template).strip()[:max_length]
+
+
+@dataclass
+class ErrorSignature:
+    signature_id: str
+    template: str
+    sample: str
+    count: int = 0
+
+
+class ErrorSignatureTable:
+    """Bounded table folding raw error messages into normalized signatures.
+    
+    Signatures are indexed by template, and recently seen raw messages map
+    straight to their template, so repeated log lines skip the regex pass.
+    The message cache is keyed by a digest of the message, so its size
+    does not depend on message length. Both maps are LRU-bounded; the
+    least recently seen entry is evicted first.
+    """
+    
+    def __init__(self, max_signatures: int, max_cached_messages: int, max_template_length: int = 500):
+        self.max_signatures = max_signatures
+        self.max_cached_messages = max_cached_messages
+        self.max_template_length = max_template_length
+        self.signatures: "OrderedDict[str, ErrorSignature]" = OrderedDict()
+        self.message_templates: "OrderedDict[bytes, str]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self.signatures)
+    
+    def add(self, message: str) -> ErrorSignature:
+        """Count one occurrence of a raw message, returning its signature"""
+        digest = hashlib.blake2b(message.encode(), digest_size=16).digest()
+        template = self.message_templates.get(digest)
+        if template is None:
+            template = normalize_error(message, self.max_template_length)
+            self.message_templates[digest] = template
+            if len(self.message_templates) > self.max_cached_messages:
+                self.message_templates.popitem(last=False)
+        else:
+            self.message_templates.move_to_end(digest)
+        
+        signature = self.signatures.get(template)
+        if signature is None:
+            signature = self.signatures[template] = ErrorSignature(
+                signature_id=hashlib.blake2b(template.encode(), digest_size=8).hexdigest(),
+                template=template,
+                sample=message[:self.max_template_length]
+            )
+            if len(self.signatures) > self.max_signatures:
+                self.signatures.popitem(last=False)
+        else:
+            self.signatures.move_to_end(template)
+        signature.count += 1
+        return signature
+    
+    def get(self, template: str) -> Optional[ErrorSignature]:
+        return self.signatures.get(template)
@@ -0,0 +1,223 @@
+import time
+import bisect
+from datetime import datetime, timezone
+from typing import Callable, List, Dict, Optional
+
+import numpy as np
+
+from app.models import DeploymentEvent
+
+# Column name -> dtype. String columns are dictionary-encoded, -1 means missing.
+EVENT_COLUMNS = {
+    'timestamp': np.int64,      # epoch milliseconds
+    'deployment': np.int32,
+    'status': np.int32,
+    'strategy': np.int32,
+    'environment': np.int32,
+    'resource': np.int32,
+    'error': np.int32,
+    'duration': np.float32      # seconds, NaN when unknown
+}
+STRING_COLUMNS = ('deployment', 'status', 'strategy', 'environment', 'resource', 'error')
+# Rows allocated for a new segment at least; segments then grow by doubling
+MIN_SEGMENT_CAPACITY = 16
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Epoch milliseconds, treating naive datetimes as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+class StringDictionary:
+    """Bidirectional string <-> integer code mapping"""
+    
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+    
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+    
+    def find(self, value: str) -> int:
+        """Code of an existing value, or -1 without adding it"""
+        return self.codes.get(value, -1)
+    
+    def decode(self, code: int) -> Optional[str]:
+        return self.values[code] if code >= 0 else None
+    
+    def compact(self, keep: Callable[[str], bool], fallback: Optional[str] = None) -> np.ndarray:
+        """Drop the values not kept, recoding them as ``fallback``.
+        
+        Returns the new code of each old code, indexed by old code + 1 so
+        that -1 (missing) maps to itself.
+        """
+        values = self.values
+        self.codes, self.values = {}, []
+        fallback_code = self.encode(fallback)
+        mapping = np.empty(len(values) + 1, dtype=np.int32)
+        mapping[0] = -1
+        for code, value in enumerate(values):
+            mapping[code + 1] = self.encode(value) if keep(value) or value == fallback else fallback_code
+        return mapping
+
+
+class EventSegment:
+    """Append-only columns of the events in one time partition"""
+    
+    def __init__(self, capacity: int = MIN_SEGMENT_CAPACITY):
+        self.size = 0
+        self.min_timestamp = np.iinfo(np.int64).max
+        self.max_timestamp = np.iinfo(np.int64).min
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in EVENT_COLUMNS.items()}
+    
+    def extend(self, batch: Dict[str, np.ndarray]):
+        count = len(batch['timestamp'])
+        capacity = len(self.columns['timestamp'])
+        if self.size + count > capacity:
+            capacity = max(capacity * 2, self.size + count)
+            for name, column in self.columns.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self.size] = column[:self.size]
+                self.columns[name] = grown
+        for name, column in self.columns.items():
+            column[self.size:self.size + count] = batch[name]
+        self.size += count
+        self.min_timestamp = min(self.min_timestamp, int(batch['timestamp'].min()))
+        self.max_timestamp = max(self.max_timestamp, int(batch['timestamp'].max()))
+    
+    def view(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+
+class DeploymentEventStore:
+    """Columnar store of deployment outcomes and errors.
+    
+    Events are appended into segments partitioned by fixed time windows.
+    Each segment records its min/max timestamp, so a time-range scan only
+    touches the partitions that overlap the range. With a retention
+    period, partitions that end before it are dropped on append, and
+    events older than it are not stored. ``version`` changes on every
+    append.
+    """
+    
+    def __init__(self, partition_seconds: int = 3600, retention_seconds: Optional[float] = None):
+        self.partition_ms = partition_seconds * 1000
+        self.retention_ms = None if retention_seconds is None else int(retention_seconds * 1000)
+        self.segments: Dict[int, EventSegment] = {}
+        self.partition_keys: List[int] = []
+        self.dictionaries = {name: StringDictionary() for name in STRING_COLUMNS}
+        self.version = 0
+    
+    def __len__(self) -> int:
+        return sum(segment.size for segment in self.segments.values())
+    
+    def append(self, events: List[DeploymentEvent], errors: Optional[List[Optional[str]]] = None) -> int:
+        """Encode and append events, returning the number stored.
+        
+        ``errors`` replaces the events' own error strings, e.g. with their
+        normalized signatures.
+        """
+        if self.retention_ms is not None:
+            cutoff_ms = int(time.time() * 1000) - self.retention_ms
+            self.prune(cutoff_ms)
+            kept = [i for i, e in enumerate(events) if to_epoch_ms(e.timestamp) >= cutoff_ms]
+            if len(kept) < len(events):
+                events = [events[i] for i in kept]
+                errors = None if errors is None else [errors[i] for i in kept]
+        if not events:
+            return 0
+        
+        batch = {
+            'timestamp': np.array([to_epoch_ms(e.timestamp) for e in events], dtype=np.int64),
+            'duration': np.array(
+                [np.nan if e.duration_seconds is None else e.duration_seconds for e in events],
+                dtype=np.float32
+            )
+        }
+        for name in STRING_COLUMNS:
+            encode = self.dictionaries[name].encode
+            if name == 'error' and errors is not None:
+                values = errors
+            else:
+                field = 'deployment_id' if name == 'deployment' else name
+                values = [getattr(e, field) for e in events]
+            batch[name] = np.array([encode(value) for value in values], dtype=np.int32)
+        
+        partitions = batch['timestamp'] // self.partition_ms
+        for key in np.unique(partitions).tolist():
+            mask = partitions == key
+            segment = self.segments.get(key)
+            if segment is None:
+                segment = self.segments[key] = EventSegment(max(int(mask.sum()), MIN_SEGMENT_CAPACITY))
+                bisect.insort(self.partition_keys, key)
+            segment.extend({name: column[mask] for name, column in batch.items()})
+        
+        self.version += 1
+        return len(events)
+    
+    def prune(self, before_ms: int) -> int:
+        """Drop the partitions whose events all precede ``before_ms``, returning the events dropped"""
+        count = bisect.bisect_left(self.partition_keys, before_ms // self.partition_ms)
+        if not count:
+            return 0
+        dropped = sum(self.segments.pop(key).size for key in self.partition_keys[:count])
+        del self.partition_keys[:count]
+        self.version += 1
+        return dropped
+    
+    def scan(
+        self,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        deployment_ids: Optional[List[str]] = None
+    ) -> Dict[str, np.ndarray]:
+        """Columns of the events in ``[start_ms, end_ms]`` for the given deployments"""
+        low = 0 if start_ms is None else bisect.bisect_left(self.partition_keys, start_ms // self.partition_ms)
+        high = len(self.partition_keys) if end_ms is None else bisect.bisect_right(self.partition_keys, end_ms // self.partition_ms)
+        
+        segments = [
+            segment for segment in (self.segments[key] for key in self.partition_keys[low:high])
+            if (start_ms is None or segment.max_timestamp >= start_ms)
+            and (end_ms is None or segment.min_timestamp <= end_ms)
+        ]
+        if not segments:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in EVENT_COLUMNS.items()}
+        
+        columns = {
+            name: np.concatenate([segment.view(name) for segment in segments])
+            for name in EVENT_COLUMNS
+        }
+        
+        mask = np.ones(len(columns['timestamp']), dtype=bool)
+        if start_ms is not None:
+            mask &= columns['timestamp'] >= start_ms
+        if end_ms is not None:
+            mask &= columns['timestamp'] <= end_ms
+        if deployment_ids:
+            codes = [self.dictionaries['deployment'].find(d) for d in deployment_ids]
+            mask &= np.isin(columns['deployment'], codes)
+        if mask.all():
+            return columns
+        return {name: column[mask] for name, column in columns.items()}
+    
+    def decode(self, column: str, code: int) -> Optional[str]:
+        return self.dictionaries[column].decode(code)
+    
+    def compact(self, column: str, keep: Callable[[str], bool], fallback: Optional[str] = None):
+        """Bound a string column's dictionary by recoding stored values that are not kept"""
+        mapping = self.dictionaries[column].compact(keep, fallback)
+        for segment in self.segments.values():
+            codes = segment.view(column)
+            codes[:] = mapping[codes + 1]
+        self.version += 1
+    
+    def find(self, column: str, value: str) -> int:
+        return self.dictionaries[column].find(value)
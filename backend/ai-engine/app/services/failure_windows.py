@@ -0,0 +1,149 @@
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+HOUR_MS = 3_600_000
+
+
+class CountRing:
+    """Fixed-size ring buffer of event counts per time bucket.
+    
+    Slot ``bucket % size`` holds the count of absolute bucket ``bucket``;
+    slots are zeroed as the ring advances past them, so memory stays fixed
+    while the ring always covers the latest ``size`` buckets.
+    """
+    
+    def __init__(self, bucket_ms: int, size: int):
+        self.bucket_ms = bucket_ms
+        self.size = size
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.head: Optional[int] = None
+    
+    def advance(self, bucket: int):
+        """Move the newest bucket forward, clearing the slots it wraps over"""
+        if self.head is None:
+            self.head = bucket
+            return
+        if bucket <= self.head:
+            return
+        if bucket - self.head >= self.size:
+            self.counts[:] = 0
+        else:
+            self.counts[np.arange(self.head + 1, bucket + 1) % self.size] = 0
+        self.head = bucket
+    
+    def add(self, timestamp_ms: int, count: int = 1) -> bool:
+        """Count an event, returning False when it is older than the ring"""
+        bucket = timestamp_ms // self.bucket_ms
+        self.advance(bucket)
+        if bucket <= self.head - self.size:
+            return False
+        self.counts[bucket % self.size] += count
+        return True
+    
+    def window(self, buckets: int, offset: int = 0) -> int:
+        """Sum of ``buckets`` consecutive buckets ending ``offset`` buckets before the head"""
+        if self.head is None:
+            return 0
+        end = self.head - offset
+        return int(self.counts[np.arange(end - buckets + 1, end + 1) % self.size].sum())
+
+
+class FailureWindowState:
+    """Window counters for one (error signature, resource) key"""
+    
+    def __init__(self, bucket_ms: int, buckets: int, days: int):
+        # Sliding windows over fine-grained buckets
+        self.recent = CountRing(bucket_ms, buckets)
+        # Tumbling hourly windows; days * 24 slots line up with hour of day
+        self.hourly = CountRing(HOUR_MS, days * 24)
+        self.total = 0
+        self.last_seen_ms = 0
+        self.last_deployment_id: Optional[str] = None
+    
+    def observe(self, timestamp_ms: int, deployment_id: Optional[str]):
+        self.recent.add(timestamp_ms)
+        self.hourly.add(timestamp_ms)
+        self.total += 1
+        if timestamp_ms >= self.last_seen_ms:
+            self.last_seen_ms = timestamp_ms
+            self.last_deployment_id = deployment_id
+    
+    def advance(self, watermark_ms: int):
+        self.recent.advance(watermark_ms // self.recent.bucket_ms)
+        self.hourly.advance(watermark_ms // HOUR_MS)
+    
+    def hour_of_day(self) -> np.ndarray:
+        """Counts per hour of day, one row per retained day"""
+        return self.hourly.counts.reshape(-1, 24)
+
+
+class FailureWindowAggregator:
+    """Streaming aggregator of failure events keyed by error signature and resource.
+    
+    State is updated as events arrive and read as of the event-time
+    watermark (the newest timestamp seen), so queries never rescan history.
+    The number of keys is bounded; the least recently failing key is
+    evicted first.
+    """
+    
+    def __init__(self, bucket_seconds: int, buckets: int, days: int, max_keys: int):
+        self.bucket_ms = bucket_seconds * 1000
+        self.buckets = buckets
+        self.days = days
+        self.max_keys = max_keys
+        self.states: "OrderedDict[Tuple[str, Optional[str]], FailureWindowState]" = OrderedDict()
+        self.watermark_ms = 0
+    
+    def observe(self, signature: str, resource: Optional[str], timestamp_ms: int, deployment_id: Optional[str] = None):
+        key = (signature, resource)
+        state = self.states.get(key)
+        if state is None:
+            state = self.states[key] = FailureWindowState(self.bucket_ms, self.buckets, self.days)
+            if len(self.states) > self.max_keys:
+                self.states.popitem(last=False)
+        else:
+            self.states.move_to_end(key)
+        state.observe(timestamp_ms, deployment_id)
+        self.watermark_ms = max(self.watermark_ms, timestamp_ms)
+    
+    def summaries(self, min_count: int, spike_ratio: float, spike_min_days: int) -> List[Dict[str, Any]]:
+        """Window counts and hour-of-day spikes per key with enough recent failures"""
+        minutes_per_bucket = self.bucket_ms // 60_000
+        summaries = []
+        for (signature, resource), state in self.states.items():
+            state.advance(self.watermark_ms)
+            week = state.hourly.window(state.hourly.size)
+            if week < min_count:
+                continue
+            
+            by_day = state.hour_of_day()
+            histogram = by_day.sum(axis=0)
+            peak_hour = int(histogram.argmax())
+            days_at_peak = int((by_day[:, peak_hour] > 0).sum())
+            spike = (
+                histogram[peak_hour] >= spike_ratio * histogram.mean()
+                and days_at_peak >= spike_min_days
+            )
+            
+            summaries.append({
+                'signature': signature,
+                'resource': resource,
+                'total': state.total,
+                'window_counts': {
+                    'last_15m': state.recent.window(max(1, 15 // minutes_per_bucket)),
+                    'last_1h': state.recent.window(max(1, 60 // minutes_per_bucket)),
+                    'last_24h': state.recent.window(min(self.buckets, 24 * 60 // minutes_per_bucket)),
+                    'previous_hour': state.hourly.window(1, offset=1),
+                    f'last_{self.days}d': week
+                },
+                'peak_hour': peak_hour,
+                'peak_share': float(histogram[peak_hour]) / week,
+                'days_at_peak': days_at_peak,
+                'periodic_spike': bool(spike),
+                'last_seen_ms': state.last_seen_ms,
+                'last_deployment_id': state.last_deployment_id
+            })
+        
+        return summaries
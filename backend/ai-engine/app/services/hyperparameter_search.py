@@ -0,0 +1,159 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from app.models import HyperparameterSearch, SearchStrategy
+
+SEARCH_METRICS = ('accuracy', 'precision', 'recall', 'f1_score', 'loss')
+LOWER_IS_BETTER = ('loss',)
+
+
+@dataclass
+class Trial:
+    trial_id: int
+    parameters: Dict[str, Any]
+    status: str = 'pending'         # running, stopped, failed, cancelled or completed
+    epochs: int = 0
+    metrics: Dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def expand_trials(search: HyperparameterSearch, max_trials: int) -> List[Dict[str, Any]]:
+    """Parameter sets to try: the full grid, or ``n_trials`` random samples"""
+    if 'epochs' in search.space:
+        raise ValueError("'epochs' is the successive halving budget and cannot be searched")
+    if search.metric not in SEARCH_METRICS:
+        raise ValueError(f"Search metric must be one of {', '.join(SEARCH_METRICS)}")
+    if not search.space:
+        raise ValueError("Search space is empty")
+    names = sorted(search.space)
+    
+    if search.strategy == SearchStrategy.GRID:
+        for name in names:
+            if not isinstance(search.space[name], list) or not search.space[name]:
+                raise ValueError(f"Grid search requires a list of values for '{name}'")
+        size = int(np.prod([len(search.space[name]) for name in names]))
+        if size > max_trials:
+            raise ValueError(f"Grid has {size} trials, more than the limit of {max_trials}")
+        return [dict(zip(names, values)) for values in itertools.product(*(search.space[name] for name in names))]
+    
+    if search.n_trials is None:
+        raise ValueError("Random search requires n_trials")
+    if search.n_trials > max_trials:
+        raise ValueError(f"n_trials is more than the limit of {max_trials}")
+    rng = np.random.default_rng(search.seed)
+    return [{name: _sample(name, search.space[name], rng) for name in names} for _ in range(search.n_trials)]
+
+
+def _sample(name: str, spec: Any, rng: np.random.Generator) -> Any:
+    """One value from a list of choices or a {min, max, log} range"""
+    if isinstance(spec, list) and spec:
+        return spec[int(rng.integers(len(spec)))]
+    if isinstance(spec, dict) and 'min' in spec and 'max' in spec:
+        low, high = spec['min'], spec['max']
+        if spec.get('log'):
+            if low <= 0:
+                raise ValueError(f"Log range for '{name}' must be positive")
+            value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+        else:
+            value = float(rng.uniform(low, high))
+        return int(round(value)) if isinstance(low, int) and isinstance(high, int) else value
+    raise ValueError(f"Search space for '{name}' must be a list of values or a {{min, max}} range")
+
+
+def rung_budgets(n_trials: int, max_epochs: int, reduction_factor: int, min_epochs: int) -> List[int]:
+    """Epoch budget per rung, growing by ``reduction_factor`` up to ``max_epochs``"""
+    budgets = [max_epochs]
+    while reduction_factor ** len(budgets) < n_trials and budgets[0] // reduction_factor >= min_epochs:
+        budgets.insert(0, budgets[0] // reduction_factor)
+    return budgets
+
+
+class SuccessiveHalving:
+    """Trials of a hyperparameter search, pruned by successive halving.
+    
+    Every trial first trains with the smallest epoch budget. After each
+    rung only the best ``1 / reduction_factor`` of the trials by
+    ``metric`` are promoted to the next, larger budget; the rest are
+    stopped. Survivors of the last rung train for the full ``max_epochs``.
+    """
+    
+    def __init__(
+        self,
+        parameter_sets: List[Dict[str, Any]],
+        metric: str,
+        max_epochs: int,
+        reduction_factor: int,
+        min_epochs: int
+    ):
+        self.trials = [Trial(trial_id, parameters) for trial_id, parameters in enumerate(parameter_sets, start=1)]
+        self.metric = metric
+        self.reduction_factor = reduction_factor
+        self.budgets = rung_budgets(len(self.trials), max_epochs, reduction_factor, min_epochs)
+        self.survivors = list(self.trials)
+        
+        # Planned epochs over all rungs, for progress reporting
+        self.completed_epochs = 0
+        self.total_epochs = 0
+        remaining = len(self.trials)
+        for budget in self.budgets:
+            self.total_epochs += remaining * budget
+            remaining = max(1, remaining // reduction_factor)
+    
+    def record(self, trial: Trial, epochs: int, metrics: Dict[str, float]):
+        trial.epochs = epochs
+        trial.metrics = metrics
+        self.completed_epochs += epochs
+    
+    def fail(self, trial: Trial, epochs: int, error: str):
+        trial.status = 'failed'
+        trial.error = error
+        self.completed_epochs += epochs
+    
+    def promote(self):
+        """Keep the best survivors of the rung just run and stop the others"""
+        ranked = sorted((trial for trial in self.survivors if trial.status != 'failed'), key=self._score, reverse=True)
+        keep = max(1, len(self.survivors) // self.reduction_factor)
+        for trial in ranked[keep:]:
+            trial.status = 'stopped'
+        self.survivors = ranked[:keep]
+    
+    def finish(self):
+        for trial in self.survivors:
+            if trial.status != 'failed':
+                trial.status = 'completed'
+        self.survivors = []
+    
+    def best(self) -> Optional[Trial]:
+        """Best trial that completed the final rung"""
+        completed = [trial for trial in self.trials if trial.status == 'completed']
+        return max(completed, key=self._score) if completed else None
+    
+    def leaderboard(self) -> List[Dict[str, Any]]:
+        """Trials ranked by epochs reached, then by score; failed trials last"""
+        ranked = sorted(
+            self.trials,
+            key=lambda trial: (
+                trial.status != 'failed',
+                trial.epochs,
+                self._score(trial) if trial.metrics else float('-inf')
+            ),
+            reverse=True
+        )
+        return [
+            {
+                'trial': trial.trial_id,
+                'status': trial.status,
+                'epochs': trial.epochs,
+                'parameters': trial.parameters,
+                'metrics': trial.metrics,
+                **({'error': trial.error} if trial.error else {})
+            }
+            for trial in ranked
+        ]
+    
+    def _score(self, trial: Trial) -> float:
+        score = trial.metrics[self.metric]
+        return -score if self.metric in LOWER_IS_BETTER else score
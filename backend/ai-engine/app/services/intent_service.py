@@ -3,11 +3,16 @@ import re
 from typing import Dict, Any, List
 from uuid import uuid4
 
+from app.config import settings
+from app.metrics import stage_timer
 from app.models import (
     IntentAnalysisRequest,
     IntentAnalysisResponse,
-    Intent
+    Intent,
+    ModelVersionInfo
 )
+from app.services.model_registry import HotSwapModel
+from app.services.model_trainers import TextClassifier, CLASSIFIER_KIND
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +55,13 @@ class IntentAnalysisService:
         self.positive_keywords = ['good', 'great', 'excellent', 'perfect', 'love', 'awesome']
         self.negative_keywords = ['bad', 'terrible', 'awful', 'hate', 'poor', 'slow', 'broken']
         
+        # Trained intent classifier; patterns are used until a version is activated
+        self.intent_model = HotSwapModel(
+            settings.intent_model_name,
+            loader=self._load_intent_model,
+            warmup=lambda model: model.predict_proba(['warm up'])
+        )
+        
         logger.info("Intent Analysis Service initialized")
     
     async def analyze_intent(
@@ -61,16 +73,18 @@ class IntentAnalysisService:
         text = request.text.lower()
         
         # Detect intents
-        intents = self._detect_intents(text)
-        
-        # Analyze sentiment
-        sentiment, sentiment_score = self._analyze_sentiment(text)
+        with stage_timer('intent_detection'):
+            intents = self._detect_intents(text)
         
-        # Extract entities
-        entities = self._extract_entities(text)
-        
-        # Extract structured requirements
-        requirements = self._extract_requirements(text, entities)
+        with stage_timer('keyword_matching'):
+            # Analyze sentiment
+            sentiment, sentiment_score = self._analyze_sentiment(text)
+            
+            # Extract entities
+            entities = self._extract_entities(text)
+            
+            # Extract structured requirements
+            requirements = self._extract_requirements(text, entities)
         
         return IntentAnalysisResponse(
             primary_intent=intents[0] if intents else Intent(
@@ -86,11 +100,14 @@ class IntentAnalysisService:
     
     def _detect_intents(self, text: str) -> List[Intent]:
         """Detect user intents from text"""
+        classifier = self.intent_model.model
+        if classifier is not None:
+            return self._classify_intents(classifier, text)
+        
         intents = []
         
         for intent_type, patterns in self.intent_patterns.items():
             score = 0.0
-            matched_entities = {}
             
             for pattern in patterns:
                 if re.search(pattern, text, re.IGNORECASE):
@@ -99,18 +116,10 @@ class IntentAnalysisService:
             if score > 0:
                 confidence = min(score / len(patterns), 1.0)
                 
-                # Extract entities for this intent
-                if intent_type == 'create_infrastructure':
-                    matched_entities = self._extract_resource_entities(text)
-                elif intent_type == 'scale_infrastructure':
-                    matched_entities = self._extract_scaling_entities(text)
-                elif intent_type == 'optimize_cost':
-                    matched_entities = self._extract_cost_entities(text)
-                
                 intents.append(Intent(
                     intent_type=intent_type,
                     confidence=confidence,
-                    entities=matched_entities
+                    entities=self._intent_entities(intent_type, text)
                 ))
         
         # Sort by confidence
@@ -118,6 +127,34 @@ class IntentAnalysisService:
         
         return intents
     
+    def _classify_intents(self, classifier: TextClassifier, text: str) -> List[Intent]:
+        """Detect user intents with the trained classifier"""
+        probabilities = classifier.predict_proba([text])[0]
+        return [
+            Intent(
+                intent_type=classifier.classes[index],
+                confidence=float(probabilities[index]),
+                entities=self._intent_entities(classifier.classes[index], text)
+            )
+            for index in probabilities.argsort()[::-1].tolist()
+            if probabilities[index] >= settings.intent_model_min_confidence
+        ]
+    
+    def _intent_entities(self, intent_type: str, text: str) -> Dict[str, Any]:
+        """Extract entities for an intent"""
+        if intent_type == 'create_infrastructure':
+            return self._extract_resource_entities(text)
+        elif intent_type == 'scale_infrastructure':
+            return self._extract_scaling_entities(text)
+        elif intent_type == 'optimize_cost':
+            return self._extract_cost_entities(text)
+        return {}
+    
+    def _load_intent_model(self, info: ModelVersionInfo, path) -> TextClassifier:
+        if info.kind != CLASSIFIER_KIND:
+            raise ValueError(f"Unsupported intent model kind: {info.kind}")
+        return TextClassifier(path)
+    
     def _analyze_sentiment(self, text: str) -> tuple[str, float]:
         """Analyze sentiment of text"""
         positive_count = sum(1 for word in self.positive_keywords if word in text)
@@ -0,0 +1,185 @@
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+Itemset = Tuple[int, ...]
+
+
+class FPTree:
+    """FP-tree over integer items, stored as parallel node arrays"""
+    
+    def __init__(self):
+        self.item = [-1]
+        self.count = [0]
+        self.parent = [-1]
+        self.children: List[Dict[int, int]] = [{}]
+        self.header: Dict[int, List[int]] = defaultdict(list)
+    
+    def insert(self, items: Itemset, count: int):
+        node = 0
+        for item in items:
+            child = self.children[node].get(item)
+            if child is None:
+                child = len(self.item)
+                self.item.append(item)
+                self.count.append(0)
+                self.parent.append(node)
+                self.children.append({})
+                self.children[node][item] = child
+                self.header[item].append(child)
+            self.count[child] += count
+            node = child
+    
+    def prefix_paths(self, item: int) -> Dict[Itemset, int]:
+        """Conditional pattern base of ``item``: root paths weighted by the item's count"""
+        paths: Dict[Itemset, int] = {}
+        for node in self.header[item]:
+            path = []
+            parent = self.parent[node]
+            while parent > 0:
+                path.append(self.item[parent])
+                parent = self.parent[parent]
+            if path:
+                key = tuple(reversed(path))
+                paths[key] = paths.get(key, 0) + self.count[node]
+        return paths
+
+
+def fp_growth(
+    transactions: Dict[Itemset, int],
+    min_support: int,
+    max_size: int,
+    support: Optional[Counter] = None
+) -> List[Tuple[Itemset, int]]:
+    """Mine frequent itemsets from weighted transactions with FP-growth.
+    
+    ``transactions`` maps each distinct transaction to its multiplicity, so
+    identical blueprints are only inserted once. ``support`` may be passed
+    when item supports are already maintained by the caller.
+    """
+    results: List[Tuple[Itemset, int]] = []
+    _grow(transactions, min_support, max_size, (), results, support)
+    return [(tuple(sorted(itemset)), count) for itemset, count in results]
+
+
+def _grow(
+    transactions: Dict[Itemset, int],
+    min_support: int,
+    max_size: int,
+    suffix: Itemset,
+    results: List[Tuple[Itemset, int]],
+    support: Optional[Counter] = None
+):
+    if support is None:
+        support = Counter()
+        for transaction, count in transactions.items():
+            for item in transaction:
+                support[item] += count
+    
+    # Order frequent items by descending support so shared prefixes merge
+    rank = {
+        item: position for position, item in enumerate(sorted(
+            (item for item, count in support.items() if count >= min_support),
+            key=lambda item: (-support[item], item)
+        ))
+    }
+    if not rank:
+        return
+    
+    tree = FPTree()
+    for transaction, count in transactions.items():
+        items = sorted((item for item in transaction if item in rank), key=rank.__getitem__)
+        if items:
+            tree.insert(tuple(items), count)
+    
+    # Prefix paths only hold more frequent items, so each itemset is produced once
+    for item in sorted(rank, key=rank.__getitem__, reverse=True):
+        itemset = suffix + (item,)
+        results.append((itemset, support[item]))
+        if len(itemset) < max_size:
+            conditional = tree.prefix_paths(item)
+            if conditional:
+                _grow(conditional, min_support, max_size, itemset, results)
+
+
+class BlueprintCorpus:
+    """Integer-encoded resource-type transactions of stored blueprints.
+    
+    Item supports and distinct transaction counts are updated as blueprints
+    arrive, and ``version`` changes on every update so mined results can be
+    memoized per corpus version.
+    """
+    
+    def __init__(self, max_examples: int = 3):
+        self.max_examples = max_examples
+        self.item_ids: Dict[str, int] = {}
+        self.item_names: List[str] = []
+        self.blueprints: Dict[str, Itemset] = {}
+        self.transactions: Counter = Counter()
+        self.item_support: Counter = Counter()
+        self.examples: Dict[Itemset, List[str]] = defaultdict(list)
+        self.version = 0
+    
+    def __len__(self) -> int:
+        return len(self.blueprints)
+    
+    def encode(self, resource_types: List[str]) -> Itemset:
+        """Encode a set of resource types as a sorted tuple of item ids"""
+        ids = set()
+        for resource_type in resource_types:
+            item = self.item_ids.get(resource_type)
+            if item is None:
+                item = self.item_ids[resource_type] = len(self.item_names)
+                self.item_names.append(resource_type)
+            ids.add(item)
+        return tuple(sorted(ids))
+    
+    def decode(self, itemset: Itemset) -> List[str]:
+        return [self.item_names[item] for item in itemset]
+    
+    def add(self, blueprint_id: str, resources: List[Dict[str, Any]]):
+        """Add or replace a blueprint"""
+        self.remove(blueprint_id)
+        transaction = self.encode([
+            resource.get('type') or resource.get('resource_type')
+            for resource in resources
+            if resource.get('type') or resource.get('resource_type')
+        ])
+        if not transaction:
+            return
+        self.blueprints[blueprint_id] = transaction
+        self.transactions[transaction] += 1
+        self.item_support.update(transaction)
+        if len(self.examples[transaction]) < self.max_examples:
+            self.examples[transaction].append(blueprint_id)
+        self.version += 1
+    
+    def remove(self, blueprint_id: str):
+        transaction = self.blueprints.pop(blueprint_id, None)
+        if transaction is None:
+            return
+        self.transactions[transaction] -= 1
+        if not self.transactions[transaction]:
+            del self.transactions[transaction]
+            self.examples.pop(transaction, None)
+        elif blueprint_id in self.examples[transaction]:
+            self.examples[transaction].remove(blueprint_id)
+        self.item_support.subtract(transaction)
+        self.version += 1
+    
+    def subset(self, blueprint_ids: List[str]) -> Dict[Itemset, int]:
+        """Distinct transactions of the given blueprints with multiplicities"""
+        return Counter(
+            self.blueprints[blueprint_id] for blueprint_id in blueprint_ids
+            if blueprint_id in self.blueprints
+        )
+    
+    def find_examples(self, itemset: Itemset, limit: int) -> List[str]:
+        """Blueprint ids whose resource types contain ``itemset``"""
+        wanted = set(itemset)
+        found = []
+        for transaction, blueprint_ids in self.examples.items():
+            if wanted.issubset(transaction):
+                found.extend(blueprint_ids[:limit - len(found)])
+                if len(found) >= limit:
+                    break
+        return found
@@ -0,0 +1,266 @@
+import os
+import re
+import json
+import shutil
+import asyncio
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.models import ModelVersionInfo
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+ACTIVE = 'active.json'
+MODEL_NAME_PATTERN = re.compile(r'[A-Za-z0-9_-][A-Za-z0-9_.-]*')
+MAX_HISTORY = 20
+
+
+def file_checksum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_json_atomic(path: Path, data: Dict[str, Any]):
+    """Replace a JSON file so readers see either the old or the new content"""
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+
+class ModelRegistry:
+    """File-backed registry of model versions with an active pointer per model.
+    
+    Each version is an immutable directory ``<model>/<version>/`` holding
+    the artifact files and a manifest with metadata and SHA-256 checksums.
+    It is staged elsewhere and renamed into place, so readers never see a
+    partial version. ``<model>/active.json`` names the active version and
+    keeps the activation history with a pointer at the active entry, so a
+    rollback can be undone by rolling forward; it is replaced atomically.
+    """
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.staging = self.root / '.staging'
+        self.staging.mkdir(parents=True, exist_ok=True)
+    
+    def create_staging(self) -> str:
+        """Empty directory on the registry's filesystem to write artifacts into"""
+        return tempfile.mkdtemp(dir=self.staging)
+    
+    def publish(
+        self,
+        model_name: str,
+        source: str,
+        kind: str,
+        metrics: Optional[Dict[str, float]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> ModelVersionInfo:
+        """Move a staged artifact directory into the registry as the next version"""
+        if not MODEL_NAME_PATTERN.fullmatch(model_name):
+            raise ValueError(f"Invalid model name: {model_name}")
+        model_dir = self.root / model_name
+        model_dir.mkdir(parents=True, exist_ok=True)
+        source = Path(source)
+        
+        manifest = {
+            'model_name': model_name,
+            'kind': kind,
+            'created_at': datetime.utcnow().isoformat(),
+            'checksums': {
+                str(path.relative_to(source)): file_checksum(path)
+                for path in sorted(source.rglob('*')) if path.is_file()
+            },
+            'metrics': metrics or {},
+            'metadata': metadata or {}
+        }
+        
+        # Concurrent publishers race for the rename; the loser takes the next number
+        while True:
+            version = max(self.version_numbers(model_name), default=0) + 1
+            manifest['version'] = version
+            write_json_atomic(source / MANIFEST, manifest)
+            try:
+                os.rename(source, model_dir / str(version))
+                break
+            except OSError:
+                if not (model_dir / str(version)).exists():
+                    raise
+        
+        logger.info(f"Published {model_name} version {version}")
+        return self.get(model_name, version)
+    
+    def version_numbers(self, model_name: str) -> List[int]:
+        model_dir = self.root / model_name
+        if not MODEL_NAME_PATTERN.fullmatch(model_name) or not model_dir.is_dir():
+            return []
+        return sorted(int(path.name) for path in model_dir.iterdir() if path.name.isdigit())
+    
+    def list_versions(self, model_name: str) -> List[ModelVersionInfo]:
+        return [self.get(model_name, version) for version in self.version_numbers(model_name)]
+    
+    def get(self, model_name: str, version: int) -> Optional[ModelVersionInfo]:
+        path = self.path(model_name, version) / MANIFEST
+        if not MODEL_NAME_PATTERN.fullmatch(model_name) or not path.exists():
+            return None
+        manifest = json.loads(path.read_text())
+        return ModelVersionInfo(**manifest, active=self.active_version(model_name) == version)
+    
+    def path(self, model_name: str, version: int) -> Path:
+        return self.root / model_name / str(version)
+    
+    def active_version(self, model_name: str) -> Optional[int]:
+        path = self.root / model_name / ACTIVE
+        if not MODEL_NAME_PATTERN.fullmatch(model_name) or not path.exists():
+            return None
+        return json.loads(path.read_text())['version']
+    
+    def verify(self, model_name: str, version: int) -> bool:
+        """Whether every artifact file still matches its recorded checksum"""
+        info = self.get(model_name, version)
+        if info is None:
+            return False
+        directory = self.path(model_name, version)
+        return all(
+            (directory / name).is_file() and file_checksum(directory / name) == checksum
+            for name, checksum in info.checksums.items()
+        )
+    
+    def activate(self, model_name: str, version: int) -> Optional[ModelVersionInfo]:
+        """Point the model at a verified version, returning None if it does not exist"""
+        if self.get(model_name, version) is None:
+            return None
+        if not self.verify(model_name, version):
+            raise ValueError(f"Checksum mismatch for {model_name} version {version}")
+        
+        state = self._history(model_name)
+        if state['version'] != version:
+            # Activating discards the versions that were rolled back from
+            history = state['history'][:state['position'] + 1] + [version]
+            history = history[-MAX_HISTORY:]
+            write_json_atomic(
+                self.root / model_name / ACTIVE,
+                {'version': version, 'history': history, 'position': len(history) - 1}
+            )
+            logger.info(f"Activated {model_name} version {version}")
+        return self.get(model_name, version)
+    
+    def rollback(self, model_name: str) -> Optional[ModelVersionInfo]:
+        """Re-activate the previously active version, returning None if there is none"""
+        return self._step(model_name, -1)
+    
+    def roll_forward(self, model_name: str) -> Optional[ModelVersionInfo]:
+        """Undo a rollback, returning None if there is nothing to roll forward to"""
+        return self._step(model_name, 1)
+    
+    def _history(self, model_name: str) -> Dict[str, Any]:
+        path = self.root / model_name / ACTIVE
+        if not path.exists():
+            return {'version': None, 'history': [], 'position': -1}
+        return json.loads(path.read_text())
+    
+    def _step(self, model_name: str, direction: int) -> Optional[ModelVersionInfo]:
+        """Move the active pointer through the history, skipping deleted versions"""
+        state = self._history(model_name)
+        history = state['history']
+        position = state['position'] + direction
+        while 0 <= position < len(history) and (
+            history[position] == state['version'] or not self.path(model_name, history[position]).is_dir()
+        ):
+            position += direction
+        if not 0 <= position < len(history):
+            return None
+        version = history[position]
+        write_json_atomic(
+            self.root / model_name / ACTIVE,
+            {'version': version, 'history': history, 'position': position}
+        )
+        logger.info(f"{'Rolled back' if direction < 0 else 'Rolled forward'} {model_name} to version {version}")
+        return self.get(model_name, version)
+    
+    def discard_staging(self, path: str):
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@dataclass
+class LoadedModel:
+    version: Optional[int]
+    model: Any
+
+
+class HotSwapModel:
+    """Serving reference to a registry model that can be swapped while in use.
+    
+    A new version is loaded and warmed up in a worker thread, then the
+    reference is flipped in a single assignment. Requests that already
+    hold the old model finish with it, so none are dropped. The previous
+    model stays loaded, making a rollback to it an instant flip.
+    """
+    
+    def __init__(
+        self,
+        model_name: str,
+        loader: Callable[[ModelVersionInfo, Path], Any],
+        warmup: Callable[[Any], None],
+        initial: Any = None
+    ):
+        self.model_name = model_name
+        self.loader = loader
+        self.warmup = warmup
+        self.current = LoadedModel(None, initial)
+        self.previous: Optional[LoadedModel] = None
+        self.failed_version: Optional[int] = None
+        self.lock = asyncio.Lock()
+    
+    @property
+    def model(self) -> Any:
+        return self.current.model
+    
+    async def sync(self, registry: ModelRegistry):
+        """Serve the registry's active version if it is not served already"""
+        async with self.lock:
+            version = registry.active_version(self.model_name)
+            if version is None or version in (self.current.version, self.failed_version):
+                return
+            if self.previous is not None and self.previous.version == version:
+                self.current, self.previous = self.previous, self.current
+                logger.info(f"Swapped {self.model_name} back to loaded version {version}")
+                return
+            
+            info = registry.get(self.model_name, version)
+            path = registry.path(self.model_name, version)
+            try:
+                model = await asyncio.to_thread(self._load, info, path)
+            except Exception:
+                # Keep serving the current model; retry once another version is activated
+                self.failed_version = version
+                raise
+            self.current, self.previous = LoadedModel(version, model), self.current
+            logger.info(f"Swapped {self.model_name} to version {version}")
+    
+    def _load(self, info: ModelVersionInfo, path: Path) -> Any:
+        model = self.loader(info, path)
+        self.warmup(model)
+        return model
+
+
+async def watch_active_models(registry: ModelRegistry, models: List[HotSwapModel], interval: float):
+    """Keep hot-swappable models on their active registry versions"""
+    while True:
+        for model in models:
+            try:
+                await model.sync(registry)
+            except Exception as e:
+                logger.error(f"Error loading {model.model_name}: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,263 @@
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9_]+')
+CLASSIFIER_ARTIFACT = 'classifier.npz'
+CLASSIFIER_KIND = 'softmax_classifier'
+
+
+def hash_text_features(texts: List[str], n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Sparse rows of hashed unigram and bigram counts as (indptr, indices).
+    
+    crc32 keeps feature ids stable across processes, unlike ``hash()``.
+    """
+    indptr = [0]
+    indices: List[int] = []
+    for text in texts:
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        terms = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+        indices.extend(zlib.crc32(term.encode()) % n_features for term in terms)
+        indptr.append(len(indices))
+    return np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64)
+
+
+def densify(indptr: np.ndarray, indices: np.ndarray, rows: np.ndarray, n_features: int) -> np.ndarray:
+    """Dense, L2-normalized count matrix of the selected sparse rows"""
+    dense = np.zeros((len(rows), n_features), dtype=np.float32)
+    starts, ends = indptr[rows], indptr[rows + 1]
+    lengths = ends - starts
+    columns = indices[np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])] if lengths.sum() else []
+    np.add.at(dense, (np.repeat(np.arange(len(rows)), lengths), columns), 1.0)
+    norms = np.linalg.norm(dense, axis=1, keepdims=True)
+    return np.divide(dense, norms, out=dense, where=norms > 0)
+
+
+class SoftmaxClassifier:
+    """Multinomial logistic regression trained with mini-batch SGD"""
+    
+    def __init__(self, n_features: int, n_classes: int):
+        self.weights = np.zeros((n_features, n_classes), dtype=np.float32)
+        self.bias = np.zeros(n_classes, dtype=np.float32)
+    
+    def probabilities(self, features: np.ndarray) -> np.ndarray:
+        logits = features @ self.weights + self.bias
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+    
+    def step(self, features: np.ndarray, labels: np.ndarray, learning_rate: float, l2: float) -> float:
+        """One gradient step on a mini-batch, returning its cross-entropy loss"""
+        probabilities = self.probabilities(features)
+        rows = np.arange(len(labels))
+        loss = float(-np.log(probabilities[rows, labels] + 1e-12).mean())
+        probabilities[rows, labels] -= 1.0
+        probabilities /= len(labels)
+        self.weights -= learning_rate * (features.T @ probabilities + l2 * self.weights)
+        self.bias -= learning_rate * probabilities.sum(axis=0)
+        return loss
+
+
+def classification_metrics(labels: np.ndarray, predicted: np.ndarray, n_classes: int) -> Dict[str, float]:
+    """Accuracy and macro-averaged precision, recall and F1"""
+    confusion = np.zeros((n_classes, n_classes), dtype=np.int64)
+    np.add.at(confusion, (labels, predicted), 1)
+    true_positives = np.diag(confusion).astype(np.float64)
+    predicted_totals = confusion.sum(axis=0)
+    actual_totals = confusion.sum(axis=1)
+    precision = np.divide(true_positives, predicted_totals, out=np.zeros(n_classes), where=predicted_totals > 0)
+    recall = np.divide(true_positives, actual_totals, out=np.zeros(n_classes), where=actual_totals > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros(n_classes), where=precision + recall > 0)
+    present = actual_totals > 0
+    return {
+        'accuracy': float(true_positives.sum() / max(1, len(labels))),
+        'precision': float(precision[present].mean()),
+        'recall': float(recall[present].mean()),
+        'f1_score': float(f1[present].mean())
+    }
+
+
+@dataclass
+class PreparedData:
+    """Encoded training samples with row access by index"""
+    kind: str                       # 'texts' or 'features'
+    labels: np.ndarray              # class index per sample
+    classes: np.ndarray
+    n_features: int
+    load: Callable[[np.ndarray], np.ndarray]
+    mean: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    std: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+
+def prepare_inline(training_data: Dict[str, Any], parameters: Dict[str, Any]) -> PreparedData:
+    """Encode ``texts`` or numeric ``features`` with ``labels`` given in the request"""
+    labels_raw = training_data.get('labels')
+    if not labels_raw:
+        raise ValueError("training_data requires 'labels'")
+    classes, labels = np.unique(np.asarray(labels_raw, dtype=str), return_inverse=True)
+    
+    if 'texts' in training_data:
+        n_features = int(parameters.get('n_features', 4096))
+        indptr, indices = hash_text_features(training_data['texts'], n_features)
+        n_samples = len(indptr) - 1
+        data = PreparedData('texts', labels, classes, n_features, lambda rows: densify(indptr, indices, rows, n_features))
+    elif 'features' in training_data:
+        matrix = np.asarray(training_data['features'], dtype=np.float32)
+        mean, std = matrix.mean(axis=0), matrix.std(axis=0)
+        std = np.where(std > 0, std, 1.0)
+        matrix = (matrix - mean) / std
+        n_samples, n_features = matrix.shape
+        data = PreparedData('features', labels, classes, n_features, lambda rows: matrix[rows], mean, std)
+    else:
+        raise ValueError("training_data requires 'texts' or 'features'")
+    if len(labels) != n_samples:
+        raise ValueError("training_data 'labels' must match the number of samples")
+    return data
+
+
+class TrainingCheckpoint:
+    """Training state of one job, saved periodically so it can be resumed.
+    
+    A checkpoint is only restored for the same data and parameters, apart
+    from ``epochs``, so a run can also be continued to more epochs.
+    Writes go to a temporary file that is renamed into place, so a crash
+    mid-write leaves the previous checkpoint intact.
+    """
+    
+    def __init__(self, path: str, interval: float):
+        self.path = Path(path)
+        self.interval = interval
+        self.last_saved = time.monotonic()
+    
+    def load(self, fingerprint: str) -> Optional[Dict[str, np.ndarray]]:
+        if not self.path.exists():
+            return None
+        with np.load(self.path) as checkpoint:
+            if str(checkpoint['fingerprint']) != fingerprint:
+                return None
+            return dict(checkpoint)
+    
+    def save(self, state: Dict[str, Any], force: bool = False):
+        """Save ``state`` if forced or the interval has passed since the last save"""
+        if not force and time.monotonic() - self.last_saved < self.interval:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_name(f'.{self.path.name}')
+        with open(partial, 'wb') as f:
+            np.savez(f, **state)
+        os.replace(partial, self.path)
+        self.last_saved = time.monotonic()
+
+
+def train_classifier(
+    data: PreparedData,
+    parameters: Dict[str, Any],
+    reporter,
+    artifact_dir: Optional[str] = None,
+    checkpoint: Optional[TrainingCheckpoint] = None
+) -> Dict[str, float]:
+    """Train a softmax classifier on prepared samples.
+    
+    ``reporter.report(status, progress, metrics)`` is called between epochs
+    and raises when the job has been cancelled. Training continues from
+    ``checkpoint`` when it holds a matching state, and saves to it between
+    epochs. The trained model is saved to ``artifact_dir`` when given.
+    """
+    labels, classes, load = data.labels, data.classes, data.load
+    
+    epochs = int(parameters.get('epochs', 20))
+    batch_size = int(parameters.get('batch_size', 64))
+    learning_rate = float(parameters.get('learning_rate', 0.5))
+    l2 = float(parameters.get('l2', 1e-4))
+    model = SoftmaxClassifier(data.n_features, len(classes))
+    
+    fingerprint = hashlib.blake2b(json.dumps(
+        [{k: v for k, v in parameters.items() if k != 'epochs'}, data.kind, data.n_features, classes.tolist(), len(labels)],
+        sort_keys=True,
+        default=str
+    ).encode(), digest_size=16).hexdigest()
+    state = checkpoint.load(fingerprint) if checkpoint else None
+    
+    # The split and epoch order derive from the seed, so a resumed run sees the same batches
+    seed = int(state['seed']) if state else parameters.get('seed', int(np.random.SeedSequence().entropy % 2 ** 63))
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(labels))
+    n_validation = int(len(order) * float(parameters.get('validation_split', 0.2)))
+    validation, train = order[:n_validation], order[n_validation:]
+    if not len(train):
+        raise ValueError("Not enough samples to train")
+    
+    start_epoch, loss = 0, 0.0
+    if state:
+        model.weights, model.bias = state['weights'], state['bias']
+        rng.bit_generator.state = json.loads(str(state['rng_state']))
+        start_epoch, loss = int(state['epoch']), float(state['loss'])
+        reporter.report('training', 0.1 + 0.8 * min(start_epoch, epochs) / epochs, {'epoch': start_epoch, 'loss': loss})
+    
+    for epoch in range(start_epoch, epochs):
+        shuffled = rng.permutation(train)
+        losses = [
+            model.step(load(shuffled[start:start + batch_size]), labels[shuffled[start:start + batch_size]], learning_rate, l2)
+            for start in range(0, len(shuffled), batch_size)
+        ]
+        loss = float(np.mean(losses))
+        if checkpoint:
+            checkpoint.save({
+                'fingerprint': np.array(fingerprint),
+                'seed': np.array(seed),
+                'rng_state': np.array(json.dumps(rng.bit_generator.state)),
+                'epoch': np.array(epoch + 1),
+                'loss': np.array(loss),
+                'weights': model.weights,
+                'bias': model.bias
+            }, force=epoch + 1 == epochs)
+        reporter.report('training', 0.1 + 0.8 * (epoch + 1) / epochs, {'epoch': epoch + 1, 'loss': loss})
+    
+    reporter.report('validating', 0.9)
+    evaluated = validation if len(validation) else train
+    predicted = np.concatenate([
+        model.probabilities(load(evaluated[start:start + 1024])).argmax(axis=1)
+        for start in range(0, len(evaluated), 1024)
+    ])
+    metrics = classification_metrics(labels[evaluated], predicted, len(classes))
+    metrics['loss'] = loss
+    
+    if artifact_dir:
+        np.savez(
+            Path(artifact_dir) / CLASSIFIER_ARTIFACT,
+            weights=model.weights,
+            bias=model.bias,
+            classes=classes,
+            features=np.array(data.kind),
+            n_features=np.array(data.n_features),
+            mean=data.mean,
+            std=data.std
+        )
+    return metrics
+
+
+class TextClassifier:
+    """Inference side of a classifier trained on ``texts``"""
+    
+    def __init__(self, path: Path):
+        with np.load(path / CLASSIFIER_ARTIFACT) as artifact:
+            if str(artifact['features']) != 'texts':
+                raise ValueError("Classifier was not trained on texts")
+            self.n_features = int(artifact['n_features'])
+            self.classes = [str(c) for c in artifact['classes']]
+            self.model = SoftmaxClassifier(self.n_features, len(self.classes))
+            self.model.weights = artifact['weights']
+            self.model.bias = artifact['bias']
+    
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        indptr, indices = hash_text_features(texts, self.n_features)
+        rows = np.arange(len(texts))
+        return self.model.probabilities(densify(indptr, indices, rows, self.n_features))
@@ -1,4 +1,5 @@
 import re
+import asyncio
 import logging
 from typing import List, Dict, Any
 from datetime import datetime
@@ -6,12 +7,16 @@ from uuid import uuid4
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from app.config import settings
+from app.metrics import stage_timer
 from app.models import (
     NLPBlueprintRequest,
     BlueprintFromNLP,
     ResourceRecommendation,
-    CloudProvider
+    CloudProvider,
+    ModelVersionInfo
 )
+from app.services.model_registry import HotSwapModel
 
 logger = logging.getLogger(__name__)
 
@@ -24,11 +29,19 @@ class NLPService:
         
         # Load sentence transformer for embeddings
         try:
-            self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+            embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
             logger.info("Sentence transformer loaded successfully")
         except Exception as e:
             logger.warning(f"Failed to load embedding model: {e}")
-            self.embedding_model = None
+            embedding_model = None
+        
+        # Registry versions replace the stock model once activated
+        self.embedding_model = HotSwapModel(
+            settings.embedding_model_name,
+            loader=self._load_embedding_model,
+            warmup=lambda model: model.encode('warm up'),
+            initial=embedding_model
+        )
         
         # Resource keywords mapping
         self.resource_keywords = {
@@ -61,18 +74,19 @@ class NLPService:
         
         text = request.user_input.lower()
         
-        # Detect cloud provider
-        target_cloud = request.target_cloud
-        if not target_cloud:
-            target_cloud = self._detect_cloud(text)
-        
-        # Detect environment
-        environment = request.environment
-        if not environment:
-            environment = self._detect_environment(text)
-        
-        # Extract resource requirements
-        resources = self._extract_resources(text, target_cloud)
+        with stage_timer('keyword_matching'):
+            # Detect cloud provider
+            target_cloud = request.target_cloud
+            if not target_cloud:
+                target_cloud = self._detect_cloud(text)
+            
+            # Detect environment
+            environment = request.environment
+            if not environment:
+                environment = self._detect_environment(text)
+            
+            # Extract resource requirements
+            resources = self._extract_resources(text, target_cloud)
         
         # Generate blueprint name and description
         blueprint_name = self._generate_name(text)
@@ -293,11 +307,19 @@ class NLPService:
     
     async def generate_embeddings(self, text: str) -> np.ndarray:
         """Generate embeddings for text"""
-        if self.embedding_model:
-            return self.embedding_model.encode(text)
-        else:
-            # Fallback: simple hash-based embedding
-            return np.random.rand(384)
+        embedding_model = self.embedding_model.model
+        with stage_timer('embedding'):
+            if embedding_model:
+                # Off the event loop, so other routes stay responsive while encoding
+                return await asyncio.to_thread(embedding_model.encode, text)
+            else:
+                # Fallback: simple hash-based embedding
+                return np.random.rand(384)
+    
+    def _load_embedding_model(self, info: ModelVersionInfo, path) -> SentenceTransformer:
+        if info.kind != 'sentence_transformer':
+            raise ValueError(f"Unsupported embedding model kind: {info.kind}")
+        return SentenceTransformer(str(path))
     
     async def find_similar_blueprints(self, blueprint_id: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Find similar blueprints using embeddings"""
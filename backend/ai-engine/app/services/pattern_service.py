@@ -1,98 +1,433 @@
+import math
+import time
+import asyncio
 import logging
-from typing import List, Dict, Any
+from collections import Counter, OrderedDict, defaultdict
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from uuid import uuid4
 import random
 
+import numpy as np
+
+from app.config import settings
 from app.models import (
     PatternRequest,
     PatternsResponse,
-    Pattern
+    Pattern,
+    BlueprintCorpusRequest,
+    BlueprintCorpusResponse,
+    DeploymentEventsRequest,
+    DeploymentEventsResponse
 )
+from app.services.itemset_mining import BlueprintCorpus, fp_growth
+from app.services.event_store import DeploymentEventStore, to_epoch_ms
+from app.services.failure_windows import FailureWindowAggregator
+from app.services.blueprint_clustering import MiniBatchKMeans
+from app.services.error_signatures import ErrorSignatureTable
 
 logger = logging.getLogger(__name__)
 
+FAILURE_STATUSES = ('failed', 'error', 'rolled_back')
+# Stored error of events whose signature was evicted from the signature table
+EVICTED_ERROR = 'Other errors'
+
+
+@dataclass
+class PatternSnapshot:
+    """Materialized detection results for one pattern type and time bucket"""
+    request: PatternRequest
+    by_type: Dict[str, List[Pattern]] = field(default_factory=dict)
+    versions: Dict[str, Any] = field(default_factory=dict)
+    # When each pattern type was last recomputed, and last known to be current
+    computed_at: Dict[str, datetime] = field(default_factory=dict)
+    current_at: Dict[str, datetime] = field(default_factory=dict)
+    patterns: List[Pattern] = field(default_factory=list)
+    refreshed_at: Optional[datetime] = None
+    last_requested: float = 0.0
+
 
 class PatternRecognitionService:
     """Service for ML-based pattern detection"""
     
     def __init__(self):
         logger.info("Initializing Pattern Recognition Service...")
+        
+        # Resource-type transactions of known blueprints
+        self.blueprint_corpus = BlueprintCorpus()
+        
+        # Online clusters of blueprint embeddings
+        self.blueprint_clusters = MiniBatchKMeans(
+            n_clusters=settings.pattern_cluster_count,
+            dim=settings.pattern_embedding_dim,
+            batch_size=settings.pattern_cluster_batch_size
+        )
+        
+        # Mined architecture patterns keyed by (corpus version, blueprint filter)
+        self.architecture_cache: "OrderedDict[tuple, List[Pattern]]" = OrderedDict()
+        
+        # Raw error messages folded into normalized signatures
+        self.error_signatures = ErrorSignatureTable(
+            max_signatures=settings.error_signature_max_entries,
+            max_cached_messages=settings.error_signature_cache_size,
+            max_template_length=settings.error_template_max_length
+        )
+        
+        # Deployment outcomes and errors for deployment and failure patterns
+        self.event_store = DeploymentEventStore(
+            settings.pattern_event_partition_seconds,
+            retention_seconds=(
+                None if settings.pattern_event_retention_days is None
+                else settings.pattern_event_retention_days * 86400
+            )
+        )
+        
+        # Streaming window counters of recent failures
+        self.failure_windows = FailureWindowAggregator(
+            bucket_seconds=settings.failure_window_bucket_seconds,
+            buckets=settings.failure_window_buckets,
+            days=settings.failure_window_days,
+            max_keys=settings.failure_window_max_keys
+        )
+        
+        # Detector per pattern type, with the version of the data it reads
+        self.detectors = {
+            'architecture': (
+                self._detect_architecture_patterns,
+                lambda: self.blueprint_corpus.version
+            ),
+            'architecture_cluster': (
+                self._detect_cluster_patterns,
+                lambda: (self.blueprint_clusters.version, len(self.blueprint_clusters.pending))
+            ),
+            'resource_usage': (self._detect_resource_patterns, lambda: 0),
+            'deployment': (self._detect_deployment_patterns, lambda: self.event_store.version),
+            'failure': (self._detect_failure_patterns, lambda: self.event_store.version)
+        }
+        
+        # Materialized responses keyed by (pattern type, time bucket)
+        self.snapshots: "OrderedDict[tuple, PatternSnapshot]" = OrderedDict()
+        self.snapshot_task: Optional[asyncio.Task] = None
+        
         logger.info("Pattern Recognition Service initialized")
     
-    async def detect_patterns(self, request: PatternRequest) -> PatternsResponse:
-        """Detect patterns across blueprints and deployments"""
+    async def add_blueprints(self, request: BlueprintCorpusRequest) -> BlueprintCorpusResponse:
+        """Add or replace blueprints in the pattern mining corpus"""
+        for blueprint in request.blueprints:
+            self.blueprint_corpus.add(blueprint.blueprint_id, blueprint.resources)
+            transaction = self.blueprint_corpus.blueprints.get(blueprint.blueprint_id)
+            if transaction:
+                self.blueprint_clusters.add(blueprint.blueprint_id, transaction)
+            else:
+                self.blueprint_clusters.remove(blueprint.blueprint_id)
         
-        patterns = []
+        logger.info(f"Blueprint corpus at version {self.blueprint_corpus.version}: {len(self.blueprint_corpus)} blueprints")
+        
+        return BlueprintCorpusResponse(
+            corpus_version=self.blueprint_corpus.version,
+            total_blueprints=len(self.blueprint_corpus),
+            distinct_resource_types=len(self.blueprint_corpus.item_names)
+        )
+    
+    async def record_events(self, request: DeploymentEventsRequest) -> DeploymentEventsResponse:
+        """Append deployment outcome and error events.
         
-        # Architecture patterns
-        patterns.extend(await self._detect_architecture_patterns(request))
+        Errors are stored and windowed by their normalized signature, so
+        messages differing only in ids, numbers, hosts or timestamps group
+        together.
+        """
+        signatures = []
+        for event in request.events:
+            signature = self.error_signatures.add(event.error).template if event.error else None
+            signatures.append(signature)
+            if event.status in FAILURE_STATUSES or signature:
+                self.failure_windows.observe(
+                    signature or 'Deployment failure',
+                    event.resource,
+                    to_epoch_ms(event.timestamp),
+                    event.deployment_id
+                )
         
-        # Resource usage patterns
-        patterns.extend(await self._detect_resource_patterns(request))
+        accepted = self.event_store.append(request.events, errors=signatures)
         
-        # Deployment patterns
-        patterns.extend(await self._detect_deployment_patterns(request))
+        # Evicted signatures leave their templates in the store's error dictionary;
+        # fold them into one value once they outnumber the live signatures
+        if len(self.event_store.dictionaries['error'].values) > 2 * settings.error_signature_max_entries:
+            self.event_store.compact('error', self.error_signatures.signatures.__contains__, EVICTED_ERROR)
         
-        # Failure patterns
-        patterns.extend(await self._detect_failure_patterns(request))
+        return DeploymentEventsResponse(
+            accepted=accepted,
+            total_events=len(self.event_store)
+        )
+    
+    async def detect_patterns(self, request: PatternRequest) -> PatternsResponse:
+        """Detect patterns across blueprints and deployments.
         
-        # Sort by confidence
-        patterns.sort(key=lambda p: p.confidence, reverse=True)
+        Requests without blueprint or deployment filters are served from a
+        materialized snapshot per pattern type and time bucket that the
+        background refresh keeps current; the response reports its age and
+        the bucket-aligned time range it covers, which may be wider than
+        the requested one.
+        """
+        if request.blueprint_ids or request.deployment_ids:
+            patterns = []
+            for pattern_type in self._pattern_types(request):
+                detect, _ = self.detectors[pattern_type]
+                patterns.extend(await detect(request))
+            
+            # Sort by confidence
+            patterns.sort(key=lambda p: p.confidence, reverse=True)
+            
+            logger.info(f"Detected {len(patterns)} patterns")
+            
+            return PatternsResponse(
+                patterns=patterns,
+                total_count=len(patterns),
+                analyzed_at=datetime.utcnow(),
+                time_range=request.time_range
+            )
         
-        logger.info(f"Detected {len(patterns)} patterns")
+        time_range = self._bucket_time_range(request.time_range)
+        key = (request.pattern_type, tuple(sorted(time_range.items())) if time_range else None)
+        snapshot = self.snapshots.get(key)
+        if snapshot is None:
+            snapshot = PatternSnapshot(
+                request=PatternRequest(pattern_type=request.pattern_type, time_range=time_range)
+            )
+            await self._refresh_snapshot(snapshot)
+            self.snapshots[key] = snapshot
+            while len(self.snapshots) > settings.pattern_snapshot_max_entries:
+                self.snapshots.popitem(last=False)
+        else:
+            self.snapshots.move_to_end(key)
+        snapshot.last_requested = time.monotonic()
         
         return PatternsResponse(
-            patterns=patterns,
-            total_count=len(patterns),
-            analyzed_at=datetime.utcnow()
+            patterns=snapshot.patterns,
+            total_count=len(snapshot.patterns),
+            analyzed_at=snapshot.refreshed_at,
+            from_snapshot=True,
+            staleness_seconds=(datetime.utcnow() - snapshot.refreshed_at).total_seconds(),
+            time_range=time_range
         )
     
+    def start_snapshot_refresh(self):
+        """Start refreshing materialized snapshots in the background"""
+        self.snapshot_task = asyncio.create_task(self._run_snapshot_refresh())
+    
+    async def stop_snapshot_refresh(self):
+        if self.snapshot_task is None:
+            return
+        self.snapshot_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self.snapshot_task
+        self.snapshot_task = None
+    
+    async def _run_snapshot_refresh(self):
+        """Periodically refresh snapshots, dropping the ones nobody reads"""
+        while True:
+            await asyncio.sleep(settings.pattern_snapshot_refresh_seconds)
+            idle_since = time.monotonic() - settings.pattern_snapshot_idle_seconds
+            for key, snapshot in list(self.snapshots.items()):
+                if snapshot.last_requested < idle_since:
+                    self.snapshots.pop(key, None)
+                    continue
+                try:
+                    await self._refresh_snapshot(snapshot)
+                except Exception as e:
+                    logger.error(f"Error refreshing pattern snapshot {key}: {str(e)}")
+                # Let requests in between snapshots
+                await asyncio.sleep(0)
+    
+    async def _refresh_snapshot(self, snapshot: PatternSnapshot):
+        """Re-run only the detectors whose input data changed since the last refresh.
+        
+        A detector is re-run at most every ``pattern_snapshot_min_recompute_seconds``,
+        so continuous ingest does not keep recomputing it; until then the
+        snapshot serves the older result and its age grows accordingly.
+        """
+        changed = snapshot.refreshed_at is None
+        for pattern_type in self._pattern_types(snapshot.request):
+            detect, version = self.detectors[pattern_type]
+            current = version()
+            now = datetime.utcnow()
+            if pattern_type in snapshot.versions and snapshot.versions[pattern_type] == current:
+                snapshot.current_at[pattern_type] = now
+                continue
+            computed_at = snapshot.computed_at.get(pattern_type)
+            if computed_at and (now - computed_at).total_seconds() < settings.pattern_snapshot_min_recompute_seconds:
+                continue
+            snapshot.by_type[pattern_type] = await detect(snapshot.request)
+            snapshot.versions[pattern_type] = current
+            snapshot.computed_at[pattern_type] = snapshot.current_at[pattern_type] = now
+            changed = True
+        
+        if changed:
+            snapshot.patterns = sorted(
+                (pattern for patterns in snapshot.by_type.values() for pattern in patterns),
+                key=lambda p: p.confidence,
+                reverse=True
+            )
+        snapshot.refreshed_at = min(snapshot.current_at.values(), default=datetime.utcnow())
+    
+    def _pattern_types(self, request: PatternRequest) -> List[str]:
+        if request.pattern_type is None:
+            return list(self.detectors)
+        return [request.pattern_type] if request.pattern_type in self.detectors else []
+    
+    def _bucket_time_range(self, time_range: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """Widen a time range to snapshot bucket boundaries"""
+        if not time_range:
+            return None
+        bucket_ms = settings.pattern_snapshot_bucket_seconds * 1000
+        bucketed = {}
+        if time_range.get('start'):
+            start = to_epoch_ms(datetime.fromisoformat(time_range['start'])) // bucket_ms * bucket_ms
+            bucketed['start'] = datetime.utcfromtimestamp(start / 1000).isoformat()
+        if time_range.get('end'):
+            end = -(-to_epoch_ms(datetime.fromisoformat(time_range['end'])) // bucket_ms) * bucket_ms
+            bucketed['end'] = datetime.utcfromtimestamp(end / 1000).isoformat()
+        return bucketed or None
+    
     async def _detect_architecture_patterns(
         self, 
         request: PatternRequest
     ) -> List[Pattern]:
-        """Detect common architecture patterns"""
-        return [
-            Pattern(
-                pattern_id=str(uuid4()),
-                pattern_type='architecture',
-                name='Three-Tier Web Application',
-                description='Common pattern with web, app, and database tiers',
-                frequency=12,
-                confidence=0.92,
-                examples=[
-                    {
-                        'blueprint_id': str(uuid4()),
-                        'resources': ['load_balancer', 'vm', 'database']
-                    }
-                ],
-                insights=[
-                    'Most deployments use 2-3 VMs in app tier',
-                    'PostgreSQL is preferred database (70%)',
-                    'Average cost: $450/month'
-                ]
-            ),
-            Pattern(
+        """Detect common architecture patterns.
+        
+        Frequently co-occurring resource-type sets are mined from the stored
+        blueprints with FP-growth and memoized per corpus version. Mining
+        runs in a worker thread on a copy of the transactions, so it
+        neither blocks the event loop nor sees blueprints added meanwhile.
+        """
+        corpus = self.blueprint_corpus
+        key = (corpus.version, tuple(sorted(request.blueprint_ids or [])))
+        if key in self.architecture_cache:
+            self.architecture_cache.move_to_end(key)
+            return self.architecture_cache[key]
+        
+        if request.blueprint_ids:
+            transactions, support = corpus.subset(request.blueprint_ids), None
+        else:
+            transactions, support = dict(corpus.transactions), Counter(corpus.item_support)
+        total = sum(transactions.values())
+        
+        patterns = []
+        if total:
+            min_support = max(2, math.ceil(settings.pattern_min_support * total))
+            frequent, closed = await asyncio.to_thread(self._mine_itemsets, transactions, min_support, support)
+            for itemset, count in closed:
+                patterns.append(self._architecture_pattern(itemset, count, total, frequent))
+        
+        self.architecture_cache[key] = patterns
+        while len(self.architecture_cache) > settings.pattern_cache_size:
+            self.architecture_cache.popitem(last=False)
+        
+        return patterns
+    
+    async def _detect_cluster_patterns(
+        self,
+        request: PatternRequest
+    ) -> List[Pattern]:
+        """Describe blueprint clusters from cached centroid statistics"""
+        clusters = self.blueprint_clusters
+        clusters.flush()
+        if clusters.centroids is None:
+            return []
+        
+        patterns = []
+        for cluster in np.argsort(clusters.counts)[::-1].tolist():
+            count = int(clusters.counts[cluster])
+            if count < settings.pattern_min_occurrences:
+                continue
+            
+            item_counts = clusters.item_counts[cluster]
+            top_items = np.argsort(item_counts)[::-1][:5]
+            common = self.blueprint_corpus.decode(top_items[item_counts[top_items] > 0].tolist())
+            # Mean squared distance of unit vectors lies in [0, 4]
+            spread = clusters.squared_distance_sums[cluster] / count
+            
+            patterns.append(Pattern(
                 pattern_id=str(uuid4()),
-                pattern_type='architecture',
-                name='Microservices with Containers',
-                description='Container-based microservices architecture',
-                frequency=8,
-                confidence=0.88,
+                pattern_type='architecture_cluster',
+                name=f"Architecture Cluster: {' + '.join(common[:3])}",
+                description=f'{count} blueprints with similar resource composition',
+                frequency=count,
+                confidence=max(0.0, 1.0 - spread / 2),
                 examples=[
-                    {
-                        'blueprint_id': str(uuid4()),
-                        'resources': ['kubernetes', 'container_registry', 'database']
-                    }
+                    {'blueprint_id': blueprint_id, 'resources': common}
+                    for blueprint_id in clusters.examples[cluster]
                 ],
                 insights=[
-                    'Average 5-8 microservices per deployment',
-                    'Redis used for caching (85%)',
-                    'Azure AKS most common (60%)'
-                ]
+                    f'{self.blueprint_corpus.item_names[item]} in {item_counts[item] / count:.0%} of blueprints'
+                    for item in top_items[:3].tolist() if item_counts[item]
+                ] + [f'Mean squared distance to centroid: {spread:.2f}']
+            ))
+        
+        return patterns[:settings.pattern_max_results]
+    
+    def _mine_itemsets(
+        self,
+        transactions: Dict[Tuple[int, ...], int],
+        min_support: int,
+        support: Optional[Counter]
+    ) -> Tuple[Dict[Tuple[int, ...], int], List[Tuple[Tuple[int, ...], int]]]:
+        """Frequent itemsets and the leading closed ones; run off the event loop"""
+        frequent = dict(fp_growth(transactions, min_support, settings.pattern_max_itemset_size, support))
+        return frequent, self._closed_itemsets(frequent)[:settings.pattern_max_results]
+    
+    def _closed_itemsets(self, frequent: Dict[Tuple[int, ...], int]) -> List[Tuple[Tuple[int, ...], int]]:
+        """Multi-item itemsets without a superset of equal support, most frequent first"""
+        by_support: Dict[int, List[frozenset]] = defaultdict(list)
+        for itemset, count in frequent.items():
+            by_support[count].append(frozenset(itemset))
+        
+        closed = [
+            (itemset, count) for itemset, count in frequent.items()
+            if len(itemset) > 1 and not any(
+                len(other) > len(itemset) and other.issuperset(itemset)
+                for other in by_support[count]
             )
         ]
+        closed.sort(key=lambda entry: (entry[1], len(entry[0])), reverse=True)
+        return closed
+    
+    def _architecture_pattern(
+        self,
+        itemset: Tuple[int, ...],
+        count: int,
+        total: int,
+        frequent: Dict[Tuple[int, ...], int]
+    ) -> Pattern:
+        """Describe a frequent resource-type set as an architecture pattern"""
+        corpus = self.blueprint_corpus
+        resource_types = corpus.decode(itemset)
+        
+        # Strongest association rule: (itemset - {item}) -> item
+        confidence, consequent = max(
+            (count / frequent[tuple(i for i in itemset if i != item)], item)
+            for item in itemset
+        )
+        
+        return Pattern(
+            pattern_id=str(uuid4()),
+            pattern_type='architecture',
+            name=' + '.join(resource_types),
+            description=f'Resource types deployed together in {count} of {total} blueprints',
+            frequency=count,
+            confidence=count / total,
+            examples=[
+                {'blueprint_id': blueprint_id, 'resources': resource_types}
+                for blueprint_id in corpus.find_examples(itemset, corpus.max_examples)
+            ],
+            insights=[
+                f'Found in {count / total:.0%} of blueprints',
+                f'{corpus.item_names[consequent]} accompanies the other '
+                f'{len(itemset) - 1} resource type(s) in {confidence:.0%} of cases'
+            ]
+        )
     
     async def _detect_resource_patterns(
         self, 
@@ -126,53 +461,191 @@ class PatternRecognitionService:
         self, 
         request: PatternRequest
     ) -> List[Pattern]:
-        """Detect deployment patterns"""
-        return [
-            Pattern(
+        """Detect deployment patterns per deployment strategy"""
+        events = self._scan_events(request)
+        strategies = events['strategy']
+        known = strategies[strategies >= 0]
+        if not len(known):
+            return []
+        
+        failed = self._failure_mask(events)
+        counts = np.bincount(known)
+        patterns = []
+        
+        for code in np.flatnonzero(counts >= settings.pattern_min_occurrences).tolist():
+            strategy = self.event_store.decode('strategy', code)
+            mask = strategies == code
+            total = int(counts[code])
+            success_rate = 1.0 - float(failed[mask].mean())
+            durations = events['duration'][mask]
+            durations = durations[~np.isnan(durations)]
+            deployments = np.unique(events['deployment'][mask])
+            
+            insights = [f'Success rate: {success_rate:.0%}']
+            if len(durations):
+                insights.append(f'Average duration: {float(durations.mean()) / 60:.1f} minutes')
+            environments = events['environment'][mask]
+            environments = environments[environments >= 0]
+            if len(environments):
+                environment_counts = np.bincount(environments)
+                top = int(environment_counts.argmax())
+                insights.append(
+                    f"Used primarily in {self.event_store.decode('environment', top)} "
+                    f"({environment_counts[top] / len(environments):.0%})"
+                )
+            
+            patterns.append(Pattern(
                 pattern_id=str(uuid4()),
                 pattern_type='deployment',
-                name='Blue-Green Deployment Pattern',
-                description='Pattern of maintaining two identical environments',
-                frequency=6,
-                confidence=0.78,
+                name=f"{strategy.replace('_', ' ').replace('-', ' ').title()} Deployment Pattern",
+                description=f"{total} deployment events across {len(deployments)} deployments using the '{strategy}' strategy",
+                frequency=total,
+                confidence=success_rate,
                 examples=[
-                    {
-                        'deployment_id': str(uuid4()),
-                        'environments': ['blue', 'green']
-                    }
+                    {'deployment_id': self.event_store.decode('deployment', d), 'strategy': strategy}
+                    for d in deployments[:3].tolist()
                 ],
-                insights=[
-                    'Used primarily in production (90%)',
-                    'Average switchover time: 5 minutes',
-                    'Zero-downtime deployments achieved'
-                ]
-            )
-        ]
+                insights=insights
+            ))
+        
+        return patterns
     
     async def _detect_failure_patterns(
         self, 
         request: PatternRequest
     ) -> List[Pattern]:
-        """Detect failure patterns"""
-        return [
-            Pattern(
+        """Detect recurring failures grouped by error and resource.
+        
+        Without a time range or deployment filter, patterns are read from the
+        streaming window state; otherwise the event store is scanned.
+        """
+        if not request.time_range and not request.deployment_ids:
+            return self._windowed_failure_patterns()
+        
+        events = self._scan_events(request)
+        failed = self._failure_mask(events)
+        if not failed.any():
+            return []
+        
+        errors = events['error'][failed].astype(np.int64) + 1
+        resources = events['resource'][failed].astype(np.int64) + 1
+        timestamps = events['timestamp'][failed]
+        deployments = events['deployment'][failed]
+        
+        # One integer key per (error, resource) signature
+        keys = errors * (len(self.event_store.dictionaries['resource'].values) + 1) + resources
+        signatures, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        patterns = []
+        
+        for index in np.argsort(counts)[::-1][:settings.pattern_max_results].tolist():
+            count = int(counts[index])
+            if count < settings.pattern_min_occurrences:
+                break
+            mask = inverse == index
+            first = int(np.flatnonzero(mask)[0])
+            error = self.event_store.decode('error', int(errors[first]) - 1) or 'Deployment failure'
+            resource = self.event_store.decode('resource', int(resources[first]) - 1)
+            
+            hours = np.bincount((timestamps[mask] // 3_600_000) % 24, minlength=24)
+            peak_hour = int(hours.argmax())
+            last_seen = datetime.utcfromtimestamp(int(timestamps[mask].max()) / 1000)
+            
+            patterns.append(Pattern(
                 pattern_id=str(uuid4()),
                 pattern_type='failure',
-                name='Database Connection Timeout',
-                description='Pattern of database connectivity failures',
-                frequency=4,
-                confidence=0.82,
+                name=f'{error} ({resource})' if resource else error,
+                description=f'Recurring deployment failure seen {count} times',
+                frequency=count,
+                confidence=count / int(failed.sum()),
                 examples=[
                     {
-                        'error': 'Connection timeout',
-                        'resource': 'database',
-                        'time': '03:00 AM'
+                        'error': error,
+                        **self._signature_fields(error),
+                        'resource': resource,
+                        'time': f'{peak_hour:02d}:00 UTC',
+                        'deployment_id': self.event_store.decode('deployment', int(deployments[first]))
                     }
                 ],
                 insights=[
-                    'Occurs during nightly batch jobs',
-                    'Connection pool exhaustion',
-                    'Recommend: Increase pool size to 50'
+                    f'Affects {len(np.unique(deployments[mask]))} deployment(s)',
+                    f'Peaks around {peak_hour:02d}:00 UTC ({hours[peak_hour] / count:.0%} of occurrences)',
+                    f"Last seen {last_seen.isoformat(timespec='seconds')}Z"
                 ]
-            )
-        ]
+            ))
+        
+        return patterns
+    
+    def _windowed_failure_patterns(self) -> List[Pattern]:
+        """Failure patterns from precomputed sliding and tumbling windows"""
+        summaries = self.failure_windows.summaries(
+            min_count=settings.pattern_min_occurrences,
+            spike_ratio=settings.failure_spike_ratio,
+            spike_min_days=settings.failure_spike_min_days
+        )
+        week = f'last_{settings.failure_window_days}d'
+        summaries.sort(key=lambda summary: summary['window_counts'][week], reverse=True)
+        total_failures = sum(summary['window_counts'][week] for summary in summaries)
+        
+        patterns = []
+        for summary in summaries[:settings.pattern_max_results]:
+            error, resource = summary['signature'], summary['resource']
+            counts = summary['window_counts']
+            peak = f"{summary['peak_hour']:02d}:00 UTC"
+            
+            insights = [
+                f"{counts['last_1h']} in the last hour, {counts['last_24h']} in the last 24 hours",
+            ]
+            if summary['periodic_spike']:
+                insights.append(
+                    f"Recurring spike around {peak} on {summary['days_at_peak']} of "
+                    f"{settings.failure_window_days} days ({summary['peak_share']:.0%} of occurrences)"
+                )
+            else:
+                insights.append(f"Most frequent around {peak} ({summary['peak_share']:.0%} of occurrences)")
+            last_seen = datetime.utcfromtimestamp(summary['last_seen_ms'] / 1000)
+            insights.append(f"Last seen {last_seen.isoformat(timespec='seconds')}Z")
+            
+            patterns.append(Pattern(
+                pattern_id=str(uuid4()),
+                pattern_type='failure',
+                name=f'{error} ({resource})' if resource else error,
+                description=f"Recurring deployment failure seen {counts[week]} times in the last {settings.failure_window_days} days",
+                frequency=counts[week],
+                confidence=summary['peak_share'] if summary['periodic_spike'] else counts[week] / total_failures,
+                examples=[
+                    {
+                        'error': error,
+                        **self._signature_fields(error),
+                        'resource': resource,
+                        'time': peak,
+                        'deployment_id': summary['last_deployment_id'],
+                        'window_counts': counts
+                    }
+                ],
+                insights=insights
+            ))
+        
+        return patterns
+    
+    def _signature_fields(self, template: str) -> Dict[str, Any]:
+        """Signature id and a raw sample message of an error template"""
+        signature = self.error_signatures.get(template)
+        if signature is None:
+            return {}
+        return {'signature_id': signature.signature_id, 'sample_error': signature.sample}
+    
+    def _scan_events(self, request: PatternRequest) -> Dict[str, np.ndarray]:
+        """Deployment events within the request's time range and deployments"""
+        time_range = request.time_range or {}
+        start = time_range.get('start')
+        end = time_range.get('end')
+        return self.event_store.scan(
+            to_epoch_ms(datetime.fromisoformat(start)) if start else None,
+            to_epoch_ms(datetime.fromisoformat(end)) if end else None,
+            request.deployment_ids
+        )
+    
+    def _failure_mask(self, events: Dict[str, np.ndarray]) -> np.ndarray:
+        """Events that failed or carry an error"""
+        codes = [self.event_store.find('status', status) for status in FAILURE_STATUSES]
+        return np.isin(events['status'], [c for c in codes if c >= 0]) | (events['error'] >= 0)
@@ -3,6 +3,7 @@ from typing import List
 from datetime import datetime
 from uuid import uuid4
 
+from app.metrics import stage_timer
 from app.models import (
     RecommendationRequest,
     RecommendationsResponse,
@@ -31,17 +32,18 @@ class RecommendationService:
         # Generate different types of recommendations
         rec_type = request.recommendation_type
         
-        if not rec_type or rec_type == 'performance':
-            recommendations.extend(await self._performance_recommendations(request))
-        
-        if not rec_type or rec_type == 'cost':
-            recommendations.extend(await self._cost_recommendations(request))
-        
-        if not rec_type or rec_type == 'security':
-            recommendations.extend(await self._security_recommendations(request))
-        
-        if not rec_type or rec_type == 'reliability':
-            recommendations.extend(await self._reliability_recommendations(request))
+        with stage_timer('catalog_lookup'):
+            if not rec_type or rec_type == 'performance':
+                recommendations.extend(await self._performance_recommendations(request))
+            
+            if not rec_type or rec_type == 'cost':
+                recommendations.extend(await self._cost_recommendations(request))
+            
+            if not rec_type or rec_type == 'security':
+                recommendations.extend(await self._security_recommendations(request))
+            
+            if not rec_type or rec_type == 'reliability':
+                recommendations.extend(await self._reliability_recommendations(request))
         
         # Sort by priority and confidence
         recommendations.sort(
@@ -1,11 +1,24 @@
+import json
+import asyncio
 import logging
-from typing import List, Dict, Any
+import multiprocessing
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, AsyncIterator
 from datetime import datetime
 from uuid import uuid4
 
+import numpy as np
+
+from app.config import settings
+from app.metrics import stage_timer
+from app.services.dependency_graph import DependencyGraph
 from app.models import (
     RiskAssessmentRequest,
+    IncrementalRiskAssessmentRequest,
     RiskAssessment,
+    RiskAssessmentSummary,
     RiskFactor,
     RiskLevel
 )
@@ -13,6 +26,62 @@ from app.models import (
 logger = logging.getLogger(__name__)
 
 
+# Weight by severity
+SEVERITY_WEIGHTS = {
+    RiskLevel.LOW: 1.0,
+    RiskLevel.MEDIUM: 2.5,
+    RiskLevel.HIGH: 5.0,
+    RiskLevel.CRITICAL: 10.0
+}
+
+# Factor groups up to this size are sampled as individual Bernoulli rows in
+# risk simulations; larger groups are cheaper to draw as one binomial row.
+BERNOULLI_MAX_GROUP_SIZE = 32
+
+# Aggregate rules and the resource counters they read. A rule is only
+# re-evaluated on an incremental assessment when one of its inputs changed;
+# 'dependencies' changes when a resource was added or removed, or a changed
+# resource's name, type or references differ.
+AGGREGATE_RULE_INPUTS = {
+    'missing_network_security': ('network',),
+    'single_point_of_failure': ('compute',),
+    'missing_load_balancer': ('compute', 'load_balancer'),
+    'infrastructure_complexity': ('total',),
+    'dependency_blast_radius': ('dependencies',)
+}
+
+
+@dataclass
+class AssessmentState:
+    """Per-assessment rule results and aggregates kept for incremental re-assessment"""
+    blueprint_id: Optional[str]
+    deployment_id: Optional[str]
+    historical_context: Optional[Dict[str, Any]]
+    resources: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    resource_factors: Dict[str, List[RiskFactor]] = field(default_factory=dict)
+    aggregate_factors: Dict[str, List[RiskFactor]] = field(default_factory=dict)
+    counts: Counter = field(default_factory=Counter)
+    severity_counts: Counter = field(default_factory=Counter)
+    factor_groups: Counter = field(default_factory=Counter)
+    name_copies: Counter = field(default_factory=Counter)
+    weighted_total: float = 0.0
+    factor_count: int = 0
+    
+    def add_factors(self, factors: List[RiskFactor]):
+        for factor in factors:
+            self.weighted_total += SEVERITY_WEIGHTS[factor.severity] * factor.probability
+            self.severity_counts[factor.severity] += 1
+            self.factor_groups[(factor.severity, factor.probability)] += 1
+        self.factor_count += len(factors)
+    
+    def remove_factors(self, factors: List[RiskFactor]):
+        for factor in factors:
+            self.weighted_total -= SEVERITY_WEIGHTS[factor.severity] * factor.probability
+            self.severity_counts[factor.severity] -= 1
+            self.factor_groups[(factor.severity, factor.probability)] -= 1
+        self.factor_count -= len(factors)
+
+
 class RiskAssessmentService:
     """Service for ML-based risk assessment"""
     
@@ -28,6 +97,12 @@ class RiskAssessmentService:
             'operational': ['complexity', 'maintenance', 'dependencies']
         }
         
+        # Recent assessment states, evicted least-recently-used first
+        self.assessment_states: "OrderedDict[str, AssessmentState]" = OrderedDict()
+        
+        # Process pool for batch assessments, started on first use
+        self.batch_executor: Optional[ProcessPoolExecutor] = None
+        
         logger.info("Risk Assessment Service initialized")
     
     async def assess_risk(self, request: RiskAssessmentRequest) -> RiskAssessment:
@@ -35,58 +110,336 @@ class RiskAssessmentService:
         
         # Fetch resources to analyze
         resources = request.resources or await self._fetch_resources(
-            request.blueprint_id, 
+            request.blueprint_id,
             request.deployment_id
         )
         
-        # Analyze different risk dimensions
-        risk_factors = []
+        state = AssessmentState(
+            blueprint_id=request.blueprint_id,
+            deployment_id=request.deployment_id,
+            historical_context=request.historical_context
+        )
+        
+        # Per-resource rules (security, availability, cost)
+        for resource in resources:
+            key = self._resource_key(resource, state)
+            state.resources[key] = resource
+            state.counts.update(self._classify_resource(resource))
+            state.resource_factors[key] = self._evaluate_resource(resource)
+            state.add_factors(state.resource_factors[key])
         
-        # Security risks
-        risk_factors.extend(await self._assess_security_risks(resources))
+        # Deployment-wide rules (security, availability, performance, operational)
+        for rule in AGGREGATE_RULE_INPUTS:
+            state.aggregate_factors[rule] = self._evaluate_aggregate_rule(rule, state)
+            state.add_factors(state.aggregate_factors[rule])
         
-        # Availability risks
-        risk_factors.extend(await self._assess_availability_risks(resources))
+        # Historical analysis (if context provided)
+        if request.historical_context:
+            state.aggregate_factors['historical'] = await self._analyze_historical_risks(request.historical_context)
+            state.add_factors(state.aggregate_factors['historical'])
         
-        # Cost risks
-        risk_factors.extend(await self._assess_cost_risks(resources))
+        return self._build_assessment(state, metadata={}, simulate=request.simulate)
+    
+    async def reassess_risk(self, request: IncrementalRiskAssessmentRequest) -> Optional[RiskAssessment]:
+        """Re-assess a previous assessment after a resource diff.
+        
+        Only the rules of added, removed and changed resources, plus the
+        aggregate rules whose input counters moved, are re-evaluated. The
+        overall score is updated from the running aggregates.
+        
+        Removed and changed resources are matched by resource key (see
+        _resource_key): a changed resource is identified by its key in the
+        ``name`` field and keeps the name of the resource it replaces.
+        Added resources are always new, so an added resource repeating an
+        existing name is kept alongside it, as a full assessment of the
+        resulting resources would. Raises ValueError for removed or
+        changed keys that are not part of the previous assessment.
+        """
+        previous = self.assessment_states.get(request.previous_assessment_id)
+        if previous is None:
+            return None
+        self.assessment_states.move_to_end(request.previous_assessment_id)
+        
+        # Start from a copy so the previous assessment stays addressable
+        state = AssessmentState(
+            blueprint_id=previous.blueprint_id,
+            deployment_id=previous.deployment_id,
+            historical_context=previous.historical_context,
+            resources=dict(previous.resources),
+            resource_factors=dict(previous.resource_factors),
+            aggregate_factors=dict(previous.aggregate_factors),
+            counts=Counter(previous.counts),
+            severity_counts=Counter(previous.severity_counts),
+            factor_groups=Counter(previous.factor_groups),
+            name_copies=Counter(previous.name_copies),
+            weighted_total=previous.weighted_total,
+            factor_count=previous.factor_count
+        )
+        counts_before = Counter(state.counts)
+        diff = request.diff
+        reevaluated = 0
+        dependencies_changed = False
+        
+        changed_keys = [self._resource_name(resource) for resource in diff.changed]
+        unknown = [key for key in [*diff.removed, *changed_keys] if key not in previous.resources]
+        if unknown:
+            raise ValueError(f"Unknown resources in diff: {', '.join(unknown)}")
+        
+        for key in diff.removed:
+            resource = state.resources.pop(key, None)
+            if resource is None:
+                continue
+            state.counts.subtract(self._classify_resource(resource))
+            state.remove_factors(state.resource_factors.pop(key))
+            reevaluated += 1
+            dependencies_changed = True
+        
+        updates = [(resource, self._resource_key(resource, state)) for resource in diff.added]
+        for resource, key in zip(diff.changed, changed_keys):
+            if key not in state.resources:
+                raise ValueError(f"Changed resource was removed in the same diff: {key}")
+            updates.append((self._renamed(resource, state.resources[key].get('name')), key))
+        for resource, key in updates:
+            old = state.resources.get(key)
+            if old is not None:
+                state.counts.subtract(self._classify_resource(old))
+                state.remove_factors(state.resource_factors[key])
+            if old is None or self._reference_record(old) != self._reference_record(resource):
+                dependencies_changed = True
+            state.resources[key] = resource
+            state.counts.update(self._classify_resource(resource))
+            state.resource_factors[key] = self._evaluate_resource(resource)
+            state.add_factors(state.resource_factors[key])
+            reevaluated += 1
+        
+        changed_counters = {
+            counter for counter in ('total', 'compute', 'load_balancer', 'network')
+            if state.counts[counter] != counts_before[counter]
+        }
+        if dependencies_changed:
+            changed_counters.add('dependencies')
+        rules_reevaluated = []
+        for rule, inputs in AGGREGATE_RULE_INPUTS.items():
+            if changed_counters.isdisjoint(inputs):
+                continue
+            state.remove_factors(state.aggregate_factors.get(rule, []))
+            state.aggregate_factors[rule] = self._evaluate_aggregate_rule(rule, state)
+            state.add_factors(state.aggregate_factors[rule])
+            rules_reevaluated.append(rule)
+        
+        return self._build_assessment(state, metadata={
+            'incremental': True,
+            'previous_assessment_id': request.previous_assessment_id,
+            'resources_reevaluated': reevaluated,
+            'rules_reevaluated': rules_reevaluated
+        }, simulate=request.simulate)
+    
+    async def assess_batch(self, lines: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        """Assess a stream of NDJSON-encoded requests across the process pool.
+        
+        Requests are sharded into chunks of ``risk_batch_chunk_size`` lines and
+        at most ``risk_batch_max_in_flight`` chunks are pending at once, so
+        reading the input waits on the workers and memory stays bounded.
+        Results are yielded as NDJSON lines in input order; each carries its
+        ``batch_index`` and failed items are reported as error records.
+        """
+        if self.batch_executor is None:
+            self.batch_executor = ProcessPoolExecutor(
+                max_workers=settings.risk_batch_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_batch_worker
+            )
         
-        # Performance risks
-        risk_factors.extend(await self._assess_performance_risks(resources))
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        chunk = []
+        index = 0
+        
+        async for line in lines:
+            chunk.append((index, line))
+            index += 1
+            if len(chunk) < settings.risk_batch_chunk_size:
+                continue
+            pending.append(loop.run_in_executor(self.batch_executor, _assess_batch_chunk, chunk))
+            chunk = []
+            while len(pending) >= settings.risk_batch_max_in_flight:
+                for result in await pending.popleft():
+                    yield result + "\n"
+        
+        if chunk:
+            pending.append(loop.run_in_executor(self.batch_executor, _assess_batch_chunk, chunk))
+        while pending:
+            for result in await pending.popleft():
+                yield result + "\n"
+        
+        logger.info(f"Batch risk assessment complete: {index} request(s)")
+    
+    async def _assess_lines(self, lines: List[tuple[int, bytes]]) -> List[str]:
+        """Assess NDJSON-encoded requests and serialize the results"""
+        results = []
+        for index, line in lines:
+            try:
+                request = RiskAssessmentRequest.model_validate_json(line)
+                if not request.blueprint_id and not request.deployment_id and not request.resources:
+                    raise ValueError("Either blueprint_id, deployment_id, or resources must be provided")
+                assessment = await self.assess_risk(request)
+                assessment.metadata['batch_index'] = index
+                results.append(assessment.model_dump_json())
+            except Exception as e:
+                results.append(json.dumps({'batch_index': index, 'error': str(e)}))
+        return results
+    
+    async def assess_risk_stream(
+        self,
+        lines: AsyncIterator[bytes],
+        blueprint_id: Optional[str] = None,
+        deployment_id: Optional[str] = None,
+        simulate: bool = False
+    ) -> AsyncIterator[str]:
+        """Assess NDJSON-encoded resources one at a time.
+        
+        Per-resource risk factors are emitted as ``risk_factor`` records as
+        soon as they are found. Only the resource counters, score aggregates
+        and the references needed for the dependency graph are kept, and a
+        final ``summary`` record carries the overall risk, with the score
+        distribution when ``simulate`` is set.
+        """
+        state = AssessmentState(
+            blueprint_id=blueprint_id,
+            deployment_id=deployment_id,
+            historical_context=None
+        )
+        leading_factors: List[RiskFactor] = []
+        output: List[str] = []
+        
+        def emit(factors: List[RiskFactor]):
+            state.add_factors(factors)
+            for factor in factors:
+                if factor.severity in [RiskLevel.CRITICAL, RiskLevel.HIGH] and len(leading_factors) < 10:
+                    leading_factors.append(factor)
+                output.append(f'{{"type": "risk_factor", "data": {factor.model_dump_json()}}}\n')
+        
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            try:
+                resource = json.loads(line)
+                # Evaluate fully before touching the state, so a bad line is not counted
+                counts = self._classify_resource(resource)
+                record = self._reference_record(resource)
+                factors = self._evaluate_resource(resource)
+                state.counts.update(counts)
+                state.resources[self._resource_key(resource, state)] = record
+                emit(factors)
+            except Exception as e:
+                output.append(json.dumps({'type': 'error', 'data': {'line': line_number, 'error': str(e)}}) + "\n")
+            if len(output) >= settings.risk_stream_flush_records:
+                yield "".join(output)
+                output.clear()
+        
+        # Deployment-wide rules once every resource has been counted
+        for rule in AGGREGATE_RULE_INPUTS:
+            emit(self._evaluate_aggregate_rule(rule, state))
+        
+        overall_risk, risk_score = self._calculate_overall_risk(
+            weighted_total=state.weighted_total,
+            factor_count=state.factor_count
+        )
+        metadata = {
+            'total_resources': state.counts['total'],
+            'high_risk_count': state.severity_counts[RiskLevel.HIGH] + state.severity_counts[RiskLevel.CRITICAL],
+            'categories_analyzed': list(self.risk_categories.keys())
+        }
+        if simulate and state.factor_count:
+            with stage_timer('risk_simulation'):
+                metadata['risk_simulation'] = self._simulate_risk_distribution(state.factor_groups)
         
-        # Operational risks
-        risk_factors.extend(await self._assess_operational_risks(resources))
+        summary = RiskAssessmentSummary(
+            assessment_id=str(uuid4()),
+            blueprint_id=blueprint_id,
+            deployment_id=deployment_id,
+            overall_risk=overall_risk,
+            risk_score=risk_score,
+            risk_factor_count=state.factor_count,
+            recommendations=self._generate_recommendations(leading_factors, state.severity_counts),
+            assessed_at=datetime.utcnow(),
+            metadata=metadata
+        )
+        output.append(f'{{"type": "summary", "data": {summary.model_dump_json()}}}\n')
+        yield "".join(output)
         
-        # Historical analysis (if context provided)
-        if request.historical_context:
-            risk_factors.extend(await self._analyze_historical_risks(request.historical_context))
+        logger.info(f"Streaming risk assessment complete: {overall_risk}, score: {risk_score:.2f}, factors: {state.factor_count}")
+    
+    def _reference_record(self, resource: Dict[str, Any]) -> Dict[str, Any]:
+        """Slim copy of a resource with only what the dependency graph reads"""
+        return {
+            'type': resource['type'],
+            'name': resource.get('name'),
+            'depends_on': resource.get('depends_on', []),
+            'properties': {
+                key: value for key, value in resource.get('properties', {}).items()
+                if isinstance(value, (str, list))
+            }
+        }
+    
+    def shutdown(self):
+        """Stop batch worker processes"""
+        if self.batch_executor is not None:
+            self.batch_executor.shutdown(wait=False, cancel_futures=True)
+            self.batch_executor = None
+    
+    def _build_assessment(self, state: AssessmentState, metadata: Dict[str, Any], simulate: bool = False) -> RiskAssessment:
+        """Build the response from an assessment state and remember the state"""
         
         # Calculate overall risk
-        overall_risk, risk_score = self._calculate_overall_risk(risk_factors)
+        overall_risk, risk_score = self._calculate_overall_risk(
+            weighted_total=state.weighted_total,
+            factor_count=state.factor_count
+        )
+        
+        risk_factors = self._ordered_factors(state)
+        
+        # Score distribution around the point estimate, on request
+        if simulate and state.factor_count:
+            with stage_timer('risk_simulation'):
+                metadata = {'risk_simulation': self._simulate_risk_distribution(state.factor_groups), **metadata}
         
         # Generate recommendations
-        recommendations = self._generate_recommendations(risk_factors)
+        recommendations = self._generate_recommendations(risk_factors, state.severity_counts)
         
         assessment = RiskAssessment(
             assessment_id=str(uuid4()),
-            blueprint_id=request.blueprint_id,
-            deployment_id=request.deployment_id,
+            blueprint_id=state.blueprint_id,
+            deployment_id=state.deployment_id,
             overall_risk=overall_risk,
             risk_score=risk_score,
             risk_factors=risk_factors,
             recommendations=recommendations,
             assessed_at=datetime.utcnow(),
             metadata={
-                'total_resources': len(resources),
-                'high_risk_count': sum(1 for r in risk_factors if r.severity in [RiskLevel.HIGH, RiskLevel.CRITICAL]),
-                'categories_analyzed': list(self.risk_categories.keys())
+                'total_resources': state.counts['total'],
+                'high_risk_count': state.severity_counts[RiskLevel.HIGH] + state.severity_counts[RiskLevel.CRITICAL],
+                'categories_analyzed': list(self.risk_categories.keys()),
+                **metadata
             }
         )
         
+        self.assessment_states[assessment.assessment_id] = state
+        while len(self.assessment_states) > settings.risk_assessment_cache_size:
+            self.assessment_states.popitem(last=False)
+        
         logger.info(f"Risk assessment complete: {overall_risk}, score: {risk_score:.2f}, factors: {len(risk_factors)}")
         
         return assessment
     
+    def _ordered_factors(self, state: AssessmentState) -> List[RiskFactor]:
+        """Flatten rule results, grouped by category in analysis order"""
+        category_order = {category: index for index, category in enumerate(self.risk_categories)}
+        factors = [f for factors in state.resource_factors.values() for f in factors]
+        factors.extend(f for factors in state.aggregate_factors.values() for f in factors)
+        factors.sort(key=lambda f: category_order.get(f.category, len(category_order)))
+        return factors
+    
     async def _fetch_resources(self, blueprint_id: str, deployment_id: str) -> List[Dict[str, Any]]:
         """Fetch resources from blueprint or deployment"""
         # Mock implementation
@@ -96,144 +449,230 @@ class RiskAssessmentService:
             {'type': 'azurerm_sql_database', 'name': 'db', 'properties': {}}
         ]
     
-    async def _assess_security_risks(self, resources: List[Dict[str, Any]]) -> List[RiskFactor]:
-        """Assess security-related risks"""
-        risks = []
-        
-        # Check for unencrypted storage
-        storage_resources = [r for r in resources if 'storage' in r['type'].lower() or 'disk' in r['type'].lower()]
-        if storage_resources:
-            for resource in storage_resources:
-                if not resource.get('properties', {}).get('encryption_enabled'):
-                    risks.append(RiskFactor(
-                        factor_id=str(uuid4()),
-                        category='security',
-                        severity=RiskLevel.HIGH,
-                        title='Unencrypted Storage',
-                        description=f"Storage resource '{resource['name']}' does not have encryption enabled",
-                        impact='Data breach risk, compliance violations',
-                        probability=0.4,
-                        mitigation='Enable encryption at rest for all storage resources',
-                        resources_affected=[resource['name']]
-                    ))
-        
-        # Check for public network exposure
-        network_resources = [r for r in resources if 'network' in r['type'].lower() or 'security' in r['type'].lower()]
-        if not network_resources:
-            risks.append(RiskFactor(
-                factor_id=str(uuid4()),
-                category='security',
-                severity=RiskLevel.MEDIUM,
-                title='Missing Network Security',
-                description='No network security groups or firewalls detected',
-                impact='Potential unauthorized access to resources',
-                probability=0.6,
-                mitigation='Implement network security groups with restrictive rules',
-                resources_affected=['network']
-            ))
-        
-        return risks
+    def _resource_name(self, resource: Dict[str, Any]) -> str:
+        """Name of a resource, or its type when it has none"""
+        return resource.get('name') or resource['type']
     
-    async def _assess_availability_risks(self, resources: List[Dict[str, Any]]) -> List[RiskFactor]:
-        """Assess availability-related risks"""
-        risks = []
-        
-        # Check for single points of failure
-        compute_count = sum(1 for r in resources if 'vm' in r['type'].lower() or 'instance' in r['type'].lower())
-        if compute_count == 1:
-            risks.append(RiskFactor(
-                factor_id=str(uuid4()),
-                category='availability',
-                severity=RiskLevel.HIGH,
-                title='Single Point of Failure',
-                description='Only one compute instance - no redundancy',
-                impact='Service downtime if instance fails',
-                probability=0.7,
-                mitigation='Deploy multiple instances with load balancing',
-                resources_affected=['compute']
-            ))
-        
-        # Check for backup configuration
-        db_resources = [r for r in resources if 'database' in r['type'].lower() or 'sql' in r['type'].lower()]
-        if db_resources:
-            for db in db_resources:
-                if not db.get('properties', {}).get('backup_retention_days'):
-                    risks.append(RiskFactor(
-                        factor_id=str(uuid4()),
-                        category='availability',
-                        severity=RiskLevel.MEDIUM,
-                        title='No Database Backup',
-                        description=f"Database '{db['name']}' has no backup configured",
-                        impact='Data loss risk in case of failure',
-                        probability=0.3,
-                        mitigation='Configure automated backups with appropriate retention',
-                        resources_affected=[db['name']]
-                    ))
-        
-        return risks
+    def _renamed(self, resource: Dict[str, Any], name: Optional[str]) -> Dict[str, Any]:
+        """Copy of a resource under another name, or unnamed"""
+        resource = {key: value for key, value in resource.items() if key != 'name'}
+        if name:
+            resource['name'] = name
+        return resource
     
-    async def _assess_cost_risks(self, resources: List[Dict[str, Any]]) -> List[RiskFactor]:
-        """Assess cost-related risks"""
-        risks = []
-        
-        # Check for oversized resources
-        for resource in resources:
-            if 'sku' in resource.get('properties', {}):
-                sku = resource['properties']['sku']
-                if any(size in sku for size in ['large', 'xlarge', '16', '32']):
-                    risks.append(RiskFactor(
-                        factor_id=str(uuid4()),
-                        category='cost',
-                        severity=RiskLevel.MEDIUM,
-                        title='Potentially Oversized Resource',
-                        description=f"Resource '{resource['name']}' may be larger than necessary",
-                        impact='Higher than necessary operational costs',
-                        probability=0.5,
-                        mitigation='Right-size resources based on actual usage metrics',
-                        resources_affected=[resource['name']]
-                    ))
-        
-        return risks
+    def _resource_key(self, resource: Dict[str, Any], state: AssessmentState) -> str:
+        """Key of a resource being added to an assessment.
+        
+        Resources are identified by name across assessments. Repeated
+        names, and repeated types of unnamed resources, get a ``#2``,
+        ``#3``, ... suffix so every copy is scored and reported once.
+        """
+        key = name = self._resource_name(resource)
+        while key in state.resources:
+            state.name_copies[name] += 1
+            key = f"{name}#{state.name_copies[name] + 1}"
+        return key
     
-    async def _assess_performance_risks(self, resources: List[Dict[str, Any]]) -> List[RiskFactor]:
-        """Assess performance-related risks"""
+    def _classify_resource(self, resource: Dict[str, Any]) -> Counter:
+        """Counters contributed by one resource to the aggregate rules"""
+        resource_type = resource['type'].lower()
+        return Counter({
+            'total': 1,
+            'compute': int('vm' in resource_type or 'instance' in resource_type),
+            'load_balancer': int('load' in resource_type and 'balancer' in resource_type),
+            'network': int('network' in resource_type or 'security' in resource_type)
+        })
+    
+    def _evaluate_resource(self, resource: Dict[str, Any]) -> List[RiskFactor]:
+        """Run every per-resource rule against one resource"""
         risks = []
-        
-        # Check for load balancing
-        compute_count = sum(1 for r in resources if 'vm' in r['type'].lower() or 'instance' in r['type'].lower())
-        lb_count = sum(1 for r in resources if 'load' in r['type'].lower() and 'balancer' in r['type'].lower())
-        
-        if compute_count > 1 and lb_count == 0:
-            risks.append(RiskFactor(
-                factor_id=str(uuid4()),
-                category='performance',
-                severity=RiskLevel.MEDIUM,
-                title='Missing Load Balancer',
-                description='Multiple compute instances without load balancing',
-                impact='Uneven load distribution, potential performance bottlenecks',
-                probability=0.6,
-                mitigation='Implement load balancer for traffic distribution',
-                resources_affected=['compute']
-            ))
-        
+        with stage_timer('risk_resource_rules'):
+            risks.extend(self._assess_storage_encryption(resource))
+            risks.extend(self._assess_database_backup(resource))
+            risks.extend(self._assess_resource_sizing(resource))
         return risks
     
-    async def _assess_operational_risks(self, resources: List[Dict[str, Any]]) -> List[RiskFactor]:
-        """Assess operational complexity risks"""
-        risks = []
+    def _evaluate_aggregate_rule(self, rule: str, state: AssessmentState) -> List[RiskFactor]:
+        """Run one deployment-wide rule against the resource counters"""
+        with stage_timer(f'risk_{rule}'):
+            return self._dispatch_aggregate_rule(rule, state)
+    
+    def _dispatch_aggregate_rule(self, rule: str, state: AssessmentState) -> List[RiskFactor]:
+        counts = state.counts
+        if rule == 'missing_network_security':
+            return self._assess_network_security(counts)
+        if rule == 'single_point_of_failure':
+            return self._assess_redundancy(counts)
+        if rule == 'missing_load_balancer':
+            return self._assess_load_balancing(counts)
+        if rule == 'infrastructure_complexity':
+            return self._assess_complexity(counts)
+        if rule == 'dependency_blast_radius':
+            return self._assess_dependency_graph(state.resources)
+        raise ValueError(f"Unknown aggregate rule: {rule}")
+    
+    def _assess_storage_encryption(self, resource: Dict[str, Any]) -> List[RiskFactor]:
+        """Check for unencrypted storage"""
+        resource_type = resource['type'].lower()
+        if 'storage' not in resource_type and 'disk' not in resource_type:
+            return []
+        if resource.get('properties', {}).get('encryption_enabled'):
+            return []
+        return [RiskFactor(
+            factor_id=str(uuid4()),
+            category='security',
+            severity=RiskLevel.HIGH,
+            title='Unencrypted Storage',
+            description=f"Storage resource '{self._resource_name(resource)}' does not have encryption enabled",
+            impact='Data breach risk, compliance violations',
+            probability=0.4,
+            mitigation='Enable encryption at rest for all storage resources',
+            resources_affected=[self._resource_name(resource)]
+        )]
+    
+    def _assess_network_security(self, counts: Counter) -> List[RiskFactor]:
+        """Check for public network exposure"""
+        if counts['network']:
+            return []
+        return [RiskFactor(
+            factor_id=str(uuid4()),
+            category='security',
+            severity=RiskLevel.MEDIUM,
+            title='Missing Network Security',
+            description='No network security groups or firewalls detected',
+            impact='Potential unauthorized access to resources',
+            probability=0.6,
+            mitigation='Implement network security groups with restrictive rules',
+            resources_affected=['network']
+        )]
+    
+    def _assess_redundancy(self, counts: Counter) -> List[RiskFactor]:
+        """Check for single points of failure"""
+        if counts['compute'] != 1:
+            return []
+        return [RiskFactor(
+            factor_id=str(uuid4()),
+            category='availability',
+            severity=RiskLevel.HIGH,
+            title='Single Point of Failure',
+            description='Only one compute instance - no redundancy',
+            impact='Service downtime if instance fails',
+            probability=0.7,
+            mitigation='Deploy multiple instances with load balancing',
+            resources_affected=['compute']
+        )]
+    
+    def _assess_database_backup(self, resource: Dict[str, Any]) -> List[RiskFactor]:
+        """Check for backup configuration"""
+        resource_type = resource['type'].lower()
+        if 'database' not in resource_type and 'sql' not in resource_type:
+            return []
+        if resource.get('properties', {}).get('backup_retention_days'):
+            return []
+        return [RiskFactor(
+            factor_id=str(uuid4()),
+            category='availability',
+            severity=RiskLevel.MEDIUM,
+            title='No Database Backup',
+            description=f"Database '{self._resource_name(resource)}' has no backup configured",
+            impact='Data loss risk in case of failure',
+            probability=0.3,
+            mitigation='Configure automated backups with appropriate retention',
+            resources_affected=[self._resource_name(resource)]
+        )]
+    
+    def _assess_resource_sizing(self, resource: Dict[str, Any]) -> List[RiskFactor]:
+        """Check for oversized resources"""
+        sku = resource.get('properties', {}).get('sku')
+        if sku is None or not any(size in sku for size in ['large', 'xlarge', '16', '32']):
+            return []
+        return [RiskFactor(
+            factor_id=str(uuid4()),
+            category='cost',
+            severity=RiskLevel.MEDIUM,
+            title='Potentially Oversized Resource',
+            description=f"Resource '{self._resource_name(resource)}' may be larger than necessary",
+            impact='Higher than necessary operational costs',
+            probability=0.5,
+            mitigation='Right-size resources based on actual usage metrics',
+            resources_affected=[self._resource_name(resource)]
+        )]
+    
+    def _assess_load_balancing(self, counts: Counter) -> List[RiskFactor]:
+        """Check for load balancing"""
+        if counts['compute'] <= 1 or counts['load_balancer'] > 0:
+            return []
+        return [RiskFactor(
+            factor_id=str(uuid4()),
+            category='performance',
+            severity=RiskLevel.MEDIUM,
+            title='Missing Load Balancer',
+            description='Multiple compute instances without load balancing',
+            impact='Uneven load distribution, potential performance bottlenecks',
+            probability=0.6,
+            mitigation='Implement load balancer for traffic distribution',
+            resources_affected=['compute']
+        )]
+    
+    def _assess_complexity(self, counts: Counter) -> List[RiskFactor]:
+        """Check operational complexity"""
+        if counts['total'] <= 20:
+            return []
+        return [RiskFactor(
+            factor_id=str(uuid4()),
+            category='operational',
+            severity=RiskLevel.LOW,
+            title='High Infrastructure Complexity',
+            description=f"{counts['total']} resources may increase operational overhead",
+            impact='Higher maintenance burden, increased chance of configuration errors',
+            probability=0.4,
+            mitigation='Consider infrastructure simplification or automation tools',
+            resources_affected=['infrastructure']
+        )]
+    
+    def _assess_dependency_graph(self, resources: Dict[str, Dict[str, Any]]) -> List[RiskFactor]:
+        """Check for shared dependencies whose failure takes down other resources.
+        
+        Articulation points are a global property of the graph, so the
+        graph is rebuilt from all resources, O(resources + references), on
+        every evaluation. Incremental assessments only pay this when the
+        diff adds or removes resources or changes references; changes to
+        other properties leave the rule's result in place.
+        """
+        graph = DependencyGraph(resources)
+        if not graph.num_edges:
+            return []
+        
+        # Articulation points, largest disconnected part first
+        cut_off = graph.articulation_points()
+        candidates = sorted(cut_off, key=cut_off.get, reverse=True)[:settings.risk_blast_radius_max_factors]
         
-        # Check complexity
-        if len(resources) > 20:
+        risks = []
+        for node in candidates:
+            affected = graph.blast_radius(node)
+            if len(affected) < settings.risk_blast_radius_min_resources:
+                continue
+            share = len(affected) / graph.num_nodes
+            if share >= 0.5:
+                severity = RiskLevel.CRITICAL
+            elif share >= 0.2:
+                severity = RiskLevel.HIGH
+            else:
+                severity = RiskLevel.MEDIUM
+            name = graph.names[node]
             risks.append(RiskFactor(
                 factor_id=str(uuid4()),
-                category='operational',
-                severity=RiskLevel.LOW,
-                title='High Infrastructure Complexity',
-                description=f'{len(resources)} resources may increase operational overhead',
-                impact='Higher maintenance burden, increased chance of configuration errors',
-                probability=0.4,
-                mitigation='Consider infrastructure simplification or automation tools',
-                resources_affected=['infrastructure']
+                category='availability',
+                severity=severity,
+                title='Shared Dependency Single Point of Failure',
+                description=(
+                    f"Failure of '{name}' affects {len(affected)} dependent resource(s) "
+                    f"and disconnects {cut_off[node]} resource(s) from the rest of the deployment"
+                ),
+                impact='Cascading outage across dependent resources',
+                probability=0.3,
+                mitigation='Add redundancy for the shared dependency or split dependents across independent instances',
+                resources_affected=[name] + [graph.names[v] for v in affected]
             ))
         
         return risks
@@ -258,27 +697,26 @@ class RiskAssessmentService:
         
         return risks
     
-    def _calculate_overall_risk(self, risk_factors: List[RiskFactor]) -> tuple[RiskLevel, float]:
-        """Calculate overall risk level and score"""
-        if not risk_factors:
+    def _calculate_overall_risk(
+        self,
+        risk_factors: Optional[List[RiskFactor]] = None,
+        weighted_total: Optional[float] = None,
+        factor_count: Optional[int] = None
+    ) -> tuple[RiskLevel, float]:
+        """Calculate overall risk level and score.
+        
+        Either pass the risk factors, or the precomputed sum of
+        severity weight times probability and the number of factors.
+        """
+        if risk_factors is not None:
+            weighted_total = sum(SEVERITY_WEIGHTS[r.severity] * r.probability for r in risk_factors)
+            factor_count = len(risk_factors)
+        
+        if not factor_count:
             return RiskLevel.LOW, 10.0
         
-        # Weight by severity
-        severity_weights = {
-            RiskLevel.LOW: 1.0,
-            RiskLevel.MEDIUM: 2.5,
-            RiskLevel.HIGH: 5.0,
-            RiskLevel.CRITICAL: 10.0
-        }
-        
-        # Calculate weighted score
-        total_score = 0.0
-        for risk in risk_factors:
-            weight = severity_weights[risk.severity]
-            total_score += weight * risk.probability
-        
-        # Normalize to 0-100
-        risk_score = min(total_score * 10, 100.0)
+        # Normalize to 0-100 (clamped at 0 against float drift from incremental updates)
+        risk_score = min(max(weighted_total, 0.0) * 10, 100.0)
         
         # Determine overall level
         if risk_score < 25:
@@ -292,22 +730,101 @@ class RiskAssessmentService:
         
         return overall_risk, risk_score
     
-    def _generate_recommendations(self, risk_factors: List[RiskFactor]) -> List[str]:
-        """Generate actionable recommendations"""
+    def _simulate_risk_distribution(self, factor_groups: Counter) -> Dict[str, Any]:
+        """Monte Carlo distribution of the risk score.
+        
+        Each trial samples which risk factors occur as Bernoulli draws with
+        the factor's probability and scores them like _calculate_overall_risk.
+        Bernoulli rows compare raw 16-bit random words against integer
+        thresholds, and large groups of factors sharing a severity and
+        probability are drawn as a single binomial row instead. Trials are
+        reduced so that trials times rows stays within
+        ``risk_simulation_max_draws``; the result reports both the trials
+        run and ``trials_requested``.
+        """
+        groups = [(group, count) for group, count in factor_groups.items() if count > 0]
+        weights = np.array([SEVERITY_WEIGHTS[severity] for (severity, _), _ in groups], dtype=np.float32)
+        probabilities = np.array([probability for (_, probability), _ in groups])
+        counts = np.array([count for _, count in groups])
+        
+        bernoulli = counts <= BERNOULLI_MAX_GROUP_SIZE
+        bernoulli_weights = np.repeat(weights[bernoulli], counts[bernoulli])
+        thresholds = np.repeat(np.round(probabilities[bernoulli] * 65536), counts[bernoulli]).astype(np.uint32)[:, None]
+        binomial_weights = weights[~bernoulli]
+        binomial_counts = counts[~bernoulli, None]
+        binomial_probabilities = probabilities[~bernoulli, None]
+        
+        rng = np.random.default_rng(settings.risk_simulation_seed)
+        rows = len(bernoulli_weights) + len(binomial_weights)
+        trials = max(
+            min(settings.risk_simulation_trials, settings.risk_simulation_max_draws // rows),
+            settings.risk_simulation_min_trials
+        )
+        if trials < settings.risk_simulation_trials:
+            logger.info(
+                f"Risk simulation capped at {trials} of {settings.risk_simulation_trials} trials "
+                f"for {rows} factor rows"
+            )
+        scores = np.zeros(trials, dtype=np.float32)
+        
+        # Sample in chunks of trials to keep the occurrence matrix cache-sized
+        for start in range(0, trials, settings.risk_simulation_chunk_size):
+            size = min(settings.risk_simulation_chunk_size, trials - start)
+            if len(bernoulli_weights):
+                words = len(bernoulli_weights) * size
+                draws = rng.bit_generator.random_raw(-(-words // 4)).view(np.uint16)[:words]
+                occurred = draws.reshape(len(bernoulli_weights), size) < thresholds
+                scores[start:start + size] += bernoulli_weights @ occurred.astype(np.float32)
+            if len(binomial_weights):
+                occurrences = rng.binomial(binomial_counts, binomial_probabilities, size=(len(binomial_weights), size))
+                scores[start:start + size] += binomial_weights @ occurrences.astype(np.float32)
+        
+        # Normalize to 0-100 as in _calculate_overall_risk
+        np.minimum(scores * 10, 100.0, out=scores)
+        
+        p5, p25, p50, p75, p95, p99 = np.percentile(scores, [5, 25, 50, 75, 95, 99]).tolist()
+        level_counts = np.bincount(np.searchsorted([25, 50, 75], scores, side='right'), minlength=4)
+        
+        return {
+            'trials': trials,
+            'trials_requested': settings.risk_simulation_trials,
+            'mean': float(scores.mean()),
+            'std': float(scores.std()),
+            'percentiles': {'p5': p5, 'p25': p25, 'p50': p50, 'p75': p75, 'p95': p95, 'p99': p99},
+            'confidence_interval_90': [p5, p95],
+            'level_probabilities': {
+                level.value: float(count) / trials
+                for level, count in zip(
+                    [RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL],
+                    level_counts.tolist()
+                )
+            }
+        }
+    
+    def _generate_recommendations(
+        self,
+        risk_factors: List[RiskFactor],
+        severity_counts: Optional[Counter] = None
+    ) -> List[str]:
+        """Generate actionable recommendations.
+        
+        Pass ``severity_counts`` when ``risk_factors`` only holds the leading
+        high-severity factors rather than all of them.
+        """
         recommendations = []
         
         # Group by severity
-        critical_risks = [r for r in risk_factors if r.severity == RiskLevel.CRITICAL]
-        high_risks = [r for r in risk_factors if r.severity == RiskLevel.HIGH]
+        if severity_counts is None:
+            severity_counts = Counter(r.severity for r in risk_factors)
         
-        if critical_risks:
+        if severity_counts[RiskLevel.CRITICAL]:
             recommendations.append(
-                f"URGENT: Address {len(critical_risks)} critical risk(s) before deployment"
+                f"URGENT: Address {severity_counts[RiskLevel.CRITICAL]} critical risk(s) before deployment"
             )
         
-        if high_risks:
+        if severity_counts[RiskLevel.HIGH]:
             recommendations.append(
-                f"Address {len(high_risks)} high-severity risk(s) to improve reliability"
+                f"Address {severity_counts[RiskLevel.HIGH]} high-severity risk(s) to improve reliability"
             )
         
         # Add specific recommendations
@@ -316,3 +833,20 @@ class RiskAssessmentService:
                 recommendations.append(f"{risk.title}: {risk.mitigation}")
         
         return recommendations[:10]  # limit to top 10
+
+
+# Batch worker process state
+_batch_worker_service: Optional[RiskAssessmentService] = None
+
+
+def _init_batch_worker():
+    global _batch_worker_service
+    _batch_worker_service = RiskAssessmentService()
+
+
+def _assess_batch_chunk(lines: List[tuple[int, bytes]]) -> List[str]:
+    """Assess one shard of a batch inside a worker process"""
+    results = asyncio.run(_batch_worker_service._assess_lines(lines))
+    # Worker-side states cannot be reached by incremental requests
+    _batch_worker_service.assessment_states.clear()
+    return results
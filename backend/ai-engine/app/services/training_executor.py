@@ -0,0 +1,255 @@
+import os
+import time
+import shutil
+import signal
+import tempfile
+import asyncio
+import logging
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+
+class TrainingCancelled(Exception):
+    """Raised when a training job is cancelled"""
+
+
+class ProgressReporter:
+    """Sends progress from a worker process and observes cancellation.
+    
+    Updates within the same phase are sent at most every ``min_interval``
+    seconds; phase changes are always sent.
+    """
+    
+    def __init__(self, connection, cancel_event, min_interval: float = 0.0):
+        self.connection = connection
+        self.cancel_event = cancel_event
+        self.min_interval = min_interval
+        self.last_status: Optional[str] = None
+        self.last_sent = 0.0
+    
+    def report(self, status: str, progress: float, metrics: Optional[Dict[str, float]] = None):
+        now = time.monotonic()
+        if status != self.last_status or now - self.last_sent >= self.min_interval:
+            self.connection.send(('progress', {'status': status, 'progress': progress, 'metrics': metrics}))
+            self.last_status = status
+            self.last_sent = now
+        if self.cancel_event.is_set():
+            raise TrainingCancelled()
+
+
+def _limit_worker(cpus: List[int], cpu_time_limit: Optional[int], niceness: int):
+    """Pin the worker to its CPUs and cap its CPU time and priority"""
+    # Must run before numpy is imported so BLAS pools are sized to the pinned CPUs
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(len(cpus))
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    if niceness:
+        os.nice(niceness)
+    if cpu_time_limit:
+        import resource
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit + 5))
+
+
+def _run_training_job(
+    connection,
+    cancel_event,
+    training_data: Dict[str, Any],
+    parameters: Dict[str, Any],
+    cpus: List[int],
+    cpu_time_limit: Optional[int],
+    niceness: int,
+    progress_interval: float,
+    artifact_dir: Optional[str],
+    dataset: Optional[Dict[str, Any]],
+    scratch_root: Optional[str],
+    checkpoint_path: Optional[str],
+    checkpoint_interval: float
+):
+    """Worker process entry point"""
+    try:
+        _limit_worker(cpus, cpu_time_limit, niceness)
+        from app.services.model_trainers import TrainingCheckpoint, prepare_inline, train_classifier
+        from app.services.datasets import prepare_dataset
+        
+        reporter = ProgressReporter(connection, cancel_event, progress_interval)
+        reporter.report('preparing_data', 0.05)
+        with tempfile.TemporaryDirectory(dir=scratch_root) as scratch_dir:
+            if dataset is not None:
+                data = prepare_dataset(dataset, parameters, scratch_dir, reporter)
+            else:
+                data = prepare_inline(training_data, parameters)
+            checkpoint = TrainingCheckpoint(checkpoint_path, checkpoint_interval) if checkpoint_path else None
+            metrics = train_classifier(data, parameters, reporter, artifact_dir, checkpoint)
+        connection.send(('completed', metrics))
+    except TrainingCancelled:
+        connection.send(('cancelled', None))
+    except Exception as e:
+        connection.send(('failed', f'{type(e).__name__}: {e}'))
+    finally:
+        connection.close()
+
+
+class TrainingExecutor:
+    """Runs training jobs in separate, resource-limited worker processes.
+    
+    Each job runs in the worker slot granted by the scheduler, which pins
+    it to that slot's slice of the available CPUs, so training neither
+    competes for the event loop nor starves the API of cores.
+    Progress arrives over a pipe watched by the event loop. Cancellation
+    is cooperative at the next progress report, and the process is
+    terminated if it has not stopped after a grace period. Workers
+    checkpoint to a directory per job under ``checkpoint_root``, and a
+    job run again under the same id resumes from its checkpoint.
+    """
+    
+    def __init__(
+        self,
+        cpus_per_job: int,
+        cpu_time_limit: Optional[int],
+        niceness: int,
+        cancel_grace_seconds: float,
+        progress_interval: float = 0.0,
+        scratch_root: Optional[str] = None,
+        checkpoint_root: Optional[str] = None,
+        checkpoint_interval: float = 60.0
+    ):
+        self.context = multiprocessing.get_context('spawn')
+        self.cpus_per_job = cpus_per_job
+        self.cpu_time_limit = cpu_time_limit
+        self.niceness = niceness
+        self.cancel_grace_seconds = cancel_grace_seconds
+        self.progress_interval = progress_interval
+        self.scratch_root = scratch_root
+        self.checkpoint_root = checkpoint_root
+        self.checkpoint_interval = checkpoint_interval
+        self.cancel_events: Dict[str, Any] = {}
+        self.processes: Dict[str, multiprocessing.process.BaseProcess] = {}
+        self.cancelled = set()
+    
+    async def run(
+        self,
+        job_id: str,
+        slot: int,
+        training_data: Dict[str, Any],
+        parameters: Dict[str, Any],
+        on_progress: Callable[[Dict[str, Any]], None],
+        artifact_dir: Optional[str] = None,
+        dataset: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, float]:
+        """Run a job to completion, returning its metrics.
+        
+        The worker reads ``dataset`` shards from disk instead of the inline
+        ``training_data`` when given. The trained model is written to
+        ``artifact_dir`` when given. Raises TrainingCancelled if the job is
+        cancelled and RuntimeError if it fails.
+        """
+        try:
+            return await self._run_process(
+                job_id, slot, training_data, parameters, on_progress, artifact_dir, dataset
+            )
+        finally:
+            self.cancelled.discard(job_id)
+    
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation of a running job, returning False if it has no worker process"""
+        cancel_event = self.cancel_events.get(job_id)
+        if cancel_event is None:
+            return False
+        self.cancelled.add(job_id)
+        cancel_event.set()
+        asyncio.get_running_loop().call_later(self.cancel_grace_seconds, self._terminate, job_id)
+        return True
+    
+    def discard_checkpoint(self, job_id: str):
+        """Remove the checkpoints of a finished job and of any jobs nested under its id"""
+        if self.checkpoint_root:
+            shutil.rmtree(Path(self.checkpoint_root) / job_id, ignore_errors=True)
+    
+    def shutdown(self):
+        """Terminate all running jobs"""
+        for job_id in list(self.processes):
+            self.cancelled.add(job_id)
+            self._terminate(job_id)
+    
+    async def _run_process(
+        self,
+        job_id: str,
+        slot: int,
+        training_data: Dict[str, Any],
+        parameters: Dict[str, Any],
+        on_progress: Callable[[Dict[str, Any]], None],
+        artifact_dir: Optional[str],
+        dataset: Optional[Dict[str, Any]]
+    ) -> Dict[str, float]:
+        loop = asyncio.get_running_loop()
+        receiver, sender = self.context.Pipe(duplex=False)
+        cancel_event = self.context.Event()
+        process = self.context.Process(
+            target=_run_training_job,
+            args=(
+                sender, cancel_event, training_data, parameters,
+                self._slot_cpus(slot), self.cpu_time_limit, self.niceness,
+                self.progress_interval, artifact_dir, dataset, self.scratch_root,
+                str(Path(self.checkpoint_root) / job_id / 'checkpoint.npz') if self.checkpoint_root else None,
+                self.checkpoint_interval
+            ),
+            daemon=True
+        )
+        process.start()
+        sender.close()
+        self.cancel_events[job_id] = cancel_event
+        self.processes[job_id] = process
+        
+        outcome = loop.create_future()
+        
+        def on_readable():
+            try:
+                while receiver.poll():
+                    kind, payload = receiver.recv()
+                    if kind == 'progress':
+                        on_progress(payload)
+                    elif not outcome.done():
+                        outcome.set_result((kind, payload))
+            except (EOFError, OSError):
+                if not outcome.done():
+                    outcome.set_result(('exited', None))
+        
+        loop.add_reader(receiver.fileno(), on_readable)
+        try:
+            kind, payload = await outcome
+        finally:
+            loop.remove_reader(receiver.fileno())
+            receiver.close()
+            await loop.run_in_executor(None, process.join)
+            self.cancel_events.pop(job_id, None)
+            self.processes.pop(job_id, None)
+        
+        # A cancel that arrived while the worker was finishing still wins
+        if kind == 'cancelled' or job_id in self.cancelled:
+            raise TrainingCancelled()
+        if kind == 'completed':
+            return payload
+        if kind == 'failed':
+            raise RuntimeError(payload)
+        if hasattr(signal, 'SIGXCPU') and process.exitcode == -signal.SIGXCPU:
+            raise RuntimeError(f'CPU time limit of {self.cpu_time_limit}s exceeded')
+        raise RuntimeError(f'Training process exited with code {process.exitcode}')
+    
+    def _slot_cpus(self, slot: int) -> List[int]:
+        """CPUs assigned to a worker slot, wrapping when slots outnumber CPUs"""
+        available = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else list(range(os.cpu_count() or 1))
+        count = min(self.cpus_per_job, len(available))
+        start = slot * count
+        return [available[(start + offset) % len(available)] for offset in range(count)]
+    
+    def _terminate(self, job_id: str):
+        process = self.processes.get(job_id)
+        if process is not None and process.is_alive():
+            logger.warning(f"Terminating training job {job_id}")
+            process.terminate()
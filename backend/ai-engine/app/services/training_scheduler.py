@@ -0,0 +1,154 @@
+import time
+import bisect
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.models import TrainingPriority
+from app.services.training_executor import TrainingCancelled
+
+PRIORITY_LEVELS = {
+    TrainingPriority.LOW: 0,
+    TrainingPriority.NORMAL: 1,
+    TrainingPriority.HIGH: 2
+}
+
+
+@dataclass
+class QueuedJob:
+    job_id: str
+    model_name: str
+    level: int
+    submitted_at: float
+    sequence: int
+    grant: asyncio.Future = field(repr=False)
+    worker: bool = True
+
+
+class TrainingScheduler:
+    """Priority scheduler for training jobs with a bounded number of workers.
+    
+    Jobs are dispatched by effective priority, the priority level plus one
+    for every ``aging_seconds`` spent waiting, with ties broken by arrival
+    order. Waiting raises a job's priority without bound, so a steady
+    stream of high-priority work cannot starve older jobs. Only one job
+    per model name runs at a time; a job whose model is busy is passed
+    over without blocking the jobs behind it. A job may also hold a model
+    without a worker, e.g. a search whose trials run under their own
+    sub-slot names.
+    
+    Aging raises every waiting job's priority at the same rate, so the
+    dispatch order is fixed at submission: waiting jobs are kept sorted by
+    ``submitted_at / aging_seconds - level`` and a queue position is a
+    binary search.
+    """
+    
+    def __init__(self, max_workers: int, aging_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.aging_seconds = aging_seconds
+        self.clock = clock
+        self.free_slots = list(range(max_workers - 1, -1, -1))
+        self.waiting: Dict[str, QueuedJob] = {}
+        # (rank, sequence, job_id) of waiting jobs in dispatch order
+        self.order: List[Tuple[float, int, str]] = []
+        self.running: Dict[str, str] = {}
+        self.running_slots: Dict[str, int] = {}
+        # Waiting jobs that only hold a model and can start without a free worker
+        self.waiting_without_worker = 0
+        self.sequence = itertools.count()
+    
+    async def acquire(
+        self,
+        job_id: str,
+        model_name: str,
+        priority: TrainingPriority = TrainingPriority.NORMAL,
+        worker: bool = True
+    ) -> Optional[int]:
+        """Wait for the job's turn, returning its worker slot.
+        
+        Without ``worker`` only the model is held, and None is returned.
+        Raises TrainingCancelled if the job is cancelled while queued.
+        """
+        job = self.waiting[job_id] = QueuedJob(
+            job_id=job_id,
+            model_name=model_name,
+            level=PRIORITY_LEVELS[TrainingPriority(priority)],
+            submitted_at=self.clock(),
+            sequence=next(self.sequence),
+            grant=asyncio.get_running_loop().create_future(),
+            worker=worker
+        )
+        self.waiting_without_worker += not worker
+        bisect.insort(self.order, self._entry(job))
+        self._dispatch()
+        try:
+            return await job.grant
+        except asyncio.CancelledError:
+            if self._dequeue(job_id) is None and job_id in self.running:
+                self.release(job_id)
+            raise
+    
+    def release(self, job_id: str):
+        """Free a running job's worker slot and model"""
+        if self.running.pop(job_id, None) is not None:
+            slot = self.running_slots.pop(job_id, None)
+            if slot is not None:
+                self.free_slots.append(slot)
+            self._dispatch()
+    
+    def cancel(self, job_id: str) -> bool:
+        """Remove a queued job, returning False if it is not queued"""
+        job = self._dequeue(job_id)
+        if job is None:
+            return False
+        if not job.grant.done():
+            job.grant.set_exception(TrainingCancelled())
+        return True
+    
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based dispatch order of a queued job if no job finished in between"""
+        job = self.waiting.get(job_id)
+        if job is None:
+            return None
+        return bisect.bisect_left(self.order, self._entry(job)) + 1
+    
+    def queue_positions(self) -> Dict[str, int]:
+        """Queue positions of all queued jobs"""
+        return {job_id: position for position, (_, _, job_id) in enumerate(self.order, start=1)}
+    
+    def _entry(self, job: QueuedJob) -> Tuple[float, int, str]:
+        # Effective priority at time t is level + (t - submitted_at) / aging_seconds;
+        # ordering by it at any t is ordering by this rank
+        return (job.submitted_at / self.aging_seconds - job.level, job.sequence, job.job_id)
+    
+    def _dequeue(self, job_id: str) -> Optional[QueuedJob]:
+        job = self.waiting.pop(job_id, None)
+        if job is not None:
+            self.waiting_without_worker -= not job.worker
+            del self.order[bisect.bisect_left(self.order, self._entry(job))]
+        return job
+    
+    def _dispatch(self):
+        if not self.waiting or not (self.free_slots or self.waiting_without_worker):
+            return
+        busy = set(self.running.values())
+        dispatched = []
+        for entry in self.order:
+            if not self.free_slots and not self.waiting_without_worker:
+                break
+            job = self.waiting[entry[2]]
+            if job.model_name in busy or (job.worker and not self.free_slots):
+                continue
+            dispatched.append(entry)
+            del self.waiting[job.job_id]
+            self.running[job.job_id] = job.model_name
+            if job.worker:
+                slot = self.running_slots[job.job_id] = self.free_slots.pop()
+            else:
+                slot = None
+                self.waiting_without_worker -= 1
+            busy.add(job.model_name)
+            job.grant.set_result(slot)
+        if dispatched:
+            dispatched = set(dispatched)
+            self.order = [entry for entry in self.order if entry not in dispatched]
@@ -1,10 +1,23 @@
+import asyncio
 import logging
-from typing import Dict, Any
-from datetime import datetime
+import secrets
+from typing import Dict, Any, AsyncIterator, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
 from uuid import uuid4
-from fastapi import BackgroundTasks
 
-from app.models import TrainingRequest, TrainingStatus
+from pydantic import ValidationError
+
+from app.config import settings
+from app.models import SearchStrategy, TrainingRequest, TrainingStatus
+from app.pubsub import Broadcaster
+from app.streaming import sse_event, SSE_KEEPALIVE
+from app.services.training_executor import TrainingExecutor, TrainingCancelled
+from app.services.training_scheduler import TrainingScheduler
+from app.services.model_registry import ModelRegistry
+from app.services.model_trainers import CLASSIFIER_KIND
+from app.services.datasets import resolve_shards, dataset_format
+from app.services.hyperparameter_search import SuccessiveHalving, Trial, expand_trials
+from app.services.training_store import TrainingJobStore, TERMINAL_STATUSES
 
 logger = logging.getLogger(__name__)
 
@@ -12,80 +25,443 @@ logger = logging.getLogger(__name__)
 class ModelTrainingService:
     """Service for ML model training"""
     
-    def __init__(self):
+    def __init__(self, registry: ModelRegistry):
         logger.info("Initializing Model Training Service...")
+        # Jobs in flight, with live progress; all jobs are persisted in the store
         self.training_jobs: Dict[str, TrainingStatus] = {}
+        self.job_store = TrainingJobStore(
+            settings.training_job_db_path,
+            max_finished=settings.training_job_max_finished,
+            max_age=timedelta(days=settings.training_job_retention_days)
+        )
+        self.training_tasks: Dict[str, asyncio.Task] = {}
+        # Queued or running trial job ids per search; removed when a search is cancelled
+        self.search_trials: Dict[str, Set[str]] = {}
+        # Jobs cancelled while neither queued nor in a worker, checked before a worker starts
+        self.cancelled_jobs: Set[str] = set()
+        # Jobs interrupted by shutdown stay unfinished in the store and resume on restart
+        self.shutting_down = False
+        # Trained models are published as new registry versions
+        self.registry = registry
+        
+        # Status updates fanned out to progress watchers, one topic per job
+        self.progress = Broadcaster()
+        self.scheduler = TrainingScheduler(
+            max_workers=settings.training_max_workers,
+            aging_seconds=settings.training_priority_aging_seconds
+        )
+        self.executor = TrainingExecutor(
+            cpus_per_job=settings.training_job_cpus,
+            cpu_time_limit=settings.training_job_cpu_time_limit_seconds,
+            niceness=settings.training_worker_niceness,
+            cancel_grace_seconds=settings.training_cancel_grace_seconds,
+            progress_interval=settings.training_progress_interval_seconds,
+            scratch_root=settings.training_scratch_dir,
+            checkpoint_root=settings.training_checkpoint_dir,
+            checkpoint_interval=settings.training_checkpoint_interval_seconds
+        )
         logger.info("Model Training Service initialized")
     
-    async def start_training(
-        self, 
-        request: TrainingRequest,
-        background_tasks: BackgroundTasks
-    ) -> TrainingStatus:
-        """Start model training job in background"""
+    async def start_training(self, request: TrainingRequest) -> TrainingStatus:
+        """Queue a model training job for the scheduler"""
         
+        if request.search and request.search.strategy == SearchStrategy.RANDOM and request.search.seed is None:
+            # Fix the sampled trials, so a resumed search runs the same ones
+            request.search.seed = secrets.randbits(32)
+        dataset = self._resolve_dataset(request)
+        search = self._plan_search(request)
         job_id = str(uuid4())
         
         status = TrainingStatus(
             job_id=job_id,
             model_name=request.model_name,
-            status='started',
+            status='queued',
             progress=0.0,
             started_at=datetime.utcnow()
         )
         
-        self.training_jobs[job_id] = status
-        
-        # Schedule background training
-        background_tasks.add_task(
-            self._train_model,
-            job_id,
-            request
-        )
+        self.job_store.save(status)
+        self.job_store.save_request(job_id, request.model_dump_json())
+        self._schedule(status, request, dataset, search)
         
         logger.info(f"Started training job {job_id} for model {request.model_name}")
         
         return status
     
+    def resume_interrupted(self) -> int:
+        """Requeue jobs left unfinished by a previous process, returning how many.
+        
+        Resumed jobs continue from their latest checkpoint. Jobs whose
+        request is missing or no longer valid, e.g. because its dataset
+        was removed, are marked as failed.
+        """
+        resumed = 0
+        for status, request_json in self.job_store.unfinished():
+            try:
+                if request_json is None:
+                    raise ValueError("training request was not stored")
+                request = TrainingRequest.model_validate_json(request_json)
+                dataset = self._resolve_dataset(request)
+                search = self._plan_search(request)
+            except (ValueError, ValidationError) as e:
+                logger.warning(f"Cannot resume training job {status.job_id}: {str(e)}")
+                status.status = 'failed'
+                status.error = f"Interrupted by service restart and could not resume: {e}"
+                status.completed_at = datetime.utcnow()
+                self.job_store.save(status)
+                self.executor.discard_checkpoint(status.job_id)
+                continue
+            
+            status.status = 'queued'
+            self.job_store.save(status)
+            self._schedule(status, request, dataset, search)
+            resumed += 1
+        
+        if resumed:
+            logger.info(f"Resumed {resumed} interrupted training jobs")
+        return resumed
+    
     async def get_training_status(self, job_id: str) -> TrainingStatus:
         """Get training job status"""
-        return self.training_jobs.get(job_id)
+        status = self.training_jobs.get(job_id)
+        if status is None:
+            return self.job_store.get(job_id)
+        status.queue_position = self.scheduler.queue_position(job_id)
+        return status
+    
+    async def list_training_jobs(
+        self,
+        status: Optional[str] = None,
+        model_name: Optional[str] = None,
+        limit: int = 100
+    ) -> List[TrainingStatus]:
+        """Most recently started jobs, optionally filtered by status and model"""
+        positions = self.scheduler.queue_positions()
+        jobs = []
+        for job in self.job_store.list(status, model_name, limit):
+            job = self.training_jobs.get(job.job_id, job)
+            job.queue_position = positions.get(job.job_id)
+            jobs.append(job)
+        return jobs
+    
+    async def cancel_training(self, job_id: str) -> Optional[TrainingStatus]:
+        """Cancel a queued or running training job"""
+        status = await self.get_training_status(job_id)
+        if status is None:
+            return None
+        if status.status not in TERMINAL_STATUSES:
+            logger.info(f"Cancelling training job {job_id}")
+            trial_ids = self.search_trials.pop(job_id, None)
+            if trial_ids is not None:
+                # Trials granted a worker but not started yet see the search gone and stop
+                self.scheduler.cancel(job_id)
+                for trial_id in trial_ids:
+                    if not self.scheduler.cancel(trial_id):
+                        self.executor.cancel(trial_id)
+            elif not self.scheduler.cancel(job_id) and not self.executor.cancel(job_id):
+                self.cancelled_jobs.add(job_id)
+        return status
+    
+    async def watch_training(self, job_id: str) -> AsyncIterator[bytes]:
+        """Server-sent events with the job's status, then every update until it finishes"""
+        since = self.progress.version(job_id)
+        status = await self.get_training_status(job_id)
+        yield sse_event('status', status.model_dump_json())
+        if since is None:
+            return
+        async for message in self.progress.subscribe(
+            job_id,
+            settings.training_events_keepalive_seconds,
+            SSE_KEEPALIVE,
+            since=since
+        ):
+            yield message
+    
+    async def shutdown(self):
+        """Stop running jobs and their worker processes, leaving them to resume on restart"""
+        self.shutting_down = True
+        self.executor.shutdown()
+        for task in list(self.training_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*self.training_tasks.values(), return_exceptions=True)
+        self.job_store.close()
     
-    async def _train_model(self, job_id: str, request: TrainingRequest):
+    async def _train_model(
+        self,
+        job_id: str,
+        request: TrainingRequest,
+        dataset: Optional[Dict[str, Any]],
+        search: Optional[SuccessiveHalving] = None
+    ):
         """Background task for model training"""
         
+        status = self.training_jobs[job_id]
+        interrupted = False
+        
         try:
-            status = self.training_jobs[job_id]
-            
-            # Simulate training phases
-            logger.info(f"Training job {job_id}: Data preparation")
-            status.status = 'preparing_data'
-            status.progress = 0.2
-            
-            # Simulate training
-            logger.info(f"Training job {job_id}: Training model")
-            status.status = 'training'
-            status.progress = 0.5
-            
-            # Simulate validation
-            logger.info(f"Training job {job_id}: Validation")
-            status.status = 'validating'
-            status.progress = 0.8
+            if search is None:
+                metrics, version = await self._run_training(job_id, request, dataset)
+            else:
+                metrics, version = await self._run_search(job_id, request, dataset, search)
             
             # Complete
             status.status = 'completed'
             status.progress = 1.0
-            status.completed_at = datetime.utcnow()
-            status.metrics = {
-                'accuracy': 0.92,
-                'precision': 0.89,
-                'recall': 0.91,
-                'f1_score': 0.90
-            }
+            status.metrics = metrics
+            status.model_version = version
             
             logger.info(f"Training job {job_id} completed successfully")
-            
+        
+        except (TrainingCancelled, asyncio.CancelledError):
+            if self.shutting_down:
+                logger.info(f"Training job {job_id} interrupted by shutdown")
+                interrupted = True
+            else:
+                logger.info(f"Training job {job_id} cancelled")
+                status.status = 'cancelled'
         except Exception as e:
             logger.error(f"Training job {job_id} failed: {str(e)}")
             status.status = 'failed'
             status.progress = 0.0
+            status.error = str(e)
+        finally:
+            self.training_jobs.pop(job_id, None)
+            self.search_trials.pop(job_id, None)
+            self.cancelled_jobs.discard(job_id)
+            if not interrupted:
+                status.completed_at = datetime.utcnow()
+                self.job_store.save(status)
+                self.executor.discard_checkpoint(job_id)
+                self._publish(status)
+                self.job_store.evict()
+    
+    async def _run_training(
+        self,
+        job_id: str,
+        request: TrainingRequest,
+        dataset: Optional[Dict[str, Any]]
+    ) -> Tuple[Dict[str, float], int]:
+        """Train one model in a worker and publish it, returning its metrics and version"""
+        status = self.training_jobs[job_id]
+        
+        def on_progress(update: Dict[str, Any]):
+            changed = status.status != update['status']
+            status.status = update['status']
+            status.progress = update['progress']
+            if update.get('metrics'):
+                status.metrics = update['metrics']
+            # Progress is served from memory; persist phase changes only
+            if changed:
+                self.job_store.save(status)
+            self._publish(status)
+        
+        if job_id in self.cancelled_jobs:
+            raise TrainingCancelled()
+        slot = await self.scheduler.acquire(job_id, request.model_name, request.priority)
+        artifact_dir = self.registry.create_staging()
+        try:
+            # Cancelled between the worker grant and the worker start
+            if job_id in self.cancelled_jobs:
+                raise TrainingCancelled()
+            metrics = await self.executor.run(
+                job_id,
+                slot,
+                request.training_data,
+                request.parameters or {},
+                on_progress,
+                artifact_dir,
+                dataset
+            )
+            version = self.registry.publish(
+                request.model_name,
+                artifact_dir,
+                kind=CLASSIFIER_KIND,
+                metrics=metrics,
+                metadata={
+                    'job_id': job_id,
+                    'parameters': request.parameters or {},
+                    'dataset': request.dataset.path if request.dataset else None
+                }
+            )
+        finally:
+            self.scheduler.release(job_id)
+            self.registry.discard_staging(artifact_dir)
+        return metrics, version.version
+    
+    async def _run_search(
+        self,
+        job_id: str,
+        request: TrainingRequest,
+        dataset: Optional[Dict[str, Any]],
+        search: SuccessiveHalving
+    ) -> Tuple[Dict[str, Any], int]:
+        """Run search trials across the worker slots, rung by rung, and publish the best model.
+        
+        The search holds its model for the whole run, without a worker, so
+        no other job or search for the model runs or publishes alongside
+        it. Each trial is scheduled as its own job with the search's
+        priority under a sub-slot of the model, so trials run in parallel
+        on free workers. Trials that fail are ranked last; the search fails
+        only if no trial completes.
+        """
+        status = self.training_jobs[job_id]
+        self.search_trials[job_id] = set()
+        trial_epochs: Dict[int, float] = {}
+        artifact_dirs: Dict[int, str] = {}
+        
+        def refresh(leaderboard: bool = False):
+            done = search.completed_epochs + sum(trial_epochs.values())
+            status.progress = min(0.95, done / search.total_epochs)
+            if leaderboard:
+                status.metrics = {'leaderboard': search.leaderboard()}
+            self._publish(status)
+        
+        async def run_trial(trial: Trial, epochs: int, final: bool):
+            trial_job_id = f"{job_id}/trial-{trial.trial_id}"
+            trial_ids = self.search_trials.get(job_id)
+            if trial_ids is None:
+                raise TrainingCancelled()
+            trial_ids.add(trial_job_id)
+            trial.status = 'running'
+            
+            def on_progress(update: Dict[str, Any]):
+                trial_epochs[trial.trial_id] = update['progress'] * epochs
+                if status.status != 'training':
+                    status.status = 'training'
+                    self.job_store.save(status)
+                refresh()
+            
+            try:
+                # Trials of one search run side by side under sub-slots of the search's model
+                slot = await self.scheduler.acquire(
+                    trial_job_id,
+                    f"{request.model_name}/{trial_job_id}",
+                    request.priority
+                )
+                try:
+                    if job_id not in self.search_trials:
+                        raise TrainingCancelled()
+                    if final:
+                        artifact_dirs[trial.trial_id] = self.registry.create_staging()
+                    metrics = await self.executor.run(
+                        trial_job_id,
+                        slot,
+                        request.training_data,
+                        {**(request.parameters or {}), **trial.parameters, 'epochs': epochs},
+                        on_progress,
+                        artifact_dirs.get(trial.trial_id),
+                        dataset
+                    )
+                finally:
+                    self.scheduler.release(trial_job_id)
+                search.record(trial, epochs, metrics)
+            except TrainingCancelled:
+                trial.status = 'cancelled'
+                raise
+            except Exception as e:
+                logger.warning(f"Search trial {trial_job_id} failed: {str(e)}")
+                search.fail(trial, epochs, str(e))
+            finally:
+                trial_ids.discard(trial_job_id)
+                trial_epochs.pop(trial.trial_id, None)
+                refresh(leaderboard=True)
+        
+        await self.scheduler.acquire(job_id, request.model_name, request.priority, worker=False)
+        try:
+            for rung, epochs in enumerate(search.budgets):
+                final = rung == len(search.budgets) - 1
+                results = await asyncio.gather(
+                    *(run_trial(trial, epochs, final) for trial in search.survivors),
+                    return_exceptions=True
+                )
+                if job_id not in self.search_trials or any(isinstance(r, TrainingCancelled) for r in results):
+                    raise TrainingCancelled()
+                for result in results:
+                    if isinstance(result, BaseException):
+                        raise result
+                if final:
+                    search.finish()
+                else:
+                    search.promote()
+                    logger.info(
+                        f"Search {job_id} rung {rung + 1} at {epochs} epochs: "
+                        f"promoted {len(search.survivors)} of {len(results)} trials"
+                    )
+                refresh(leaderboard=True)
+            
+            best = search.best()
+            if best is None:
+                raise RuntimeError("No search trial completed training")
+            
+            version = self.registry.publish(
+                request.model_name,
+                artifact_dirs[best.trial_id],
+                kind=CLASSIFIER_KIND,
+                metrics=best.metrics,
+                metadata={
+                    'job_id': job_id,
+                    'parameters': {**(request.parameters or {}), **best.parameters},
+                    'dataset': request.dataset.path if request.dataset else None,
+                    'search_trial': best.trial_id
+                }
+            )
+        finally:
+            self.scheduler.release(job_id)
+            for artifact_dir in artifact_dirs.values():
+                self.registry.discard_staging(artifact_dir)
+        
+        return {**best.metrics, 'best_trial': best.trial_id, 'leaderboard': search.leaderboard()}, version.version
+    
+    def _schedule(
+        self,
+        status: TrainingStatus,
+        request: TrainingRequest,
+        dataset: Optional[Dict[str, Any]],
+        search: Optional[SuccessiveHalving]
+    ):
+        """Track a queued job and start its background training task"""
+        job_id = status.job_id
+        self.training_jobs[job_id] = status
+        self._publish(status)
+        
+        task = asyncio.create_task(self._train_model(job_id, request, dataset, search))
+        self.training_tasks[job_id] = task
+        task.add_done_callback(lambda _: self.training_tasks.pop(job_id, None))
+    
+    def _resolve_dataset(self, request: TrainingRequest) -> Optional[Dict[str, Any]]:
+        """Shard files and read options of the request's dataset, for the worker"""
+        if request.dataset is None:
+            return None
+        if bool(request.dataset.text_column) == bool(request.dataset.feature_columns):
+            raise ValueError("Dataset requires exactly one of text_column or feature_columns")
+        shards = resolve_shards(request.dataset.path, settings.training_data_dir)
+        return {
+            'shards': shards,
+            'format': dataset_format(shards, request.dataset.format.value if request.dataset.format else None),
+            'label_column': request.dataset.label_column,
+            'text_column': request.dataset.text_column,
+            'feature_columns': request.dataset.feature_columns,
+            'chunk_rows': settings.training_dataset_chunk_rows
+        }
+    
+    def _plan_search(self, request: TrainingRequest) -> Optional[SuccessiveHalving]:
+        """Expand the request's hyperparameter search into successive halving trials"""
+        if request.search is None:
+            return None
+        max_epochs = int((request.parameters or {}).get('epochs', 20))
+        if max_epochs < request.search.min_epochs:
+            raise ValueError("Search min_epochs exceeds the training epochs")
+        return SuccessiveHalving(
+            expand_trials(request.search, settings.training_search_max_trials),
+            request.search.metric,
+            max_epochs,
+            request.search.reduction_factor,
+            request.search.min_epochs
+        )
+    
+    def _publish(self, status: TrainingStatus):
+        self.progress.publish(
+            status.job_id,
+            sse_event('status', status.model_dump_json()),
+            final=status.status in TERMINAL_STATUSES
+        )
@@ -0,0 +1,142 @@
+import json
+import sqlite3
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from app.models import TrainingStatus
+
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS training_jobs (
+    job_id TEXT PRIMARY KEY,
+    model_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL,
+    started_at TEXT NOT NULL,
+    completed_at TEXT,
+    metrics TEXT,
+    error TEXT,
+    model_version INTEGER,
+    request TEXT
+);
+CREATE INDEX IF NOT EXISTS training_jobs_status ON training_jobs (status, started_at);
+CREATE INDEX IF NOT EXISTS training_jobs_model_name ON training_jobs (model_name, started_at);
+CREATE INDEX IF NOT EXISTS training_jobs_completed_at ON training_jobs (completed_at);
+"""
+
+COLUMNS = ('job_id', 'model_name', 'status', 'progress', 'started_at', 'completed_at', 'metrics', 'error', 'model_version')
+
+
+class TrainingJobStore:
+    """SQLite-backed training job history with bounded retention.
+    
+    Jobs are looked up by primary key and listed through the status and
+    model_name indexes. Finished jobs are evicted once older than
+    ``max_age`` or beyond the newest ``max_finished``.
+    """
+    
+    def __init__(self, path: str, max_finished: int, max_age: timedelta):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.max_finished = max_finished
+        self.max_age = max_age
+    
+    def save(self, status: TrainingStatus):
+        """Insert or update a job"""
+        with self.connection:
+            self.connection.execute(
+                f"INSERT INTO training_jobs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+                f"ON CONFLICT (job_id) DO UPDATE SET {', '.join(f'{name} = excluded.{name}' for name in COLUMNS[1:])}",
+                (
+                    status.job_id,
+                    status.model_name,
+                    status.status,
+                    status.progress,
+                    status.started_at.isoformat(),
+                    status.completed_at.isoformat() if status.completed_at else None,
+                    json.dumps(status.metrics) if status.metrics is not None else None,
+                    status.error,
+                    status.model_version
+                )
+            )
+    
+    def get(self, job_id: str) -> Optional[TrainingStatus]:
+        row = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM training_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        return self._to_status(row) if row else None
+    
+    def list(
+        self,
+        status: Optional[str] = None,
+        model_name: Optional[str] = None,
+        limit: int = 100
+    ) -> List[TrainingStatus]:
+        """Most recently started jobs, optionally filtered by status and model"""
+        clauses, parameters = [], []
+        if status:
+            clauses.append("status = ?")
+            parameters.append(status)
+        if model_name:
+            clauses.append("model_name = ?")
+            parameters.append(model_name)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM training_jobs {where} ORDER BY started_at DESC LIMIT ?",
+            (*parameters, limit)
+        ).fetchall()
+        return [self._to_status(row) for row in rows]
+    
+    def save_request(self, job_id: str, request: str):
+        """Keep a job's request as JSON, so the job can be resumed after a restart"""
+        with self.connection:
+            self.connection.execute("UPDATE training_jobs SET request = ? WHERE job_id = ?", (request, job_id))
+    
+    def unfinished(self) -> List[Tuple[TrainingStatus, Optional[str]]]:
+        """Jobs left unfinished by a previous process with their requests, oldest first"""
+        placeholders = ', '.join('?' * len(TERMINAL_STATUSES))
+        rows = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)}, request FROM training_jobs "
+            f"WHERE status NOT IN ({placeholders}) ORDER BY started_at",
+            TERMINAL_STATUSES
+        ).fetchall()
+        return [(self._to_status(row[:-1]), row[-1]) for row in rows]
+    
+    def evict(self) -> int:
+        """Apply the retention policy to finished jobs, returning how many were removed"""
+        placeholders = ', '.join('?' * len(TERMINAL_STATUSES))
+        cutoff = (datetime.utcnow() - self.max_age).isoformat()
+        with self.connection:
+            expired = self.connection.execute(
+                f"DELETE FROM training_jobs WHERE completed_at < ? AND status IN ({placeholders})",
+                (cutoff, *TERMINAL_STATUSES)
+            ).rowcount
+            overflow = self.connection.execute(
+                f"DELETE FROM training_jobs WHERE job_id IN ("
+                f"SELECT job_id FROM training_jobs WHERE completed_at IS NOT NULL AND status IN ({placeholders}) "
+                f"ORDER BY completed_at DESC LIMIT -1 OFFSET ?)",
+                (*TERMINAL_STATUSES, self.max_finished)
+            ).rowcount
+        return expired + overflow
+    
+    def close(self):
+        self.connection.close()
+    
+    def _to_status(self, row: tuple) -> TrainingStatus:
+        job_id, model_name, status, progress, started_at, completed_at, metrics, error, model_version = row
+        return TrainingStatus(
+            job_id=job_id,
+            model_name=model_name,
+            status=status,
+            progress=progress,
+            started_at=datetime.fromisoformat(started_at),
+            completed_at=datetime.fromisoformat(completed_at) if completed_at else None,
+            metrics=json.loads(metrics) if metrics else None,
+            error=error,
+            model_version=model_version
+        )
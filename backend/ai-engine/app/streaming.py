@@ -0,0 +1,45 @@
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, IO
+
+from fastapi import Request
+
+from app.config import settings
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+SSE_KEEPALIVE = b": keepalive\n\n"
+
+
+async def spool_request_body(request: Request) -> IO[bytes]:
+    """Buffer a request body in a temporary file that rolls over to disk.
+    
+    StreamingResponse listens for client disconnects on the same receive
+    channel as the request body, so a streamed body has to be read before
+    the response starts. Spooling keeps memory bounded for large uploads.
+    """
+    body = SpooledTemporaryFile(max_size=settings.ndjson_spool_max_memory_bytes)
+    async for chunk in request.stream():
+        body.write(chunk)
+    body.seek(0)
+    return body
+
+
+async def iter_lines(body: IO[bytes]) -> AsyncIterator[bytes]:
+    """Yield non-empty NDJSON lines from a spooled body, then close it"""
+    try:
+        while True:
+            line = body.readline(settings.ndjson_max_line_bytes + 1)
+            if not line:
+                break
+            if len(line) > settings.ndjson_max_line_bytes:
+                raise ValueError(f"NDJSON line exceeds {settings.ndjson_max_line_bytes} bytes")
+            if line.strip():
+                yield line
+    finally:
+        body.close()
+
+
+def sse_event(event: str, data: str) -> bytes:
+    """Encode one server-sent event; ``data`` must be a single line such as compact JSON"""
+    return f"event: {event}\ndata: {data}\n\n".encode()
@@ -0,0 +1,105 @@
+"""In-process HTTP load generator for the AI engine.
+
+Runs the FastAPI app with its lifespan and drives it through httpx's ASGI
+transport, so requests pass through the full middleware stack, routing,
+validation and serialization without sockets or a server process. Each
+route is loaded in turn by ``--concurrency`` closed-loop clients for
+``--duration`` seconds; latency percentiles, throughput and error counts
+are reported per route. Shed requests (503) count as errors.
+
+    python -m benchmarks.load [--routes health,risk_assess] [--concurrency 16]
+        [--duration 5] [--size 100] [--output results.json] [--baseline baseline.json]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from app.main import app
+from benchmarks import results, workloads
+
+# Scenario name -> (method, path, request arguments for an input size)
+SCENARIOS: Dict[str, Tuple[str, str, Callable[[int], Dict[str, Any]]]] = {
+    'health': ('GET', '/health', lambda n: {}),
+    'nlp_blueprint': ('POST', '/api/nlp/blueprint', lambda n: {'json': {'user_input': workloads.text(n)}}),
+    'intent_analyze': ('POST', '/api/intent/analyze', lambda n: {'json': {'text': workloads.text(n)}}),
+    'risk_assess': ('POST', '/api/risk/assess', lambda n: {'json': {'resources': workloads.resources(n)}}),
+    'recommendations': ('POST', '/api/recommendations', lambda n: {'json': {'blueprint_id': 'benchmark'}}),
+    'patterns_detect': ('POST', '/api/patterns/detect', lambda n: {
+        'json': {'blueprint_ids': [f'blueprint-{i}' for i in range(n)]}
+    }),
+    'embeddings': ('POST', '/api/embeddings', lambda n: {'params': {'text': workloads.text(n)}})
+}
+
+
+async def load(
+    client: httpx.AsyncClient,
+    method: str,
+    path: str,
+    arguments: Dict[str, Any],
+    concurrency: int,
+    duration: float
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    stop_at = time.perf_counter() + duration
+    
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            response = await client.request(method, path, **arguments)
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results.summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def run(scenarios: List[str], concurrency: int, duration: float, size: int) -> Dict[str, Dict[str, float]]:
+    summaries = {}
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url='http://ai-engine',
+            timeout=None
+        ) as client:
+            # Corpus for pattern detection over blueprint ids
+            response = await client.post('/api/patterns/blueprints', json={'blueprints': workloads.blueprints(size)})
+            response.raise_for_status()
+            
+            for name in scenarios:
+                method, path, build = SCENARIOS[name]
+                arguments = build(size)
+                await client.request(method, path, **arguments)
+                summaries[f'{method} {path}'] = await load(client, method, path, arguments, concurrency, duration)
+    return summaries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--routes', default=','.join(SCENARIOS), help='comma-separated scenarios')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients per route')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds of load per route')
+    parser.add_argument('--size', type=int, default=100, help='words, resources or blueprints per request')
+    results.add_arguments(parser)
+    args = parser.parse_args()
+    
+    scenarios = args.routes.split(',')
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}; choose from {', '.join(SCENARIOS)}")
+    
+    summaries = asyncio.run(run(scenarios, args.concurrency, args.duration, args.size))
+    parameters = {'concurrency': args.concurrency, 'duration': args.duration, 'size': args.size}
+    return results.report(args, 'load', summaries, parameters)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
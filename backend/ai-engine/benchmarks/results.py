@@ -0,0 +1,106 @@
+"""Result files shared by the benchmarks: latency summaries, JSON output and baseline comparison."""
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Summary fields where larger values are regressions; for the others smaller values are
+LATENCY_FIELDS = ('p50_ms', 'p95_ms', 'p99_ms')
+THROUGHPUT_FIELDS = ('rps',)
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Percentiles in milliseconds and throughput of one benchmark case"""
+    samples = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def print_table(cases: Dict[str, Dict[str, float]]):
+    width = max((len(name) for name in cases), default=4)
+    print(f"{'case':<{width}}  {'count':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rps':>9}")
+    for name, summary in cases.items():
+        print(
+            f"{name:<{width}}  {summary['count']:>7} {summary['errors']:>6} {summary['p50_ms']:>9.3f} "
+            f"{summary['p95_ms']:>9.3f} {summary['p99_ms']:>9.3f} {summary['rps']:>9.1f}"
+        )
+
+
+def save(path: str, benchmark: str, cases: Dict[str, Dict[str, float]], parameters: Dict):
+    """Write results with enough context to tell whether two runs are comparable"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'benchmark': benchmark,
+            'created_at': datetime.utcnow().isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'parameters': parameters,
+            'cases': cases
+        }, f, indent=2)
+
+
+def compare(path: str, benchmark: str, cases: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Regressions of ``cases`` against the baseline file at ``path``.
+    
+    A case regresses when a latency percentile grows, or throughput drops,
+    by more than ``tolerance`` relative to the baseline. Cases missing on
+    either side are reported but are not regressions.
+    """
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get('benchmark') != benchmark:
+        return [f"baseline {path} is for benchmark '{baseline.get('benchmark')}', not '{benchmark}'"]
+    
+    regressions = []
+    for name, summary in cases.items():
+        reference: Optional[Dict[str, float]] = baseline['cases'].get(name)
+        if reference is None:
+            print(f"{name}: not in baseline")
+            continue
+        changes = []
+        for field in LATENCY_FIELDS + THROUGHPUT_FIELDS:
+            if not reference.get(field):
+                continue
+            change = summary[field] / reference[field] - 1
+            changes.append(f"{field} {change:+.0%}")
+            worse = change > tolerance if field in LATENCY_FIELDS else change < -tolerance
+            if worse:
+                regressions.append(f"{name}: {field} {reference[field]} -> {summary[field]} ({change:+.0%})")
+        if summary.get('errors', 0) > reference.get('errors', 0):
+            regressions.append(f"{name}: errors {reference.get('errors', 0)} -> {summary['errors']}")
+        print(f"{name}: {', '.join(changes)}")
+    for name in sorted(baseline['cases'].keys() - cases.keys()):
+        print(f"{name}: in baseline but not run")
+    return regressions
+
+
+def add_arguments(parser):
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='compare against results previously written with --output')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown, e.g. 0.2 for 20%%')
+
+
+def report(args, benchmark: str, cases: Dict[str, Dict[str, float]], parameters: Dict) -> int:
+    """Print, save and compare results as requested on the command line; the exit status"""
+    print_table(cases)
+    if args.output:
+        save(args.output, benchmark, cases, parameters)
+        print(f"results written to {args.output}")
+    if not args.baseline:
+        return 0
+    regressions = compare(args.baseline, benchmark, cases, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
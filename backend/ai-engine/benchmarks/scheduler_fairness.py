@@ -0,0 +1,133 @@
+"""Starvation harness for the training job scheduler.
+
+Drives TrainingScheduler through a saturated workload on a virtual clock:
+high-priority jobs arrive exactly as fast as the workers drain them, on
+top of a standing backlog, while low- and normal-priority jobs and jobs
+sharing a model name trickle in. Without aging the low-priority jobs
+never run; with aging every job must start, the worker bound and
+per-model exclusivity must hold throughout, and waits are reported per
+priority level.
+
+    python -m benchmarks.scheduler_fairness [--aging-seconds 300]
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from app.models import TrainingPriority
+from app.services.training_scheduler import TrainingScheduler
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def workload(workers: int, duration: float, horizon: float) -> List[Tuple[float, str, TrainingPriority]]:
+    """(arrival time, model name, priority) of every submitted job"""
+    jobs = [(0.0, f'backlog-{i}', TrainingPriority.HIGH) for i in range(workers * 4)]
+    interval = duration / workers
+    counter = itertools.count()
+    time = 0.0
+    while time < horizon:
+        jobs.append((time, f'high-{next(counter)}', TrainingPriority.HIGH))
+        time += interval
+    for i in range(5):
+        jobs.append((50.0 + i * horizon / 10, f'low-{i}', TrainingPriority.LOW))
+        jobs.append((75.0 + i * horizon / 10, f'normal-{i}', TrainingPriority.NORMAL))
+    # Jobs for one model must run one after another
+    jobs.extend((100.0 + i, 'shared-model', TrainingPriority.HIGH) for i in range(3))
+    return sorted(jobs, key=lambda job: job[0])
+
+
+async def simulate(workers: int, duration: float, horizon: float, aging_seconds: float) -> Dict[str, object]:
+    clock = VirtualClock()
+    scheduler = TrainingScheduler(workers, aging_seconds, clock)
+    events: List[Tuple[float, int, str, tuple]] = []
+    sequence = itertools.count()
+    submitted: Dict[str, Tuple[float, TrainingPriority]] = {}
+    started: Dict[str, float] = {}
+    running_models: Dict[str, str] = {}
+    violations: List[str] = []
+    tasks = []
+    
+    async def run_job(job_id: str, model_name: str, priority: TrainingPriority):
+        await scheduler.acquire(job_id, model_name, priority)
+        started[job_id] = clock.now
+        if model_name in running_models.values():
+            violations.append(f'{model_name} ran concurrently at t={clock.now:.0f}')
+        running_models[job_id] = model_name
+        if len(running_models) > workers:
+            violations.append(f'{len(running_models)} jobs running at t={clock.now:.0f}')
+        heapq.heappush(events, (clock.now + duration, next(sequence), 'finish', (job_id,)))
+    
+    for index, (arrival, model_name, priority) in enumerate(workload(workers, duration, horizon)):
+        heapq.heappush(events, (arrival, next(sequence), 'submit', (f'job-{index}', model_name, priority)))
+    
+    while events and events[0][0] <= horizon:
+        clock.now, _, kind, payload = heapq.heappop(events)
+        if kind == 'submit':
+            job_id, model_name, priority = payload
+            submitted[job_id] = (clock.now, priority)
+            tasks.append(asyncio.create_task(run_job(job_id, model_name, priority)))
+        else:
+            running_models.pop(payload[0])
+            scheduler.release(payload[0])
+        # Let granted jobs record their start before time moves on
+        for _ in range(3):
+            await asyncio.sleep(0)
+    
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    
+    waits = defaultdict(list)
+    never_started = defaultdict(int)
+    for job_id, (arrival, priority) in submitted.items():
+        if job_id in started:
+            waits[priority.value].append(started[job_id] - arrival)
+        elif arrival <= horizon / 2:
+            # Waited long enough that aging should have promoted it past newer jobs
+            never_started[priority.value] += 1
+    
+    return {
+        'max_wait': {level: max(values) for level, values in waits.items()},
+        'never_started': dict(never_started),
+        'violations': violations
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=60.0, help='virtual seconds per job')
+    parser.add_argument('--horizon', type=float, default=20_000.0, help='virtual seconds simulated')
+    parser.add_argument('--aging-seconds', type=float, default=300.0)
+    args = parser.parse_args()
+    
+    baseline = asyncio.run(simulate(args.workers, args.duration, args.horizon, float('inf')))
+    aged = asyncio.run(simulate(args.workers, args.duration, args.horizon, args.aging_seconds))
+    
+    for name, result in (('without aging', baseline), (f'aging every {args.aging_seconds:.0f}s', aged)):
+        waits = ', '.join(f'{level} {wait:.0f}s' for level, wait in sorted(result['max_wait'].items()))
+        print(f"{name}: max wait {waits}; never started {result['never_started'] or 'none'}")
+    
+    failures = aged['violations'] + [
+        f'{count} {level} job(s) starved' for level, count in aged['never_started'].items()
+    ]
+    if not baseline['never_started']:
+        failures.append('workload does not saturate the workers; starvation is not exercised')
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
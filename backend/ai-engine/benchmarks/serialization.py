@@ -0,0 +1,103 @@
+"""Serialization benchmark for large risk assessments.
+
+Builds a RiskAssessment with many risk factors and times encoding it
+the way FastAPI does for a route returning a model (response_model
+validation, jsonable_encoder, then json.dumps) against FastJSONResponse,
+which hands the model to pydantic-core and gets bytes back. Both bodies
+must decode to the same document.
+
+    python -m benchmarks.serialization [--factors 10000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models import RiskAssessment, RiskFactor, RiskLevel
+from app.responses import FastJSONResponse
+
+
+def assessment(factors: int) -> RiskAssessment:
+    levels = list(RiskLevel)
+    return RiskAssessment(
+        assessment_id='benchmark',
+        blueprint_id='blueprint-benchmark',
+        overall_risk=RiskLevel.HIGH,
+        risk_score=72.5,
+        risk_factors=[
+            RiskFactor(
+                factor_id=f'factor-{i}',
+                category='security' if i % 2 else 'reliability',
+                severity=levels[i % len(levels)],
+                title=f'Risk factor {i}',
+                description='Resource configuration deviates from the recommended baseline',
+                impact='Service disruption or data exposure',
+                probability=(i % 100) / 100,
+                mitigation='Apply the recommended configuration and redeploy',
+                resources_affected=[f'resource-{i}', f'resource-{i + 1}']
+            )
+            for i in range(factors)
+        ],
+        recommendations=['Review security groups', 'Enable backups'],
+        assessed_at=datetime.utcnow(),
+        metadata={'resource_count': factors, 'rules': ['security', 'reliability']}
+    )
+
+
+def timings(encode: Callable[[], bytes], repeat: int) -> List[float]:
+    encode()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--factors', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    
+    content = assessment(args.factors)
+    field = create_response_field(name='Response_Benchmark', type_=RiskAssessment)
+    
+    def fastapi_default() -> bytes:
+        encoded = asyncio.run(serialize_response(field=field, response_content=content))
+        return JSONResponse(encoded).body
+    
+    def fast_json() -> bytes:
+        return FastJSONResponse(content).body
+    
+    bodies = {'fastapi default': fastapi_default(), 'FastJSONResponse': fast_json()}
+    results = {
+        'fastapi default': timings(fastapi_default, args.repeat),
+        'FastJSONResponse': timings(fast_json, args.repeat)
+    }
+    
+    print(f"RiskAssessment with {args.factors} factors, {len(bodies['FastJSONResponse']) / 1e6:.1f} MB")
+    for name, samples in results.items():
+        print(
+            f"{name}: median {statistics.median(samples) * 1000:.1f} ms, "
+            f"min {min(samples) * 1000:.1f} ms over {len(samples)} runs"
+        )
+    speedup = statistics.median(results['fastapi default']) / statistics.median(results['FastJSONResponse'])
+    print(f"speedup {speedup:.1f}x")
+    
+    if json.loads(bodies['fastapi default']) != json.loads(bodies['FastJSONResponse']):
+        print('FAIL: encoded documents differ')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Micro-benchmarks of the AI engine service methods.
+
+Calls each service method directly, without HTTP, on synthetic inputs of
+growing size: words of text for blueprint generation, intent analysis
+and embeddings, resources for risk assessment and recommendations, and
+corpus blueprints for pattern detection. Every case is warmed up once,
+so memoized paths such as pattern mining over an unchanged corpus are
+measured warm, as repeated production requests would see them.
+
+    python -m benchmarks.services [--sizes 10,100,1000] [--repeat 20]
+        [--methods assess_risk,detect_patterns] [--output results.json]
+        [--baseline baseline.json]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from app.models import (
+    NLPBlueprintRequest,
+    IntentAnalysisRequest,
+    RiskAssessmentRequest,
+    RecommendationRequest,
+    PatternRequest,
+    BlueprintCorpusRequest
+)
+from app.services.nlp_service import NLPService
+from app.services.intent_service import IntentAnalysisService
+from app.services.risk_service import RiskAssessmentService
+from app.services.recommendation_service import RecommendationService
+from app.services.pattern_service import PatternRecognitionService
+from benchmarks import results, workloads
+
+METHODS = (
+    'generate_blueprint',
+    'analyze_intent',
+    'assess_risk',
+    'generate_recommendations',
+    'detect_patterns',
+    'generate_embeddings'
+)
+
+
+async def cases(methods: List[str], sizes: List[int]) -> Dict[str, Callable[[], Awaitable]]:
+    """One zero-argument coroutine function per (method, size)"""
+    nlp_service = NLPService()
+    intent_service = IntentAnalysisService()
+    risk_service = RiskAssessmentService()
+    recommendation_service = RecommendationService()
+    pattern_service = PatternRecognitionService()
+    
+    corpus = workloads.blueprints(max(sizes))
+    await pattern_service.add_blueprints(BlueprintCorpusRequest(blueprints=corpus))
+    
+    builders = {
+        'generate_blueprint': lambda n: (
+            nlp_service.generate_blueprint,
+            NLPBlueprintRequest(user_input=workloads.text(n))
+        ),
+        'analyze_intent': lambda n: (
+            intent_service.analyze_intent,
+            IntentAnalysisRequest(text=workloads.text(n))
+        ),
+        'assess_risk': lambda n: (
+            risk_service.assess_risk,
+            RiskAssessmentRequest(resources=workloads.resources(n))
+        ),
+        'generate_recommendations': lambda n: (
+            recommendation_service.generate_recommendations,
+            RecommendationRequest(blueprint_id='benchmark', context={'resources': workloads.resources(n)})
+        ),
+        'detect_patterns': lambda n: (
+            pattern_service.detect_patterns,
+            PatternRequest(blueprint_ids=[blueprint['blueprint_id'] for blueprint in corpus[:n]])
+        ),
+        'generate_embeddings': lambda n: (
+            nlp_service.generate_embeddings,
+            workloads.text(n)
+        )
+    }
+    
+    selected = {}
+    for method in methods:
+        for size in sizes:
+            call, argument = builders[method](size)
+            selected[f'{method}[n={size}]'] = lambda call=call, argument=argument: call(argument)
+    return selected
+
+
+async def run(methods: List[str], sizes: List[int], repeat: int) -> Dict[str, Dict[str, float]]:
+    summaries = {}
+    for name, call in (await cases(methods, sizes)).items():
+        await call()
+        latencies = []
+        errors = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+        summaries[name] = results.summarize(latencies, time.perf_counter() - started, errors)
+    return summaries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000', help='comma-separated input sizes')
+    parser.add_argument('--repeat', type=int, default=20, help='timed calls per case')
+    parser.add_argument('--methods', default=','.join(METHODS), help='comma-separated service methods')
+    results.add_arguments(parser)
+    args = parser.parse_args()
+    
+    methods = args.methods.split(',')
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        parser.error(f"unknown methods: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(',')]
+    
+    summaries = asyncio.run(run(methods, sizes, args.repeat))
+    parameters = {'sizes': sizes, 'repeat': args.repeat}
+    return results.report(args, 'services', summaries, parameters)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""Synthetic inputs of a given size for the service and load benchmarks."""
+from typing import Any, Dict, List
+
+RESOURCE_TYPES = (
+    'aws_instance',
+    'aws_db_instance',
+    'aws_s3_bucket',
+    'aws_lb',
+    'aws_security_group',
+    'azurerm_virtual_machine',
+    'azurerm_storage_account',
+    'azurerm_sql_database',
+    'google_compute_instance',
+    'google_storage_bucket'
+)
+WORDS = (
+    'deploy a highly available web application with a postgres database load balancer '
+    'redis cache and object storage for uploads in production on aws with autoscaling '
+    'encrypted backups private subnets and monitoring for a small team on a tight budget'
+).split()
+
+
+def text(words: int) -> str:
+    return ' '.join(WORDS[i % len(WORDS)] for i in range(words))
+
+
+def resources(count: int) -> List[Dict[str, Any]]:
+    """Resources wired as a chain of small dependency trees, with some unencrypted or unbacked-up"""
+    generated = []
+    for i in range(count):
+        resource_type = RESOURCE_TYPES[i % len(RESOURCE_TYPES)]
+        generated.append({
+            'type': resource_type,
+            'name': f'{resource_type}-{i}',
+            'depends_on': [generated[(i - 1) // 2]['name']] if i else [],
+            'properties': {
+                'encryption_enabled': i % 3 == 0,
+                'backup_retention_days': 7 if i % 4 == 0 else 0,
+                'sku': 'Standard_D16s_v3' if i % 5 == 0 else 'Standard_B2s'
+            }
+        })
+    return generated
+
+
+def blueprints(count: int, resources_per_blueprint: int = 8) -> List[Dict[str, Any]]:
+    """Blueprints drawing overlapping resource types, so frequent itemsets exist"""
+    return [
+        {
+            'blueprint_id': f'blueprint-{i}',
+            'resources': [
+                {'type': RESOURCE_TYPES[(i + j * (1 + i % 3)) % len(RESOURCE_TYPES)], 'name': f'r{j}'}
+                for j in range(resources_per_blueprint)
+            ]
+        }
+        for i in range(count)
+    ]
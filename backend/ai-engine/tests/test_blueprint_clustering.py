@@ -0,0 +1,68 @@
+import asyncio
+import random
+
+import numpy as np
+
+from app.models import BlueprintCorpusRequest
+from app.services.blueprint_clustering import MiniBatchKMeans
+from app.services.pattern_service import PatternRecognitionService
+
+
+def blueprints(count, seed):
+    rng = random.Random(seed)
+    return [
+        {'blueprint_id': f'bp-{i}', 'resources': [{'type': f't{j}'} for j in rng.sample(range(30), 6)]}
+        for i in range(count)
+    ]
+
+
+def assert_consistent(service):
+    clusters = service.blueprint_clusters
+    clusters.flush()
+    corpus = service.blueprint_corpus
+    assert len(clusters) == len(corpus)
+    assert len(clusters.members) == len(corpus)
+    assert int(clusters.counts.sum()) == len(corpus)
+    assert int(clusters.item_counts.sum()) == sum(len(items) for items in corpus.blueprints.values())
+    assert (clusters.item_counts >= 0).all()
+    assert (clusters.squared_distance_sums >= 0).all()
+
+
+def test_replaced_blueprints_are_not_double_counted():
+    service = PatternRecognitionService()
+    
+    async def run():
+        await service.add_blueprints(BlueprintCorpusRequest(blueprints=blueprints(1000, 1)))
+        # Replace 400 blueprints with new resource types, and re-send 3 unchanged
+        await service.add_blueprints(BlueprintCorpusRequest(blueprints=blueprints(400, 2)))
+        await service.add_blueprints(BlueprintCorpusRequest(blueprints=blueprints(1000, 1)[500:503]))
+    asyncio.run(run())
+    
+    assert_consistent(service)
+    assert len(service.blueprint_corpus) == 1000
+
+
+def test_emptied_blueprint_leaves_its_cluster():
+    service = PatternRecognitionService()
+    
+    async def run():
+        await service.add_blueprints(BlueprintCorpusRequest(blueprints=blueprints(600, 3)))
+        await service.add_blueprints(BlueprintCorpusRequest(blueprints=[{'blueprint_id': 'bp-7', 'resources': []}]))
+    asyncio.run(run())
+    
+    assert_consistent(service)
+    assert 'bp-7' not in service.blueprint_clusters.members
+
+
+def test_remove_inverts_centroid_update():
+    clusters = MiniBatchKMeans(n_clusters=2, dim=16, batch_size=4, seed=0)
+    for i, items in enumerate([(0, 1), (2, 3), (0, 1, 2), (1, 3)]):
+        clusters.add(f'bp-{i}', items)
+    centroids = clusters.centroids.copy()
+    
+    clusters.add('bp-4', (0, 2, 3))
+    clusters.flush()
+    clusters.remove('bp-4')
+    
+    np.testing.assert_allclose(clusters.centroids, centroids, atol=1e-12)
+    assert int(clusters.counts.sum()) == 4
@@ -0,0 +1,66 @@
+from app.services.dependency_graph import DependencyGraph
+
+
+def graph(*resources):
+    keyed = {}
+    for resource in resources:
+        key = name = resource.get('name') or resource['type']
+        copy = 1
+        while key in keyed:
+            copy += 1
+            key = f"{name}#{copy}"
+        keyed[key] = resource
+    return DependencyGraph(keyed)
+
+
+def edges(g):
+    return {
+        (g.names[int(source)], g.names[target])
+        for target in range(g.num_nodes)
+        for source in g.dependents_indices[g.dependents_indptr[target]:g.dependents_indptr[target + 1]]
+    }
+
+
+def test_articulation_points_and_blast_radius():
+    # app1, app2 -> db; db -> subnet; cache -> subnet
+    g = graph(
+        {'type': 'aws_instance', 'name': 'app1', 'depends_on': ['db']},
+        {'type': 'aws_instance', 'name': 'app2', 'properties': {'database': 'db'}},
+        {'type': 'aws_db_instance', 'name': 'db', 'properties': {'subnet_id': '${aws_subnet.subnet.id}'}},
+        {'type': 'aws_subnet', 'name': 'subnet'},
+        {'type': 'aws_elasticache_cluster', 'name': 'cache', 'depends_on': 'aws_subnet.subnet'}
+    )
+    db, subnet = g.names.index('db'), g.names.index('subnet')
+    
+    assert g.num_edges == 4
+    assert g.articulation_points() == {db: 2, subnet: 1}
+    assert sorted(g.names[v] for v in g.blast_radius(subnet)) == ['app1', 'app2', 'cache', 'db']
+    assert sorted(g.names[v] for v in g.blast_radius(db)) == ['app1', 'app2']
+
+
+def test_plain_property_values_are_not_references():
+    g = graph(
+        {'type': 'azurerm_storage_account', 'name': 'Standard'},
+        {'type': 'azurerm_app_service', 'name': 'web', 'properties': {'tier': 'Standard', 'tags': ['Standard']}}
+    )
+    assert g.num_edges == 0
+
+
+def test_string_depends_on_is_one_reference():
+    g = graph(
+        {'type': 'aws_subnet', 'name': 'a'},
+        {'type': 'aws_subnet', 'name': 'b'},
+        {'type': 'aws_instance', 'name': 'ab', 'depends_on': 'b'}
+    )
+    assert edges(g) == {('ab', 'b')}
+
+
+def test_repeated_names_are_separate_nodes():
+    g = graph(
+        {'type': 'aws_subnet', 'name': 'net'},
+        {'type': 'aws_subnet', 'name': 'net'},
+        {'type': 'aws_instance', 'name': 'vm1', 'depends_on': ['net']},
+        {'type': 'aws_instance', 'name': 'vm2', 'depends_on': ['net#2']}
+    )
+    assert g.names == ['net', 'net#2', 'vm1', 'vm2']
+    assert edges(g) == {('vm1', 'net'), ('vm2', 'net#2')}
@@ -0,0 +1,67 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.config import settings
+from app.models import DeploymentEvent, DeploymentEventsRequest
+from app.services.error_signatures import ErrorSignatureTable, normalize_error
+from app.services.pattern_service import EVICTED_ERROR, PatternRecognitionService
+
+
+def test_normalize_error_masks_variable_parts():
+    assert normalize_error(
+        'Timeout connecting to db-01.prod.example.com:5432 at 2024-01-02T03:04:05Z'
+    ) == 'Timeout connecting to <host>:<num> at <ts>'
+    assert normalize_error(
+        "Resource '/subscriptions/abc/resourceGroups/rg' not found (request id 3f2a1b4c-1234-4abc-9def-0123456789ab)"
+    ) == "Resource '<*>' not found (request id <id>)"
+    assert normalize_error(
+        'pull failed for https://registry.io/app:v1 from 10.0.0.4:443 hash deadbeef01'
+    ) == 'pull failed for <url> from <ip> hash <id>'
+    assert normalize_error('Quota exceeded: 12 of 10 vCPUs used in   eastus') == 'Quota exceeded: <num> of <num> vCPUs used in eastus'
+    assert len(normalize_error('x' * 1000, max_length=50)) == 50
+
+
+def test_messages_fold_into_signatures():
+    table = ErrorSignatureTable(max_signatures=10, max_cached_messages=10)
+    first = table.add('Disk 7 full on host 10.0.0.1')
+    second = table.add('Disk 12 full on host 10.0.0.2')
+    table.add('Disk 12 full on host 10.0.0.2')
+    
+    assert first is second
+    assert first.count == 3
+    assert first.sample == 'Disk 7 full on host 10.0.0.1'
+    assert len(table) == 1
+
+
+def test_tables_stay_bounded():
+    table = ErrorSignatureTable(max_signatures=3, max_cached_messages=5, max_template_length=20)
+    for i in range(10):
+        table.add(f"error kind-{chr(97 + i)} " + 'x' * 10_000)
+    
+    assert len(table.signatures) == 3
+    assert len(table.message_templates) == 5
+    assert all(len(key) == 16 for key in table.message_templates)
+    assert all(len(signature.sample) == 20 for signature in table.signatures.values())
+
+
+def test_event_store_error_dictionary_follows_eviction(monkeypatch):
+    monkeypatch.setattr(settings, 'error_signature_max_entries', 5)
+    service = PatternRecognitionService()
+    now = datetime.utcnow()
+    
+    for i in range(40):
+        event = DeploymentEvent(
+            deployment_id=f'd{i}',
+            timestamp=now + timedelta(seconds=i),
+            status='failed',
+            error=f'failure kind-{chr(97 + i % 26)}{chr(97 + i // 26)}'
+        )
+        asyncio.run(service.record_events(DeploymentEventsRequest(events=[event])))
+    
+    assert len(service.event_store.dictionaries['error'].values) <= 2 * 5
+    
+    stored = service.event_store.scan()['error']
+    assert len(stored) == 40 and (stored >= 0).all()
+    decoded = [service.event_store.decode('error', code) for code in stored.tolist()]
+    assert decoded[-5:] == list(service.error_signatures.signatures)
+    assert decoded.count(EVICTED_ERROR) >= 40 - 2 * 5
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+from app.models import DeploymentEvent
+from app.services.event_store import MIN_SEGMENT_CAPACITY, DeploymentEventStore, to_epoch_ms
+
+
+def event(timestamp, status='succeeded', **fields):
+    return DeploymentEvent(deployment_id=fields.pop('deployment_id', 'd1'), timestamp=timestamp, status=status, **fields)
+
+
+def test_sparse_partitions_start_small_and_grow():
+    store = DeploymentEventStore(partition_seconds=3600)
+    start = datetime(2024, 1, 1)
+    store.append([event(start + timedelta(hours=hour)) for hour in range(24)])
+    store.append([event(start + timedelta(minutes=minute)) for minute in range(50)])
+    
+    assert len(store.segments) == 24
+    assert len(store.segments[store.partition_keys[1]].columns['timestamp']) == MIN_SEGMENT_CAPACITY
+    first = store.segments[store.partition_keys[0]]
+    assert first.size == 51
+    assert len(first.columns['timestamp']) >= 51
+
+
+def test_scan_filters_by_range_and_deployment():
+    store = DeploymentEventStore(partition_seconds=60)
+    start = datetime(2024, 1, 1)
+    store.append([
+        event(start + timedelta(seconds=30 * i), deployment_id=f'd{i % 2}', status='failed' if i % 3 == 0 else 'succeeded')
+        for i in range(20)
+    ])
+    
+    events = store.scan(
+        to_epoch_ms(start + timedelta(seconds=60)),
+        to_epoch_ms(start + timedelta(seconds=240)),
+        deployment_ids=['d1']
+    )
+    assert events['timestamp'].tolist() == [
+        to_epoch_ms(start + timedelta(seconds=30 * i)) for i in (3, 5, 7)
+    ]
+    assert [store.decode('status', code) for code in events['status'].tolist()] == ['failed', 'succeeded', 'succeeded']
+
+
+def test_retention_drops_old_partitions_and_events():
+    store = DeploymentEventStore(partition_seconds=3600, retention_seconds=2 * 86400)
+    now = datetime.utcnow()
+    store.append([event(now - timedelta(days=1)), event(now - timedelta(days=5))])
+    
+    assert len(store) == 1
+    
+    store.retention_ms = 3600 * 1000
+    store.append([event(now)])
+    assert len(store) == 1
+    assert len(store.segments) == 1
+    
+    assert store.prune(to_epoch_ms(now) + 2 * 3600 * 1000) == 1
+    assert len(store) == 0 and not store.partition_keys
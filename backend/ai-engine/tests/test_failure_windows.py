@@ -0,0 +1,68 @@
+from app.services.failure_windows import HOUR_MS, CountRing, FailureWindowAggregator
+
+MINUTE_MS = 60_000
+DAY_MS = 24 * HOUR_MS
+
+
+def test_ring_wraps_and_drops_late_events():
+    ring = CountRing(bucket_ms=MINUTE_MS, size=10)
+    for minute in range(5):
+        assert ring.add(minute * MINUTE_MS)
+    assert ring.window(10) == 5
+    
+    # Advancing 8 buckets clears the 3 oldest slots it wraps over
+    assert ring.add(12 * MINUTE_MS)
+    assert ring.window(10) == 3
+    assert ring.window(1) == 1
+    assert ring.window(2, offset=9) == 2
+    
+    assert not ring.add(2 * MINUTE_MS)
+    assert ring.add(3 * MINUTE_MS, count=2)
+    assert ring.window(10) == 5
+    
+    ring.add(100 * MINUTE_MS)
+    assert ring.window(10) == 1
+
+
+def test_window_counts_as_of_watermark():
+    aggregator = FailureWindowAggregator(bucket_seconds=300, buckets=288, days=7, max_keys=100)
+    now = 10 * DAY_MS
+    for minutes_ago in (1, 10, 30, 70, 24 * 60 + 5, 3 * 24 * 60):
+        aggregator.observe('timeout', 'db', now - minutes_ago * MINUTE_MS, deployment_id=f'd{minutes_ago}')
+    
+    [summary] = aggregator.summaries(min_count=1, spike_ratio=3.0, spike_min_days=3)
+    
+    assert summary['window_counts'] == {
+        'last_15m': 2,
+        'last_1h': 3,
+        'last_24h': 4,
+        'previous_hour': 1,
+        'last_7d': 6
+    }
+    assert summary['last_seen_ms'] == now - MINUTE_MS
+    assert summary['last_deployment_id'] == 'd1'
+
+
+def test_daily_spike_detection():
+    aggregator = FailureWindowAggregator(bucket_seconds=300, buckets=288, days=7, max_keys=100)
+    for day in range(7):
+        for i in range(5):
+            aggregator.observe('backup failed', 'db', day * DAY_MS + 3 * HOUR_MS + i * MINUTE_MS)
+        aggregator.observe('backup failed', 'db', day * DAY_MS + (10 + day) * HOUR_MS)
+    
+    [summary] = aggregator.summaries(min_count=1, spike_ratio=3.0, spike_min_days=3)
+    
+    assert summary['peak_hour'] == 3
+    assert summary['days_at_peak'] == 7
+    assert summary['periodic_spike']
+    assert summary['peak_share'] == 35 / 42
+
+
+def test_least_recently_failing_key_is_evicted():
+    aggregator = FailureWindowAggregator(bucket_seconds=300, buckets=12, days=1, max_keys=2)
+    aggregator.observe('a', None, 0)
+    aggregator.observe('b', None, MINUTE_MS)
+    aggregator.observe('a', None, 2 * MINUTE_MS)
+    aggregator.observe('c', None, 3 * MINUTE_MS)
+    
+    assert list(aggregator.states) == [('a', None), ('c', None)]
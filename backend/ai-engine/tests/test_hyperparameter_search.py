@@ -0,0 +1,67 @@
+import pytest
+
+from app.models import HyperparameterSearch, SearchStrategy
+from app.services.hyperparameter_search import SuccessiveHalving, expand_trials, rung_budgets
+
+
+def test_rung_budgets_grow_by_reduction_factor():
+    # Enough rungs to prune n trials down to the last few
+    assert rung_budgets(n_trials=27, max_epochs=27, reduction_factor=3, min_epochs=1) == [3, 9, 27]
+    assert rung_budgets(n_trials=28, max_epochs=27, reduction_factor=3, min_epochs=1) == [1, 3, 9, 27]
+    assert rung_budgets(n_trials=9, max_epochs=27, reduction_factor=3, min_epochs=1) == [9, 27]
+    assert rung_budgets(n_trials=28, max_epochs=27, reduction_factor=3, min_epochs=5) == [9, 27]
+    assert rung_budgets(n_trials=1, max_epochs=10, reduction_factor=2, min_epochs=1) == [10]
+
+
+def test_expand_grid_and_random_trials():
+    grid = HyperparameterSearch(space={'C': [0.1, 1.0], 'penalty': ['l1', 'l2']})
+    assert expand_trials(grid, max_trials=4) == [
+        {'C': 0.1, 'penalty': 'l1'}, {'C': 0.1, 'penalty': 'l2'},
+        {'C': 1.0, 'penalty': 'l1'}, {'C': 1.0, 'penalty': 'l2'}
+    ]
+    with pytest.raises(ValueError, match='limit'):
+        expand_trials(grid, max_trials=3)
+    
+    random = HyperparameterSearch(
+        strategy=SearchStrategy.RANDOM,
+        space={'C': {'min': 0.001, 'max': 10.0, 'log': True}, 'depth': {'min': 2, 'max': 8}},
+        n_trials=20,
+        seed=7
+    )
+    trials = expand_trials(random, max_trials=64)
+    assert trials == expand_trials(random, max_trials=64)
+    assert all(0.001 <= t['C'] <= 10.0 and isinstance(t['depth'], int) and 2 <= t['depth'] <= 8 for t in trials)
+    
+    with pytest.raises(ValueError, match='epochs'):
+        expand_trials(HyperparameterSearch(space={'epochs': [1, 2]}), max_trials=4)
+
+
+def test_successive_halving_promotes_best_trials():
+    search = SuccessiveHalving([{'C': c} for c in range(9)], 'loss', max_epochs=9, reduction_factor=3, min_epochs=1)
+    assert search.budgets == [3, 9]
+    assert search.total_epochs == 9 * 3 + 3 * 9
+    
+    for rung, epochs in enumerate(search.budgets):
+        for trial in search.survivors:
+            if trial.parameters['C'] == 4 and rung == 0:
+                search.fail(trial, epochs, 'diverged')
+            else:
+                search.record(trial, epochs, {'loss': abs(trial.parameters['C'] - 5)})
+        if rung < len(search.budgets) - 1:
+            search.promote()
+        else:
+            search.finish()
+    
+    best = search.best()
+    assert best.parameters == {'C': 5} and best.epochs == 9
+    assert search.completed_epochs == search.total_epochs
+    
+    statuses = {trial.parameters['C']: trial.status for trial in search.trials}
+    assert statuses[4] == 'failed'
+    # Ties keep submission order, so C=3 is promoted ahead of C=7
+    assert sorted(c for c, status in statuses.items() if status == 'completed') == [3, 5, 6]
+    assert sorted(c for c, status in statuses.items() if status == 'stopped') == [0, 1, 2, 7, 8]
+    
+    leaderboard = search.leaderboard()
+    assert leaderboard[0]['trial'] == best.trial_id
+    assert leaderboard[-1]['status'] == 'failed' and leaderboard[-1]['error'] == 'diverged'
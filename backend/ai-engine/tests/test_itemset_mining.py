@@ -0,0 +1,51 @@
+import random
+from collections import Counter
+from itertools import combinations
+
+from app.services.itemset_mining import BlueprintCorpus, fp_growth
+
+
+def brute_force(transactions, min_support, max_size):
+    support = Counter()
+    for transaction, count in transactions.items():
+        for size in range(1, max_size + 1):
+            for itemset in combinations(transaction, size):
+                support[itemset] += count
+    return {itemset: count for itemset, count in support.items() if count >= min_support}
+
+
+def random_transactions(seed):
+    rng = random.Random(seed)
+    return Counter(tuple(sorted(rng.sample(range(12), rng.randint(1, 6)))) for _ in range(300))
+
+
+def test_fp_growth_matches_brute_force():
+    for seed in range(5):
+        transactions = random_transactions(seed)
+        mined = fp_growth(transactions, min_support=20, max_size=3)
+        
+        assert len(mined) == len(set(itemset for itemset, _ in mined))
+        assert dict(mined) == brute_force(transactions, 20, 3)
+
+
+def test_fp_growth_with_maintained_support():
+    transactions = random_transactions(7)
+    support = Counter(item for transaction, count in transactions.items() for item in transaction for _ in range(count))
+    
+    assert dict(fp_growth(transactions, 30, 4, support)) == dict(fp_growth(transactions, 30, 4))
+
+
+def test_corpus_replace_and_remove_keep_supports():
+    corpus = BlueprintCorpus()
+    corpus.add('a', [{'type': 'vm'}, {'type': 'disk'}])
+    corpus.add('b', [{'type': 'vm'}, {'resource_type': 'lb'}])
+    corpus.add('a', [{'type': 'vm'}, {'type': 'lb'}])
+    
+    assert corpus.transactions == Counter({corpus.encode(['vm', 'lb']): 2})
+    assert +corpus.item_support == Counter({corpus.item_ids['vm']: 2, corpus.item_ids['lb']: 2})
+    assert corpus.find_examples(corpus.encode(['lb']), limit=5) == ['b', 'a']
+    
+    corpus.remove('b')
+    corpus.add('a', [])
+    assert len(corpus) == 0
+    assert not corpus.transactions and not +corpus.item_support
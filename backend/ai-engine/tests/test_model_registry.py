@@ -0,0 +1,35 @@
+from app.services.model_registry import ModelRegistry
+
+
+def publish(registry, name):
+    source = registry.create_staging()
+    with open(f'{source}/weights.bin', 'wb') as f:
+        f.write(b'weights')
+    return registry.publish(name, source, kind='test').version
+
+
+def test_rollback_and_roll_forward(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    versions = [publish(registry, 'intent') for _ in range(3)]
+    for version in versions:
+        registry.activate('intent', version)
+    
+    assert registry.rollback('intent').version == 2
+    assert registry.rollback('intent').version == 1
+    assert registry.rollback('intent') is None
+    assert registry.roll_forward('intent').version == 2
+    assert registry.roll_forward('intent').version == 3
+    assert registry.roll_forward('intent') is None
+    assert registry.active_version('intent') == 3
+
+
+def test_activate_after_rollback_discards_rolled_back_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    versions = [publish(registry, 'intent') for _ in range(3)]
+    registry.activate('intent', versions[0])
+    registry.activate('intent', versions[1])
+    registry.rollback('intent')
+    registry.activate('intent', versions[2])
+    
+    assert registry.roll_forward('intent') is None
+    assert registry.rollback('intent').version == 1
@@ -0,0 +1,147 @@
+import asyncio
+import json
+from collections import Counter
+
+import pytest
+
+from app.config import settings
+from app.models import IncrementalRiskAssessmentRequest, ResourceDiff, RiskAssessmentRequest
+from app.services.risk_service import RiskAssessmentService
+
+BASE = [
+    {'type': 'azurerm_storage_account', 'name': 'x'},
+    {'type': 'azurerm_storage_account', 'name': 'x'},
+    {'type': 'azurerm_storage_account', 'name': 'x'},
+    {'type': 'aws_instance', 'name': 'vm', 'depends_on': ['x']},
+    {'type': 'aws_db_instance', 'name': 'db', 'properties': {'backup_enabled': False}},
+    {'type': 'aws_vpc'}
+]
+
+
+def signature(assessment):
+    """Parts of an assessment that do not depend on factor ids or ordering"""
+    return (
+        round(assessment.risk_score, 6),
+        assessment.overall_risk,
+        assessment.metadata['total_resources'],
+        assessment.metadata['high_risk_count'],
+        Counter((factor.title, tuple(factor.resources_affected)) for factor in assessment.risk_factors)
+    )
+
+
+def reassess(service, resources, diff):
+    async def run():
+        previous = await service.assess_risk(RiskAssessmentRequest(resources=resources))
+        return await service.reassess_risk(
+            IncrementalRiskAssessmentRequest(previous_assessment_id=previous.assessment_id, diff=diff)
+        )
+    return asyncio.run(run())
+
+
+def assess(service, resources):
+    return asyncio.run(service.assess_risk(RiskAssessmentRequest(resources=resources)))
+
+
+def test_repeated_names_are_scored_once_each():
+    service = RiskAssessmentService()
+    assessment = assess(service, BASE[:3])
+    
+    affected = [factor.resources_affected for factor in assessment.risk_factors if factor.title == 'Unencrypted Storage']
+    assert sorted(affected) == [['x'], ['x'], ['x']]
+    assert assessment.metadata['total_resources'] == 3
+
+
+def test_reassess_matches_full_assessment():
+    service = RiskAssessmentService()
+    diff = ResourceDiff(
+        added=[
+            {'type': 'azurerm_storage_account', 'name': 'x', 'properties': {'encryption_enabled': True}},
+            {'type': 'aws_lb', 'name': 'lb', 'depends_on': ['vm']},
+            {'type': 'aws_instance', 'name': 'vm2', 'depends_on': ['db']}
+        ],
+        removed=['x#2', 'aws_vpc'],
+        changed=[{'type': 'aws_instance', 'name': 'vm', 'depends_on': ['db'], 'properties': {'sku': 'xlarge'}}]
+    )
+    
+    incremental = reassess(service, BASE, diff)
+    full = assess(service, [BASE[0], BASE[2], diff.changed[0], BASE[4], *diff.added])
+    
+    assert incremental.metadata['incremental']
+    assert signature(incremental) == signature(full)
+
+
+def test_property_change_skips_aggregate_rules():
+    service = RiskAssessmentService()
+    diff = ResourceDiff(changed=[{'type': 'aws_db_instance', 'name': 'db', 'properties': {'backup_enabled': True}}])
+    
+    incremental = reassess(service, BASE, diff)
+    full = assess(service, [*BASE[:4], diff.changed[0], BASE[5]])
+    
+    assert incremental.metadata['rules_reevaluated'] == []
+    assert signature(incremental) == signature(full)
+
+
+def test_reassess_changes_repeated_name_by_key():
+    service = RiskAssessmentService()
+    diff = ResourceDiff(changed=[
+        {'type': 'azurerm_storage_account', 'name': 'x#3', 'properties': {'encryption_enabled': True}}
+    ])
+    
+    incremental = reassess(service, BASE, diff)
+    encrypted = {'type': 'azurerm_storage_account', 'name': 'x', 'properties': {'encryption_enabled': True}}
+    full = assess(service, [BASE[0], BASE[1], encrypted, *BASE[3:]])
+    
+    assert signature(incremental) == signature(full)
+    assert incremental.metadata['total_resources'] == len(BASE)
+
+
+def test_reassess_rejects_unknown_resources():
+    service = RiskAssessmentService()
+    with pytest.raises(ValueError, match='x#4'):
+        reassess(service, BASE, ResourceDiff(changed=[{'type': 'azurerm_storage_account', 'name': 'x#4'}]))
+    with pytest.raises(ValueError, match='missing'):
+        reassess(service, BASE, ResourceDiff(removed=['missing']))
+
+
+def test_reassess_unknown_assessment():
+    service = RiskAssessmentService()
+    request = IncrementalRiskAssessmentRequest(previous_assessment_id='missing', diff=ResourceDiff())
+    assert asyncio.run(service.reassess_risk(request)) is None
+
+
+def test_simulation_is_opt_in():
+    service = RiskAssessmentService()
+    assert 'risk_simulation' not in assess(service, BASE).metadata
+    
+    simulated = asyncio.run(service.assess_risk(RiskAssessmentRequest(resources=BASE, simulate=True)))
+    assert 'risk_simulation' in simulated.metadata
+
+
+def test_simulation_reports_capped_trials(monkeypatch):
+    monkeypatch.setattr(settings, 'risk_simulation_max_draws', 20_000)
+    monkeypatch.setattr(settings, 'risk_simulation_min_trials', 100)
+    service = RiskAssessmentService()
+    
+    simulation = asyncio.run(service.assess_risk(RiskAssessmentRequest(resources=BASE, simulate=True))).metadata['risk_simulation']
+    
+    assert simulation['trials_requested'] == settings.risk_simulation_trials
+    assert 100 <= simulation['trials'] < simulation['trials_requested']
+
+
+def test_stream_skips_invalid_lines():
+    service = RiskAssessmentService()
+    lines = [json.dumps(resource).encode() for resource in BASE]
+    lines.insert(2, json.dumps({'type': 'aws_network_security_group', 'properties': 'open'}).encode())
+    
+    async def run():
+        async def source():
+            for line in lines:
+                yield line
+        return ''.join([chunk async for chunk in service.assess_risk_stream(source())])
+    records = [json.loads(record) for record in asyncio.run(run()).splitlines()]
+    
+    errors = [record['data'] for record in records if record['type'] == 'error']
+    summary = records[-1]['data']
+    assert [error['line'] for error in errors] == [3]
+    assert summary['metadata']['total_resources'] == len(BASE)
+    assert summary['risk_score'] == assess(service, BASE).risk_score
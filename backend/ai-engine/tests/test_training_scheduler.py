@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from app.models import TrainingPriority
+from app.services.training_executor import TrainingCancelled
+from app.services.training_scheduler import TrainingScheduler
+from benchmarks.scheduler_fairness import VirtualClock, simulate
+
+
+def test_queue_positions_follow_aged_priority():
+    async def run():
+        clock = VirtualClock()
+        scheduler = TrainingScheduler(max_workers=1, aging_seconds=100, clock=clock)
+        blocker = asyncio.create_task(scheduler.acquire('blocker', 'm0'))
+        await asyncio.sleep(0)
+        
+        tasks = {}
+        for job_id, priority, at in (
+            ('low', TrainingPriority.LOW, 0),
+            ('normal', TrainingPriority.NORMAL, 50),
+            ('high', TrainingPriority.HIGH, 150),
+            ('high-late', TrainingPriority.HIGH, 250)
+        ):
+            clock.now = at
+            tasks[job_id] = asyncio.create_task(scheduler.acquire(job_id, job_id, priority))
+            await asyncio.sleep(0)
+        
+        # At t = 250: low 2.5, normal 3, high 3 (submitted later), high-late 2
+        expected = {'normal': 1, 'high': 2, 'low': 3, 'high-late': 4}
+        assert scheduler.queue_positions() == expected
+        assert {job_id: scheduler.queue_position(job_id) for job_id in tasks} == expected
+        assert scheduler.queue_position('blocker') is None
+        
+        assert scheduler.cancel('low')
+        assert scheduler.queue_positions() == {'normal': 1, 'high': 2, 'high-late': 3}
+        with pytest.raises(TrainingCancelled):
+            await tasks.pop('low')
+        
+        await blocker
+        scheduler.release('blocker')
+        assert await tasks['normal'] == 0
+        assert scheduler.queue_positions() == {'high': 1, 'high-late': 2}
+        for job_id in ('normal', 'high', 'high-late'):
+            await tasks[job_id]
+            scheduler.release(job_id)
+    asyncio.run(run())
+
+
+def test_aging_prevents_starvation():
+    # Saturating workload from the fairness harness, shortened
+    baseline = asyncio.run(simulate(workers=2, duration=60.0, horizon=6000.0, aging_seconds=float('inf')))
+    aged = asyncio.run(simulate(workers=2, duration=60.0, horizon=6000.0, aging_seconds=300.0))
+    
+    assert baseline['never_started'].get('low')
+    assert aged['never_started'] == {}
+    assert aged['violations'] == []
@@ -0,0 +1,147 @@
+import asyncio
+from typing import Dict, List
+
+import pytest
+
+from app.config import settings
+from app.models import HyperparameterSearch, TrainingRequest
+from app.services.model_registry import ModelRegistry
+from app.services.training_service import ModelTrainingService
+
+
+class FakeRuns:
+    """Stands in for worker processes: each run waits until the test finishes it"""
+    
+    def __init__(self):
+        self.started: List[str] = []
+        self.gates: Dict[str, asyncio.Event] = {}
+    
+    async def run(self, job_id, slot, training_data, parameters, on_progress, artifact_dir=None, dataset=None):
+        self.started.append(job_id)
+        gate = self.gates.setdefault(job_id, asyncio.Event())
+        on_progress({'status': 'training', 'progress': 0.5, 'metrics': None})
+        await gate.wait()
+        return {'accuracy': 0.9, 'f1_score': parameters.get('C', 0.5)}
+    
+    def finish(self, job_id: str):
+        self.gates.setdefault(job_id, asyncio.Event()).set()
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'training_job_db_path', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(settings, 'training_checkpoint_dir', str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(settings, 'training_max_workers', 1)
+    service = ModelTrainingService(ModelRegistry(str(tmp_path / 'registry')))
+    service.runs = FakeRuns()
+    monkeypatch.setattr(service.executor, 'run', service.runs.run)
+    yield service
+    service.job_store.close()
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def request(model_name: str) -> TrainingRequest:
+    return TrainingRequest(model_name=model_name, training_data={'texts': ['a', 'b'], 'labels': [0, 1]})
+
+
+def test_cancel_after_worker_granted_before_start(service):
+    async def run():
+        first = await service.start_training(request('intent'))
+        second = await service.start_training(request('nlp'))
+        await settle()
+        assert service.runs.started == [first.job_id]
+        assert (await service.get_training_status(second.job_id)).queue_position == 1
+        
+        # Hand the worker to the second job, then cancel before its task resumes
+        service.scheduler.release(first.job_id)
+        assert second.job_id in service.scheduler.running
+        await service.cancel_training(second.job_id)
+        await settle()
+        
+        assert service.runs.started == [first.job_id]
+        assert service.job_store.get(second.job_id).status == 'cancelled'
+        assert second.job_id not in service.scheduler.running
+        
+        service.runs.finish(first.job_id)
+        await settle()
+        assert service.job_store.get(first.job_id).status == 'completed'
+        assert service.registry.active_version('intent') is None
+        assert [info.version for info in service.registry.list_versions('intent')] == [1]
+    asyncio.run(run())
+
+
+def test_cancel_before_task_starts(service):
+    async def run():
+        job = await service.start_training(request('intent'))
+        await service.cancel_training(job.job_id)
+        await settle()
+        
+        assert service.runs.started == []
+        assert service.job_store.get(job.job_id).status == 'cancelled'
+    asyncio.run(run())
+
+
+def test_search_holds_its_model_until_published(service, monkeypatch):
+    monkeypatch.setattr(service.scheduler, 'free_slots', [1, 0])
+    search_request = request('intent')
+    search_request.parameters = {'epochs': 2}
+    search_request.search = HyperparameterSearch(space={'C': [0.1, 0.2]})
+    
+    async def run():
+        search = await service.start_training(search_request)
+        await settle()
+        job = await service.start_training(request('intent'))
+        other = await service.start_training(request('nlp'))
+        await settle()
+        
+        trials = [f'{search.job_id}/trial-1', f'{search.job_id}/trial-2']
+        assert sorted(service.runs.started) == trials
+        assert (await service.get_training_status(job.job_id)).queue_position == 1
+        assert (await service.get_training_status(other.job_id)).queue_position == 2
+        
+        # Freeing a worker runs the other model's job, not the one waiting for the search's model
+        service.runs.finish(trials[0])
+        await settle()
+        assert service.runs.started[2:] == [other.job_id]
+        
+        service.runs.finish(trials[1])
+        await settle()
+        assert service.job_store.get(search.job_id).status == 'completed'
+        
+        service.runs.finish(other.job_id)
+        await settle()
+        assert service.runs.started[3:] == [job.job_id]
+        service.runs.finish(job.job_id)
+        await settle()
+        
+        versions = service.registry.list_versions('intent')
+        assert [info.metadata['job_id'] for info in versions] == [search.job_id, job.job_id]
+        assert versions[0].metadata['search_trial'] == 2
+    asyncio.run(run())
+
+
+def test_cancel_search_waiting_for_its_model(service):
+    search_request = request('intent')
+    search_request.parameters = {'epochs': 2}
+    search_request.search = HyperparameterSearch(space={'C': [0.1, 0.2]})
+    
+    async def run():
+        job = await service.start_training(request('intent'))
+        await settle()
+        search = await service.start_training(search_request)
+        await settle()
+        assert (await service.get_training_status(search.job_id)).queue_position == 1
+        
+        await service.cancel_training(search.job_id)
+        await settle()
+        assert service.job_store.get(search.job_id).status == 'cancelled'
+        
+        service.runs.finish(job.job_id)
+        await settle()
+        assert service.runs.started == [job.job_id]
+        assert service.job_store.get(job.job_id).status == 'completed'
+    asyncio.run(run())
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from app.models import TrainingStatus
+from app.services.training_store import TrainingJobStore
+
+
+def job(job_id, status='completed', completed_days_ago=None, model_name='intent', started_minutes_ago=0):
+    now = datetime.utcnow()
+    return TrainingStatus(
+        job_id=job_id,
+        model_name=model_name,
+        status=status,
+        progress=1.0 if status == 'completed' else 0.0,
+        started_at=now - timedelta(minutes=started_minutes_ago),
+        completed_at=None if completed_days_ago is None else now - timedelta(days=completed_days_ago),
+        metrics={'accuracy': 0.9} if status == 'completed' else None,
+        model_version=1 if status == 'completed' else None
+    )
+
+
+def test_save_get_and_list(tmp_path):
+    store = TrainingJobStore(str(tmp_path / 'jobs.db'), max_finished=10, max_age=timedelta(days=30))
+    store.save(job('a', completed_days_ago=0, started_minutes_ago=2))
+    store.save(job('b', status='queued', model_name='nlp', started_minutes_ago=1))
+    store.save_request('b', '{"model_name": "nlp"}')
+    
+    assert store.get('a').metrics == {'accuracy': 0.9}
+    assert store.get('missing') is None
+    assert [status.job_id for status in store.list()] == ['b', 'a']
+    assert [status.job_id for status in store.list(model_name='intent')] == ['a']
+    assert [(status.job_id, request) for status, request in store.unfinished()] == [('b', '{"model_name": "nlp"}')]
+
+
+def test_evict_finished_jobs_by_age_and_count(tmp_path):
+    store = TrainingJobStore(str(tmp_path / 'jobs.db'), max_finished=2, max_age=timedelta(days=30))
+    store.save(job('expired', completed_days_ago=40))
+    for i in range(3):
+        store.save(job(f'done-{i}', status='failed', completed_days_ago=3 - i))
+    store.save(job('running', status='training'))
+    
+    assert store.evict() == 2
+    assert {status.job_id for status in store.list()} == {'done-1', 'done-2', 'running'}
+    assert store.evict() == 0